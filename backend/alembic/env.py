@@ -16,7 +16,7 @@ from app.core.config import settings
 from app.db.base import Base
 
 # Импорт всех моделей для Alembic
-from app.db.models import user, city, attraction, favorite  # noqa
+from app.db.models import user, city, attraction, favorite, review  # noqa
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,31 @@
+"""add attractions listing index
+
+Revision ID: 3f2a9c1d7b44
+Revises: 0b1dc59edd11
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f2a9c1d7b44'
+down_revision: Union[str, None] = '0b1dc59edd11'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_attractions_listing',
+        'attractions',
+        ['is_active', 'city_id', 'category', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_attractions_listing', table_name='attractions')
@@ -0,0 +1,41 @@
+"""add attractions coordinates
+
+Revision ID: 5d8e1f3a6c27
+Revises: 7c4e2b9a5d10
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d8e1f3a6c27'
+down_revision: Union[str, None] = '7c4e2b9a5d10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('attractions', sa.Column('latitude', sa.Float(), nullable=True))
+    op.add_column('attractions', sa.Column('longitude', sa.Float(), nullable=True))
+    # Morton-код ячейки (app.core.geo.geo_cell); заполняется приложением и scripts/backfill_coordinates.py
+    op.add_column('attractions', sa.Column('geo_cell', sa.BigInteger(), nullable=True))
+    # Только активные записи; координаты в INCLUDE - кандидаты читаются index-only scan
+    op.create_index(
+        'ix_attractions_geo_cell',
+        'attractions',
+        ['geo_cell'],
+        unique=False,
+        postgresql_include=['latitude', 'longitude', 'id'],
+        postgresql_where=sa.text('is_active = true'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_attractions_geo_cell', table_name='attractions')
+    op.drop_column('attractions', 'geo_cell')
+    op.drop_column('attractions', 'longitude')
+    op.drop_column('attractions', 'latitude')
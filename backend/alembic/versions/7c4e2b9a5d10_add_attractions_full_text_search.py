@@ -0,0 +1,60 @@
+"""add attractions full text search
+
+Revision ID: 7c4e2b9a5d10
+Revises: 3f2a9c1d7b44
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c4e2b9a5d10'
+down_revision: Union[str, None] = '3f2a9c1d7b44'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('russian', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(address, '')), 'B') || "
+    "setweight(to_tsvector('russian', coalesce(description, '')), 'C')"
+)
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.add_column(
+        'attractions',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(SEARCH_VECTOR_EXPRESSION, persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        'ix_attractions_search_vector',
+        'attractions',
+        ['search_vector'],
+        unique=False,
+        postgresql_using='gin',
+    )
+    # Поиск с опечатками: name % :q и similarity(name, :q)
+    op.create_index(
+        'ix_attractions_name_trgm',
+        'attractions',
+        ['name'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'name': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_attractions_name_trgm', table_name='attractions')
+    op.drop_index('ix_attractions_search_vector', table_name='attractions')
+    op.drop_column('attractions', 'search_vector')
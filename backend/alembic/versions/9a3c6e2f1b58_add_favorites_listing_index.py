@@ -0,0 +1,34 @@
+"""add favorites listing index
+
+Revision ID: 9a3c6e2f1b58
+Revises: 5d8e1f3a6c27
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a3c6e2f1b58'
+down_revision: Union[str, None] = '5d8e1f3a6c27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Курсорная пагинация избранного; ix_favorites_user_id становится префиксом нового индекса
+    op.create_index(
+        'ix_favorites_listing',
+        'favorites',
+        ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False,
+    )
+    op.drop_index('ix_favorites_user_id', table_name='favorites')
+
+
+def downgrade() -> None:
+    op.create_index('ix_favorites_user_id', 'favorites', ['user_id'], unique=False)
+    op.drop_index('ix_favorites_listing', table_name='favorites')
@@ -0,0 +1,57 @@
+"""add attractions favorites count
+
+Revision ID: b6d4f8a2c913
+Revises: 9a3c6e2f1b58
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6d4f8a2c913'
+down_revision: Union[str, None] = '9a3c6e2f1b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'attractions',
+        sa.Column('favorites_count', sa.Integer(), server_default='0', nullable=False),
+    )
+    op.execute("""
+        UPDATE attractions a
+        SET favorites_count = f.count
+        FROM (SELECT attraction_id, count(*) AS count FROM favorites GROUP BY attraction_id) f
+        WHERE a.id = f.attraction_id
+    """)
+
+    # NULL в рейтинге ломает keyset-сравнение (rating, id) для sort=rating
+    op.execute("UPDATE attractions SET rating = 0 WHERE rating IS NULL")
+    op.alter_column('attractions', 'rating', existing_type=sa.Float(), nullable=False, server_default='0')
+
+    op.create_index(
+        'ix_attractions_popular',
+        'attractions',
+        ['city_id', sa.text('favorites_count DESC'), sa.text('id DESC')],
+        unique=False,
+        postgresql_where=sa.text('is_active = true'),
+    )
+    op.create_index(
+        'ix_attractions_top_rated',
+        'attractions',
+        ['city_id', sa.text('rating DESC'), sa.text('id DESC')],
+        unique=False,
+        postgresql_where=sa.text('is_active = true'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_attractions_top_rated', table_name='attractions')
+    op.drop_index('ix_attractions_popular', table_name='attractions')
+    op.alter_column('attractions', 'rating', existing_type=sa.Float(), nullable=True, server_default=None)
+    op.drop_column('attractions', 'favorites_count')
@@ -0,0 +1,55 @@
+"""create reviews
+
+Revision ID: c1e7a9d3f254
+Revises: b6d4f8a2c913
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c1e7a9d3f254'
+down_revision: Union[str, None] = 'b6d4f8a2c913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'reviews',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('attraction_id', sa.Integer(), nullable=False),
+        sa.Column('rating', sa.SmallInteger(), nullable=False),
+        sa.Column('text', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.CheckConstraint('rating BETWEEN 1 AND 5', name='ck_reviews_rating'),
+        sa.ForeignKeyConstraint(['attraction_id'], ['attractions.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'attraction_id', name='unique_user_review'),
+    )
+    op.create_index(op.f('ix_reviews_id'), 'reviews', ['id'], unique=False)
+    op.create_index(
+        'ix_reviews_listing',
+        'reviews',
+        ['attraction_id', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False,
+    )
+
+    # Суммы оценок; rating без отзывов остается редакционным
+    op.add_column('attractions', sa.Column('rating_sum', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('attractions', sa.Column('rating_count', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('attractions', 'rating_count')
+    op.drop_column('attractions', 'rating_sum')
+    op.drop_index('ix_reviews_listing', table_name='reviews')
+    op.drop_index(op.f('ix_reviews_id'), table_name='reviews')
+    op.drop_table('reviews')
@@ -0,0 +1,33 @@
+"""add attractions newest index
+
+Revision ID: d4b2e6f8a137
+Revises: c1e7a9d3f254
+Create Date: 2026-10-18 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4b2e6f8a137'
+down_revision: Union[str, None] = 'c1e7a9d3f254'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # ix_attractions_listing не дает порядка при фильтре только по городу (category между ними)
+    op.create_index(
+        'ix_attractions_newest',
+        'attractions',
+        ['city_id', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False,
+        postgresql_where=sa.text('is_active = true'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_attractions_newest', table_name='attractions')
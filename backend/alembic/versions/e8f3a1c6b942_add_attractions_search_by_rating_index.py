@@ -0,0 +1,34 @@
+"""add attractions search by rating index
+
+Revision ID: e8f3a1c6b942
+Revises: d4b2e6f8a137
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8f3a1c6b942'
+down_revision: Union[str, None] = 'd4b2e6f8a137'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # search_vector в INCLUDE: проверка @@ без чтения таблицы (index-only scan)
+    op.create_index(
+        'ix_attractions_search_by_rating',
+        'attractions',
+        [sa.text('rating DESC'), sa.text('id DESC')],
+        unique=False,
+        postgresql_include=['search_vector'],
+        postgresql_where=sa.text('is_active = true'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_attractions_search_by_rating', table_name='attractions')
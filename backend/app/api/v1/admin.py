@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
+
+from app.db.models.user import User
+from app.db.slow_queries import slow_query_log
+from app.schemas.admin import ProfileInfo, SlowQueryReport
+from app.core.dependencies import get_current_admin_user
+from app.core.profiler import profile_store
+from app.core.query_budget import query_budget
+
+router = APIRouter()
+
+
+@router.get("/slow-queries", response_model=SlowQueryReport)
+@query_budget(1)
+async def get_slow_queries(
+    limit: int = Query(20, ge=1, le=100, description="Число выражений и планов"),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Самые медленные SQL-выражения (по суммарному времени) и последние планы EXPLAIN"""
+    return {
+        "threshold_ms": slow_query_log.threshold_ms,
+        "explain_enabled": slow_query_log.explain,
+        "statements": slow_query_log.top(limit),
+        "plans": slow_query_log.recent_plans(limit),
+    }
+
+
+@router.delete("/slow-queries", status_code=204)
+@query_budget(1)
+async def clear_slow_queries(
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Сбросить статистику медленных выражений"""
+    slow_query_log.clear()
+
+
+@router.get("/profiles", response_model=list[ProfileInfo])
+@query_budget(1)
+async def get_profiles(
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Сохраненные профили запросов (X-Profile: store), новые первыми"""
+    return profile_store.list()
+
+
+@router.get("/profiles/{profile_id}")
+@query_budget(1)
+async def download_profile(
+    profile_id: str,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Скачать профиль в формате pstats"""
+    path = profile_store.path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/octet-stream", filename=path.name)
@@ -1,13 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from typing import Optional
+from sqlalchemy import select
+from typing import Any, Literal, Optional, Tuple
 from app.db.session import get_db
+from app.db.changes import changes
 from app.db.models.attraction import Attraction
-from app.db.models.favorite import Favorite
 from app.db.models.user import User
-from app.schemas.attraction import AttractionResponse, AttractionList
+from app.schemas.attraction import (
+    AttractionResponse, AttractionList, AttractionSearchResult, AttractionNearbyList, AttractionClusterList
+)
 from app.core.dependencies import get_current_user_optional
+from app.core.http_cache import conditional_get, version_etag
+from app.core.responses import FastJSONResponse
+from app.core.query_budget import query_budget
+from app.services.attraction_listing import ATTRACTION_COLUMNS, build_list_query, fetch_page, parse_fields
+from app.services.attraction_clusters import cluster_index
+from app.services.attraction_nearby import find_nearby
+from app.services.attraction_search import search_attractions as run_search
+from app.services.favorite_ids import favorite_id_cache
+from app.services.favorite_versions import favorite_versions
 
 router = APIRouter()
 
@@ -17,98 +28,234 @@ async def check_is_favorite(
     user_id: Optional[int],
     db: AsyncSession
 ) -> set[int]:
-    """Проверить, какие достопримечательности в избранном у пользователя"""
+    """Проверить, какие достопримечательности в избранном у пользователя (по кэшу id избранного)"""
     if not user_id:
         return set()
 
-    result = await db.execute(
-        select(Favorite.attraction_id).where(
-            Favorite.user_id == user_id,
-            Favorite.attraction_id.in_(attraction_ids)
-        )
-    )
-    return set(result.scalars().all())
+    return await favorite_id_cache.flags(user_id, attraction_ids, db)
+
+
+def parse_bbox(bbox: str) -> Tuple[float, float, float, float]:
+    """
+    Прямоугольник карты "min_lon,min_lat,max_lon,max_lat"
+
+    Raises:
+        HTTPException: Если формат или координаты неверны
+    """
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(part) for part in bbox.split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid bbox")
+
+    if not (-180 <= min_lon <= max_lon <= 180 and -90 <= min_lat <= max_lat <= 90):
+        raise HTTPException(status_code=400, detail="Invalid bbox")
+    return min_lon, min_lat, max_lon, max_lat
+
+
+def catalog_validators(user_id: Optional[int], *params: Any) -> Tuple[str, float]:
+    """
+    ETag и Last-Modified ответа каталога по версиям данных (без запросов к БД)
+
+    Для авторизованного пользователя учитывается версия его избранного,
+    так как ответ содержит флаги is_favorite.
+    """
+    parts = [changes.version("attractions"), *params]
+    last_modified = changes.last_modified("attractions")
+
+    if user_id is not None:
+        parts += [user_id, favorite_versions.version(user_id)]
+        last_modified = max(last_modified, favorite_versions.last_modified(user_id))
+
+    return version_etag(*parts), last_modified
 
 
 @router.get("", response_model=AttractionList)
+@query_budget(4)
 async def get_attractions(
+    request: Request,
+    response: Response,
     city_id: Optional[int] = Query(None, description="Фильтр по городу"),
     category: Optional[str] = Query(None, description="Фильтр по категории"),
     page: int = Query(1, ge=1, description="Номер страницы"),
     page_size: int = Query(10, ge=1, le=100, description="Размер страницы"),
+    cursor: Optional[str] = Query(None, description="Курсор следующей страницы (вместо page)"),
+    total_mode: Literal["exact", "estimate", "none"] = Query(
+        "exact", description="Подсчет total: точно, приблизительно или не считать"
+    ),
+    sort: Literal["newest", "popular", "rating"] = Query(
+        "newest", description="Порядок: новые, по числу добавлений в избранное или по рейтингу"
+    ),
+    fields: Optional[str] = Query(
+        None, description="Поля через запятую или пресет: card, full (по умолчанию)"
+    ),
     db: AsyncSession = Depends(get_db),
     current_user: Optional[User] = Depends(get_current_user_optional)
 ):
     """Получить список достопримечательностей с фильтрацией и пагинацией"""
-    query = select(Attraction).where(Attraction.is_active == True)
+    selected = parse_fields(fields)
+    # Без is_favorite ответ не персональный
+    user_id = current_user.id if current_user and "is_favorite" in selected else None
+    # Порядок popular зависит от избранного всех пользователей
+    popularity = changes.version("favorites") if sort == "popular" else None
+    etag, last_modified = catalog_validators(
+        user_id, "list", city_id, category, page, page_size, cursor, total_mode, sort, popularity, *selected
+    )
+    if popularity is not None:
+        last_modified = max(last_modified, changes.last_modified("favorites"))
+    not_modified = conditional_get(request, response, etag, last_modified, private=user_id is not None)
+    if not_modified:
+        return not_modified
 
-    if city_id:
-        query = query.where(Attraction.city_id == city_id)
+    query = build_list_query(city_id, category, selected)
+    attractions, total, next_cursor = await fetch_page(
+        query,
+        key=(city_id or None, category or None),
+        page=page,
+        page_size=page_size,
+        cursor=cursor,
+        total_mode=total_mode,
+        db=db,
+        sort=sort
+    )
 
-    if category:
-        query = query.where(Attraction.category == category)
+    if "is_favorite" in selected:
+        # Проверить избранное
+        attraction_ids = [a['id'] for a in attractions]
+        favorite_ids = await check_is_favorite(attraction_ids, user_id, db)
 
-    # Получить общее количество
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
+        # Добавить флаг is_favorite
+        for attraction in attractions:
+            attraction['is_favorite'] = attraction['id'] in favorite_ids
 
-    # Применить пагинацию
-    query = query.order_by(Attraction.created_at.desc())
-    query = query.offset((page - 1) * page_size).limit(page_size)
+    return FastJSONResponse(
+        {
+            "items": attractions,
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "next_cursor": next_cursor,
+        },
+        headers=response.headers
+    )
 
-    result = await db.execute(query)
-    attractions = result.scalars().all()
 
-    # Проверить избранное
-    attraction_ids = [a.id for a in attractions]
-    favorite_ids = await check_is_favorite(
-        attraction_ids,
-        current_user.id if current_user else None,
-        db
+@router.get("/search", response_model=AttractionSearchResult)
+@query_budget(4)
+async def search_attractions(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=2, max_length=100, description="Поисковый запрос"),
+    city_id: Optional[int] = Query(None, description="Фильтр по городу"),
+    category: Optional[str] = Query(None, description="Фильтр по категории"),
+    limit: int = Query(20, ge=1, le=50, description="Максимум результатов"),
+    db: AsyncSession = Depends(get_db),
+    current_user: Optional[User] = Depends(get_current_user_optional)
+):
+    """Полнотекстовый поиск по названию, адресу и описанию"""
+    user_id = current_user.id if current_user else None
+    etag, last_modified = catalog_validators(user_id, "search", q, city_id, category, limit)
+    not_modified = conditional_get(request, response, etag, last_modified, private=user_id is not None)
+    if not_modified:
+        return not_modified
+
+    attractions, fuzzy = await run_search(q, city_id, category, limit, db)
+
+    favorite_ids = await check_is_favorite([a['id'] for a in attractions], user_id, db)
+    for attraction in attractions:
+        attraction['is_favorite'] = attraction['id'] in favorite_ids
+
+    return FastJSONResponse(
+        {"items": attractions, "query": q, "fuzzy": fuzzy},
+        headers=response.headers
     )
 
-    # Добавить флаг is_favorite
-    items = []
+
+@router.get("/nearby", response_model=AttractionNearbyList)
+@query_budget(4)
+async def get_nearby_attractions(
+    request: Request,
+    response: Response,
+    lat: float = Query(..., ge=-90, le=90, description="Широта"),
+    lon: float = Query(..., ge=-180, le=180, description="Долгота"),
+    radius: float = Query(1000, gt=0, le=50000, description="Радиус в метрах"),
+    category: Optional[str] = Query(None, description="Фильтр по категории"),
+    limit: int = Query(20, ge=1, le=100, description="Максимум результатов"),
+    db: AsyncSession = Depends(get_db),
+    current_user: Optional[User] = Depends(get_current_user_optional)
+):
+    """Достопримечательности в радиусе от точки, ближайшие первыми"""
+    user_id = current_user.id if current_user else None
+    etag, last_modified = catalog_validators(user_id, "nearby", lat, lon, radius, category, limit)
+    not_modified = conditional_get(request, response, etag, last_modified, private=user_id is not None)
+    if not_modified:
+        return not_modified
+
+    attractions = await find_nearby(lat, lon, radius, category, limit, db)
+
+    favorite_ids = await check_is_favorite([a['id'] for a in attractions], user_id, db)
     for attraction in attractions:
-        attraction_dict = AttractionResponse.model_validate(attraction).model_dump()
-        attraction_dict['is_favorite'] = attraction.id in favorite_ids
-        items.append(AttractionResponse(**attraction_dict))
+        attraction['is_favorite'] = attraction['id'] in favorite_ids
 
-    return AttractionList(
-        items=items,
-        total=total,
-        page=page,
-        page_size=page_size
+    return FastJSONResponse(
+        {"items": attractions, "latitude": lat, "longitude": lon, "radius": radius},
+        headers=response.headers
+    )
+
+
+@router.get("/clusters", response_model=AttractionClusterList)
+@query_budget(0)
+async def get_attraction_clusters(
+    request: Request,
+    response: Response,
+    bbox: str = Query(..., description="Видимая область: min_lon,min_lat,max_lon,max_lat"),
+    zoom: int = Query(..., ge=0, le=22, description="Масштаб карты"),
+    city_id: Optional[int] = Query(None, description="Фильтр по городу")
+):
+    """Кластеры достопримечательностей в видимой области карты (без запросов к БД)"""
+    min_lon, min_lat, max_lon, max_lat = parse_bbox(bbox)
+    # Версия самих кластеров: после массовых изменений они перестраиваются в фоне
+    etag = version_etag(cluster_index.generation, "clusters", bbox, zoom, city_id)
+    not_modified = conditional_get(request, response, etag, changes.last_modified("attractions"))
+    if not_modified:
+        return not_modified
+
+    return FastJSONResponse(
+        {"items": cluster_index.clusters(min_lon, min_lat, max_lon, max_lat, zoom, city_id), "zoom": zoom},
+        headers=response.headers
     )
 
 
 @router.get("/{attraction_id}", response_model=AttractionResponse)
+@query_budget(3)
 async def get_attraction(
     attraction_id: int,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     current_user: Optional[User] = Depends(get_current_user_optional)
 ):
     """Получить детальную информацию о достопримечательности"""
+    user_id = current_user.id if current_user else None
+    etag, last_modified = catalog_validators(user_id, "detail", attraction_id)
+    not_modified = conditional_get(request, response, etag, last_modified, private=user_id is not None)
+    if not_modified:
+        return not_modified
+
     result = await db.execute(
-        select(Attraction).where(
+        select(*ATTRACTION_COLUMNS).where(
             Attraction.id == attraction_id,
             Attraction.is_active == True
         )
     )
-    attraction = result.scalar_one_or_none()
+    row = result.one_or_none()
 
-    if not attraction:
+    if not row:
         raise HTTPException(status_code=404, detail="Attraction not found")
 
     # Проверить избранное
-    favorite_ids = await check_is_favorite(
-        [attraction_id],
-        current_user.id if current_user else None,
-        db
-    )
+    favorite_ids = await check_is_favorite([attraction_id], user_id, db)
 
-    attraction_dict = AttractionResponse.model_validate(attraction).model_dump()
-    attraction_dict['is_favorite'] = attraction_id in favorite_ids
+    attraction = row._asdict()
+    attraction['is_favorite'] = attraction_id in favorite_ids
 
-    return AttractionResponse(**attraction_dict)
+    return FastJSONResponse(attraction, headers=response.headers)
@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, case, func
+from sqlalchemy.dialects.postgresql import insert
 
 from app.db.session import get_db
+from app.db.changes import changes
 from app.db.models.user import User
 from app.schemas.auth import (
     UserRegister,
@@ -14,19 +16,21 @@ from app.schemas.auth import (
     MessageResponse,
 )
 from app.core.security import (
-    verify_password,
-    get_password_hash,
     create_access_token,
     create_refresh_token,
     verify_token,
+    get_token_subject,
     validate_telegram_auth,
 )
 from app.core.dependencies import get_current_user
+from app.core.query_budget import query_budget
+from app.services.password_hasher import password_hasher
 
 router = APIRouter(tags=["auth"])
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
+@query_budget(3)
 async def register(
     user_data: UserRegister,
     db: AsyncSession = Depends(get_db)
@@ -43,7 +47,7 @@ async def register(
         )
     
     # Создаем нового пользователя
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await password_hasher.hash(user_data.password)
     new_user = User(
         email=user_data.email,
         hashed_password=hashed_password,
@@ -58,6 +62,7 @@ async def register(
 
 
 @router.post("/login", response_model=Token)
+@query_budget(1)
 async def login(
     user_data: UserLogin,
     db: AsyncSession = Depends(get_db)
@@ -74,7 +79,7 @@ async def login(
         )
     
     # Проверяем пароль
-    if not user.hashed_password or not verify_password(user_data.password, user.hashed_password):
+    if not user.hashed_password or not await password_hasher.verify(user_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
@@ -88,8 +93,8 @@ async def login(
         )
     
     # Создаем токены
-    access_token = create_access_token(data={"sub": user.id, "email": user.email})
-    refresh_token = create_refresh_token(data={"sub": user.id})
+    access_token = create_access_token(data={"sub": str(user.id), "email": user.email})
+    refresh_token = create_refresh_token(data={"sub": str(user.id)})
     
     return {
         "access_token": access_token,
@@ -99,6 +104,7 @@ async def login(
 
 
 @router.post("/telegram", response_model=Token)
+@query_budget(1)
 async def telegram_auth(
     telegram_data: TelegramAuth,
     db: AsyncSession = Depends(get_db)
@@ -120,26 +126,27 @@ async def telegram_auth(
             detail="Telegram user ID not found"
         )
     
-    # Ищем пользователя по telegram_id
-    result = await db.execute(select(User).where(User.telegram_id == telegram_id))
-    user = result.scalar_one_or_none()
-    
-    # Если пользователь не найден, создаем нового
-    if not user:
-        user = User(
-            telegram_id=telegram_id,
-            telegram_username=user_data.get("username"),
-            is_active=True
-        )
-        db.add(user)
-        await db.commit()
-        await db.refresh(user)
-    else:
-        # Обновляем username, если изменился
-        if user.telegram_username != user_data.get("username"):
-            user.telegram_username = user_data.get("username")
-            await db.commit()
-            await db.refresh(user)
+    # Создаем пользователя или обновляем username одним запросом.
+    # DO UPDATE выполняется всегда, чтобы RETURNING вернул и существующую строку;
+    # updated_at меняется, только если username действительно изменился
+    stmt = insert(User).values(
+        telegram_id=telegram_id,
+        telegram_username=user_data.get("username"),
+        is_active=True,
+        is_admin=False
+    )
+    username_changed = User.telegram_username.is_distinct_from(stmt.excluded.telegram_username)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[User.telegram_id],
+        set_={
+            "telegram_username": stmt.excluded.telegram_username,
+            "updated_at": case((username_changed, func.now()), else_=User.updated_at),
+        }
+    ).returning(User.id, User.is_active)
+
+    user = (await db.execute(stmt)).one()
+    changes.mark(db, "users", "update", {"id": user.id})
+    await db.commit()
     
     # Проверяем, активен ли пользователь
     if not user.is_active:
@@ -149,8 +156,8 @@ async def telegram_auth(
         )
     
     # Создаем токены
-    access_token = create_access_token(data={"sub": user.id, "telegram_id": telegram_id})
-    refresh_token = create_refresh_token(data={"sub": user.id})
+    access_token = create_access_token(data={"sub": str(user.id), "telegram_id": telegram_id})
+    refresh_token = create_refresh_token(data={"sub": str(user.id)})
     
     return {
         "access_token": access_token,
@@ -160,6 +167,7 @@ async def telegram_auth(
 
 
 @router.post("/refresh", response_model=Token)
+@query_budget(1)
 async def refresh_token(
     token_data: TokenRefresh,
     db: AsyncSession = Depends(get_db)
@@ -174,7 +182,7 @@ async def refresh_token(
             detail="Invalid refresh token"
         )
     
-    user_id = payload.get("sub")
+    user_id = get_token_subject(payload)
     if user_id is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -192,8 +200,8 @@ async def refresh_token(
         )
     
     # Создаем новые токены
-    access_token = create_access_token(data={"sub": user.id})
-    refresh_token = create_refresh_token(data={"sub": user.id})
+    access_token = create_access_token(data={"sub": str(user.id)})
+    refresh_token = create_refresh_token(data={"sub": str(user.id)})
     
     return {
         "access_token": access_token,
@@ -203,6 +211,7 @@ async def refresh_token(
 
 
 @router.get("/me", response_model=UserResponse)
+@query_budget(1)
 async def get_current_user_info(
     current_user: User = Depends(get_current_user)
 ):
@@ -1,41 +1,46 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 from app.db.session import get_db
-from app.db.models.city import City
+from app.db.changes import changes
 from app.schemas.city import CityResponse, CityList
+from app.core.http_cache import cache_headers, is_not_modified
+from app.core.query_budget import query_budget
+from app.services.city_catalog import city_catalog
 
 router = APIRouter()
 
 
+def cached_response(request: Request, body: bytes, etag: str) -> Response:
+    """Ответ из кэша каталога: 304 при актуальной версии у клиента, иначе готовый JSON"""
+    last_modified = changes.last_modified("cities")
+    headers = cache_headers(etag, last_modified)
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @router.get("", response_model=CityList)
+@query_budget(1)
 async def get_cities(
+    request: Request,
     db: AsyncSession = Depends(get_db)
 ):
     """Получить список всех активных городов"""
-    result = await db.execute(
-        select(City).where(City.is_active == True).order_by(City.name)
-    )
-    cities = result.scalars().all()
-
-    return CityList(
-        items=[CityResponse.model_validate(city) for city in cities],
-        total=len(cities)
-    )
+    body, etag = await city_catalog.get_list(db)
+    return cached_response(request, body, etag)
 
 
 @router.get("/{city_id}", response_model=CityResponse)
+@query_budget(1)
 async def get_city(
     city_id: int,
+    request: Request,
     db: AsyncSession = Depends(get_db)
 ):
     """Получить информацию о конкретном городе"""
-    result = await db.execute(
-        select(City).where(City.id == city_id, City.is_active == True)
-    )
-    city = result.scalar_one_or_none()
+    cached = await city_catalog.get_city(city_id, db)
 
-    if not city:
+    if not cached:
         raise HTTPException(status_code=404, detail="City not found")
 
-    return CityResponse.model_validate(city)
+    return cached_response(request, *cached)
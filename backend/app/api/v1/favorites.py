@@ -1,107 +1,246 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import Select, delete, literal, select, true, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from app.db.session import get_db
+from app.db.changes import changes
 from app.db.models.favorite import Favorite
 from app.db.models.attraction import Attraction
 from app.db.models.user import User
-from app.schemas.favorite import FavoriteCreate, FavoriteResponse, FavoriteList
+from app.schemas.favorite import (
+    FavoriteCreate, FavoriteResponse, FavoriteList, FavoriteIds, FavoriteBatch, FavoriteBatchResult
+)
 from app.core.dependencies import get_current_user
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.http_cache import conditional_get, version_etag
+from app.core.responses import FastJSONResponse
+from app.core.query_budget import query_budget
+from app.services.attraction_listing import ATTRACTION_COLUMNS, ATTRACTION_FIELDS, FIELD_PRESETS
+from app.services.favorite_counts import favorites_count_cte
+from app.services.favorite_ids import favorite_id_cache
+from app.services.favorite_versions import favorite_versions
 
 router = APIRouter()
 
+FAVORITE_COLUMNS = (Favorite.id, Favorite.user_id, Favorite.attraction_id, Favorite.created_at)
+
+# Облегченная проекция достопримечательности (view=card): без описания и адреса
+CARD_COLUMNS = tuple(ATTRACTION_FIELDS[name] for name in FIELD_PRESETS["card"] if name in ATTRACTION_FIELDS)
+VIEW_COLUMNS = {"full": ATTRACTION_COLUMNS, "card": CARD_COLUMNS}
+
+
+def build_add_query(user_id: int, attraction_id: int) -> Select:
+    """
+    Добавление в избранное одним выражением
+
+    target - активная достопримечательность, inserted - вставленная строка
+    (пусто при конфликте), counted - увеличение favorites_count. Нет строк -
+    достопримечательности нет; favorite_id NULL - она уже в избранном.
+    """
+    target = select(*ATTRACTION_COLUMNS).where(
+        Attraction.id == attraction_id,
+        Attraction.is_active == True
+    ).cte("target")
+    inserted = (
+        pg_insert(Favorite)
+        .from_select(["user_id", "attraction_id"], select(literal(user_id), target.c.id))
+        .on_conflict_do_nothing(constraint="unique_user_attraction")
+        .returning(Favorite.id, Favorite.attraction_id, Favorite.created_at)
+        .cte("inserted")
+    )
+    return select(
+        inserted.c.id.label("favorite_id"),
+        inserted.c.created_at.label("favorite_created_at"),
+        *[target.c[column.key] for column in ATTRACTION_COLUMNS],
+    ).select_from(target.outerjoin(inserted, true())).add_cte(
+        favorites_count_cte(select(inserted.c.attraction_id), 1)
+    )
+
+
+def build_batch_add_query(user_id: int, attraction_ids: list[int]) -> Select:
+    """Добавление активных достопримечательностей из списка; возвращает добавленные id"""
+    inserted = (
+        pg_insert(Favorite)
+        .from_select(
+            ["user_id", "attraction_id"],
+            select(literal(user_id), Attraction.id).where(
+                Attraction.id.in_(attraction_ids), Attraction.is_active == True
+            )
+        )
+        .on_conflict_do_nothing(constraint="unique_user_attraction")
+        .returning(Favorite.attraction_id)
+        .cte("inserted")
+    )
+    return select(inserted.c.attraction_id).add_cte(
+        favorites_count_cte(select(inserted.c.attraction_id), 1)
+    )
+
+
+def build_remove_query(user_id: int, attraction_ids: list[int]) -> Select:
+    """Удаление из избранного с уменьшением favorites_count; возвращает удаленные id"""
+    deleted = (
+        delete(Favorite)
+        .where(Favorite.user_id == user_id, Favorite.attraction_id.in_(attraction_ids))
+        .returning(Favorite.attraction_id)
+        .cte("deleted")
+    )
+    return select(deleted.c.attraction_id).add_cte(
+        favorites_count_cte(select(deleted.c.attraction_id), -1)
+    )
+
+
+def favorite_dict(row, view: str) -> dict:
+    """Строка избранного с вложенной достопримечательностью в форме FavoriteResponse/FavoriteCard"""
+    data = row._asdict()
+    attraction = {
+        column.key: data.pop(f"attraction__{column.key}") for column in VIEW_COLUMNS[view]
+    }
+    if view == "full":
+        attraction["is_favorite"] = True
+    data["attraction"] = attraction
+    return data
+
 
 @router.get("", response_model=FavoriteList)
+@query_budget(3)
 async def get_favorites(
+    page_size: int = Query(20, ge=1, le=100, description="Размер страницы"),
+    cursor: Optional[str] = Query(None, description="Курсор следующей страницы"),
+    view: Literal["full", "card"] = Query("full", description="Полная достопримечательность или карточка"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Получить список избранных достопримечательностей текущего пользователя"""
-    result = await db.execute(
-        select(Favorite)
-        .options(selectinload(Favorite.attraction))
+    """
+    Получить избранное текущего пользователя, новые первыми
+
+    Keyset-пагинация по (created_at, id) через ix_favorites_listing; total -
+    размер кэша id избранного (без COUNT по таблице).
+    """
+    labels = [column.label(f"attraction__{column.key}") for column in VIEW_COLUMNS[view]]
+    query = (
+        select(*FAVORITE_COLUMNS, *labels)
+        .join(Attraction, Favorite.attraction_id == Attraction.id)
         .where(Favorite.user_id == current_user.id)
-        .order_by(Favorite.created_at.desc())
+        .order_by(Favorite.created_at.desc(), Favorite.id.desc())
+        .limit(page_size + 1)
     )
-    favorites = result.scalars().all()
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        query = query.where(
+            tuple_(Favorite.created_at, Favorite.id) < tuple_(cursor_created_at, cursor_id)
+        )
 
-    return FavoriteList(
-        items=[FavoriteResponse.model_validate(fav) for fav in favorites],
-        total=len(favorites)
-    )
+    favorites = [favorite_dict(row, view) for row in await db.execute(query)]
+    ids = await favorite_id_cache.get(current_user.id, db)
+
+    next_cursor = None
+    if len(favorites) > page_size:
+        favorites = favorites[:page_size]
+        last = favorites[-1]
+        next_cursor = encode_cursor(last["created_at"], last["id"])
+
+    return FastJSONResponse({"items": favorites, "total": len(ids), "next_cursor": next_cursor})
+
+
+@router.get("/ids", response_model=FavoriteIds)
+@query_budget(2)
+async def get_favorite_ids(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Только id избранных достопримечательностей (для отметок на карточках)"""
+    etag = version_etag("favorite-ids", current_user.id, favorite_versions.version(current_user.id))
+    last_modified = favorite_versions.last_modified(current_user.id)
+    not_modified = conditional_get(request, response, etag, last_modified, private=True)
+    if not_modified:
+        return not_modified
+
+    ids = await favorite_id_cache.get(current_user.id, db)
+    return FastJSONResponse({"ids": ids.tolist()}, headers=response.headers)
 
 
 @router.post("", response_model=FavoriteResponse, status_code=201)
+@query_budget(2)
 async def add_to_favorites(
     favorite_data: FavoriteCreate,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Добавить достопримечательность в избранное"""
-    # Проверить существование достопримечательности
-    attraction_result = await db.execute(
-        select(Attraction).where(
-            Attraction.id == favorite_data.attraction_id,
-            Attraction.is_active == True
-        )
-    )
-    attraction = attraction_result.scalar_one_or_none()
+    result = await db.execute(build_add_query(current_user.id, favorite_data.attraction_id))
+    row = result.one_or_none()
 
-    if not attraction:
+    if not row:
         raise HTTPException(status_code=404, detail="Attraction not found")
 
-    # Проверить, не добавлена ли уже в избранное
-    existing_result = await db.execute(
-        select(Favorite).where(
-            Favorite.user_id == current_user.id,
-            Favorite.attraction_id == favorite_data.attraction_id
-        )
-    )
-    existing = existing_result.scalar_one_or_none()
-
-    if existing:
+    if row.favorite_id is None:
         raise HTTPException(status_code=400, detail="Already in favorites")
 
-    # Создать запись в избранном
-    favorite = Favorite(
-        user_id=current_user.id,
-        attraction_id=favorite_data.attraction_id
-    )
-    db.add(favorite)
+    changes.mark(db, "favorites", "insert", {
+        "user_id": current_user.id, "attraction_id": favorite_data.attraction_id
+    })
     await db.commit()
-    await db.refresh(favorite)
 
-    # Загрузить связанную достопримечательность
-    result = await db.execute(
-        select(Favorite)
-        .options(selectinload(Favorite.attraction))
-        .where(Favorite.id == favorite.id)
-    )
-    favorite_with_attraction = result.scalar_one()
+    attraction = row._asdict()
+    favorite = {
+        "id": attraction.pop("favorite_id"),
+        "user_id": current_user.id,
+        "attraction_id": favorite_data.attraction_id,
+        "created_at": attraction.pop("favorite_created_at"),
+        "attraction": {**attraction, "is_favorite": True},
+    }
+    return FastJSONResponse(favorite, status_code=201)
+
+
+@router.post("/batch", response_model=FavoriteBatchResult)
+@query_budget(3)
+async def update_favorites_batch(
+    batch: FavoriteBatch,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Добавить и удалить несколько достопримечательностей одной транзакцией
+
+    Неактивные и несуществующие id, а также уже добавленные или отсутствующие
+    в избранном пропускаются; в ответе - фактически измененные id.
+    """
+    if set(batch.add) & set(batch.remove):
+        raise HTTPException(status_code=400, detail="Same attraction in add and remove")
+
+    added, removed = [], []
+    if batch.remove:
+        result = await db.execute(build_remove_query(current_user.id, batch.remove))
+        removed = sorted(result.scalars())
+    if batch.add:
+        result = await db.execute(build_batch_add_query(current_user.id, batch.add))
+        added = sorted(result.scalars())
+
+    for op, attraction_ids in (("delete", removed), ("insert", added)):
+        for attraction_id in attraction_ids:
+            changes.mark(db, "favorites", op, {"user_id": current_user.id, "attraction_id": attraction_id})
+    await db.commit()
 
-    return FavoriteResponse.model_validate(favorite_with_attraction)
+    return FastJSONResponse({"added": added, "removed": removed})
 
 
 @router.delete("/{attraction_id}", status_code=204)
+@query_budget(2)
 async def remove_from_favorites(
     attraction_id: int,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Удалить достопримечательность из избранного"""
-    result = await db.execute(
-        select(Favorite).where(
-            Favorite.user_id == current_user.id,
-            Favorite.attraction_id == attraction_id
-        )
-    )
-    favorite = result.scalar_one_or_none()
+    result = await db.execute(build_remove_query(current_user.id, [attraction_id]))
 
-    if not favorite:
+    if result.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="Not in favorites")
 
-    await db.delete(favorite)
+    changes.mark(db, "favorites", "delete", {"user_id": current_user.id, "attraction_id": attraction_id})
     await db.commit()
 
     return None
@@ -0,0 +1,131 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_db
+from app.db.changes import changes
+from app.db.models.user import User
+from app.schemas.review import ReviewCreate, ReviewList, ReviewSaved
+from app.core.dependencies import get_current_user
+from app.core.http_cache import conditional_get, version_etag
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.responses import FastJSONResponse, row_dicts
+from app.core.query_budget import query_budget
+from app.services.reviews import (
+    build_create_query, build_delete_query, build_list_query, build_update_query, split_row
+)
+
+router = APIRouter()
+
+
+def mark_saved(row, op: str, db: AsyncSession) -> dict:
+    """Зарегистрировать изменение отзыва и средней оценки; возвращает тело ReviewSaved"""
+    review, attraction = split_row(row)
+    changes.mark(db, "reviews", op, review)
+    changes.mark(db, "attractions", "update", attraction)
+    return {
+        **review,
+        "attraction_rating": attraction["rating"],
+        "attraction_rating_count": attraction["rating_count"],
+    }
+
+
+@router.get("/{attraction_id}/reviews", response_model=ReviewList)
+@query_budget(1)
+async def get_reviews(
+    attraction_id: int,
+    request: Request,
+    response: Response,
+    page_size: int = Query(20, ge=1, le=100, description="Размер страницы"),
+    cursor: Optional[str] = Query(None, description="Курсор следующей страницы"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Отзывы о достопримечательности, новые первыми (keyset по created_at, id)"""
+    # Версия attractions: деактивация достопримечательности меняет ответ на 404
+    etag = version_etag(
+        "reviews", changes.version("reviews"), changes.version("attractions"), attraction_id, page_size, cursor
+    )
+    last_modified = max(changes.last_modified("reviews"), changes.last_modified("attractions"))
+    not_modified = conditional_get(request, response, etag, last_modified)
+    if not_modified:
+        return not_modified
+
+    after = decode_cursor(cursor) if cursor else None
+    rows = row_dicts(await db.execute(build_list_query(attraction_id, page_size + 1, after)))
+    if not rows:
+        raise HTTPException(status_code=404, detail="Attraction not found")
+    reviews = [row for row in rows if row["id"] is not None]
+
+    next_cursor = None
+    if len(reviews) > page_size:
+        reviews = reviews[:page_size]
+        last = reviews[-1]
+        next_cursor = encode_cursor(last["created_at"], last["id"])
+
+    return FastJSONResponse({"items": reviews, "next_cursor": next_cursor}, headers=response.headers)
+
+
+@router.post("/{attraction_id}/reviews", response_model=ReviewSaved, status_code=201)
+@query_budget(2)
+async def create_review(
+    attraction_id: int,
+    review_data: ReviewCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Оставить отзыв (один на пользователя); средняя оценка меняется тем же запросом"""
+    result = await db.execute(build_create_query(
+        current_user.id, attraction_id, review_data.rating, review_data.text
+    ))
+    row = result.one_or_none()
+
+    if not row:
+        raise HTTPException(status_code=404, detail="Attraction not found")
+
+    if row.id is None:
+        raise HTTPException(status_code=400, detail="Already reviewed")
+
+    review = mark_saved(row, "insert", db)
+    await db.commit()
+    return FastJSONResponse(review, status_code=201)
+
+
+@router.put("/{attraction_id}/reviews/me", response_model=ReviewSaved)
+@query_budget(2)
+async def update_review(
+    attraction_id: int,
+    review_data: ReviewCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Изменить свой отзыв"""
+    result = await db.execute(build_update_query(
+        current_user.id, attraction_id, review_data.rating, review_data.text
+    ))
+    row = result.one_or_none()
+
+    if not row:
+        raise HTTPException(status_code=404, detail="Review not found")
+
+    review = mark_saved(row, "update", db)
+    await db.commit()
+    return FastJSONResponse(review)
+
+
+@router.delete("/{attraction_id}/reviews/me", status_code=204)
+@query_budget(2)
+async def delete_review(
+    attraction_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Удалить свой отзыв"""
+    result = await db.execute(build_delete_query(current_user.id, attraction_id))
+    row = result.one_or_none()
+
+    if not row:
+        raise HTTPException(status_code=404, detail="Review not found")
+
+    mark_saved(row, "delete", db)
+    await db.commit()
+
+    return None
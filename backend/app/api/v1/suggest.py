@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Query, Request, Response
+from app.db.changes import changes
+from app.schemas.suggest import SuggestList
+from app.core.http_cache import conditional_get, version_etag
+from app.core.responses import FastJSONResponse
+from app.core.query_budget import query_budget
+from app.services.suggest_index import MAX_LIMIT, suggest_index
+
+router = APIRouter()
+
+
+@router.get("", response_model=SuggestList)
+@query_budget(0)
+async def suggest(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=100, description="Начало названия"),
+    limit: int = Query(10, ge=1, le=MAX_LIMIT, description="Максимум подсказок")
+):
+    """Подсказки по началу слов в названиях городов и достопримечательностей (без запросов к БД)"""
+    # Версия самого индекса: после массовых изменений он перестраивается в фоне
+    etag = version_etag(suggest_index.generation, "suggest", q, limit)
+    last_modified = max(changes.last_modified("cities"), changes.last_modified("attractions"))
+    not_modified = conditional_get(request, response, etag, last_modified)
+    if not_modified:
+        return not_modified
+
+    return FastJSONResponse(
+        {"items": suggest_index.suggest(q, limit), "query": q},
+        headers=response.headers
+    )
@@ -7,8 +7,12 @@ class Settings(BaseSettings):
     APP_NAME: str = "Tourist Telegram Mini App"
     APP_VERSION: str = "0.1.0"
     DEBUG: bool = False
+    ENVIRONMENT: str = "production"  # production, staging или development
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
+    PASSWORD_HASH_WORKERS: int = 2  # Воркеры пула bcrypt
+    PASSWORD_HASH_MAX_QUEUE: int = 32  # Сверх этого запросы на вход получают 503
+    PASSWORD_HASH_EXECUTOR: str = "thread"  # thread или process
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
 
@@ -17,6 +21,41 @@ class Settings(BaseSettings):
     POSTGRES_USER: str = "postgres"
     POSTGRES_PASSWORD: str = "postgres"
     POSTGRES_DB: str = "tourist_app"
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0  # Ожидание свободного соединения, секунды
+    DB_POOL_RECYCLE: int = 1800  # Пересоздание соединений старше N секунд (-1 - не пересоздавать)
+    DB_POOL_PRE_PING: bool = True
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100  # 0 - отключить (PgBouncer в режиме transaction)
+
+    # Кэширование
+    COUNT_CACHE_TTL_SECONDS: int = 300
+    CATALOG_CACHE_TTL_SECONDS: int = 3600
+    HTTP_CACHE_MAX_AGE: int = 60  # max-age для публичных ответов каталога
+    HTTP_CACHE_VERSION_TTL_SECONDS: int = 300  # ETag по версиям меняется не реже (записи других процессов)
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+    TOKEN_CACHE_MAX_SIZE: int = 10000
+    SEARCH_CACHE_TTL_SECONDS: int = 60
+    SEARCH_CACHE_MAX_SIZE: int = 1000
+    FAVORITE_IDS_CACHE_TTL_SECONDS: int = 600
+    FAVORITE_IDS_CACHE_MAX_SIZE: int = 10000
+    FAVORITE_VERSIONS_MAX_SIZE: int = 100000  # Пользователей с собственной версией избранного (ETag)
+
+    # Бюджет SQL-выражений на запрос (разработка и staging)
+    QUERY_BUDGET_MODE: str = "off"  # off, log или raise
+    QUERY_BUDGET_DEFAULT: int = 10  # Для маршрутов без @query_budget
+    QUERY_REPEAT_THRESHOLD: int = 3  # Столько одинаковых выражений за запрос - вероятный N+1
+
+    # Журнал медленных запросов
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0  # 0 - выключить
+    SLOW_QUERY_MAX_STATEMENTS: int = 500  # Различных нормализованных выражений в статистике
+    SLOW_QUERY_PLAN_BUFFER: int = 50  # Планы EXPLAIN в кольцевом буфере (кроме production)
+    SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS: int = 300  # Не чаще одного EXPLAIN на выражение
+
+    # Профилирование запросов администратора (X-Profile)
+    PROFILE_DIR: str = "/tmp/profiles"
+    PROFILE_KEEP: int = 20  # Сколько последних профилей хранить на диске
 
     # Telegram Bot API
     TELEGRAM_BOT_TOKEN: str
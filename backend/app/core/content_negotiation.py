@@ -0,0 +1,158 @@
+"""
+Согласование формата ответов /api/v1 по заголовку Accept
+
+JSON остается форматом по умолчанию; MessagePack отдается, если клиент
+указал application/msgpack (или application/x-msgpack) с q не ниже, чем
+у application/json. Обработчики ничего не знают о формате:
+
+- FastJSONResponse кодирует тело сразу в MessagePack (см. response_format);
+- прочие JSON-ответы (готовые байты каталога городов, ошибки, ответы
+  FastAPI по умолчанию) перекодируются здесь из JSON.
+
+Представления различаются ETag (суффикс MSGPACK_ETAG_SUFFIX; во входящем
+If-None-Match он снимается, поэтому обработчики сравнивают свои ETag), а
+ответы получают Vary: Accept.
+"""
+from typing import List, Optional, Tuple
+
+import orjson
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.responses import MSGPACK_MEDIA_TYPE, dump_msgpack, response_format
+
+API_PREFIX = "/api/v1"
+MSGPACK_MEDIA_TYPES = {MSGPACK_MEDIA_TYPE, "application/x-msgpack"}
+MSGPACK_ETAG_SUFFIX = "-msgpack"
+
+Headers = List[Tuple[bytes, bytes]]
+
+
+def media_quality(accept: str) -> Tuple[float, float]:
+    """(q для MessagePack, q для JSON) из заголовка Accept"""
+    msgpack_q = json_q = 0.0
+    for media_range in accept.split(","):
+        media_type, *params = [part.strip() for part in media_range.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        media_type = media_type.lower()
+        if media_type in MSGPACK_MEDIA_TYPES:
+            msgpack_q = max(msgpack_q, quality)
+        elif media_type == "application/json":
+            json_q = max(json_q, quality)
+    return msgpack_q, json_q
+
+
+def wants_msgpack(accept: Optional[str]) -> bool:
+    """Запрошен ли MessagePack (явно и не ниже JSON)"""
+    if not accept:
+        return False
+    msgpack_q, json_q = media_quality(accept)
+    return msgpack_q > 0 and msgpack_q >= json_q
+
+
+def _header(headers: Headers, name: bytes) -> Optional[bytes]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _without(headers: Headers, *names: bytes) -> Headers:
+    return [(key, value) for key, value in headers if key.lower() not in names]
+
+
+def _add_vary(headers: Headers) -> Headers:
+    vary = _header(headers, b"vary")
+    if vary is None:
+        return [*headers, (b"vary", b"Accept")]
+    if b"accept" in [part.strip().lower() for part in vary.split(b",")]:
+        return headers
+    return [*_without(headers, b"vary"), (b"vary", vary + b", Accept")]
+
+
+class ContentNegotiationMiddleware:
+    """JSON или MessagePack для маршрутов /api/v1 по Accept"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(API_PREFIX):
+            await self.app(scope, receive, send)
+            return
+
+        accept = _header(scope["headers"], b"accept")
+        msgpack = wants_msgpack(accept.decode("latin-1") if accept else None)
+        if not msgpack:
+            await self.app(scope, receive, self._json_sender(send))
+            return
+
+        if_none_match = _header(scope["headers"], b"if-none-match")
+        if if_none_match is not None:
+            stripped = if_none_match.replace(MSGPACK_ETAG_SUFFIX.encode() + b'"', b'"')
+            # Тот же scope, а не копия: маршрутизатор записывает в него route,
+            # который читают внешние middleware (метрики, бюджет, медленные запросы)
+            scope["headers"] = [*_without(scope["headers"], b"if-none-match"), (b"if-none-match", stripped)]
+
+        token = response_format.set("msgpack")
+        try:
+            await self.app(scope, receive, self._msgpack_sender(send))
+        finally:
+            response_format.reset(token)
+
+    @staticmethod
+    def _json_sender(send: Send) -> Send:
+        async def send_json(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = _add_vary(list(message.get("headers", ())))
+            await send(message)
+        return send_json
+
+    @staticmethod
+    def _msgpack_sender(send: Send) -> Send:
+        start: Optional[Message] = None
+        chunks: List[bytes] = []
+
+        async def send_msgpack(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                headers = _add_vary(list(message.get("headers", ())))
+                etag = _header(headers, b"etag")
+                if etag is not None and etag.endswith(b'"'):
+                    tagged = etag[:-1] + MSGPACK_ETAG_SUFFIX.encode() + b'"'
+                    headers = [*_without(headers, b"etag"), (b"etag", tagged)]
+                message["headers"] = headers
+
+                content_type = _header(headers, b"content-type") or b""
+                if content_type.split(b";")[0].strip() == b"application/json":
+                    # JSON, закодированный в обход FastJSONResponse: перекодировать целиком
+                    start = message
+                    return
+                await send(message)
+                return
+
+            if start is None:
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            body = b"".join(chunks)
+            if body:
+                body = dump_msgpack(orjson.loads(body))
+            start["headers"] = [
+                *_without(start["headers"], b"content-type", b"content-length"),
+                (b"content-type", MSGPACK_MEDIA_TYPE.encode()),
+                (b"content-length", str(len(body)).encode()),
+            ]
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        return send_msgpack
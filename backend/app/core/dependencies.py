@@ -6,11 +6,38 @@ from sqlalchemy import select
 
 from app.db.session import get_db
 from app.db.models.user import User
-from app.core.security import verify_token
+from app.core.security import verify_access_token_cached, get_token_subject
+from app.services.principal_cache import principal_cache
 
 security = HTTPBearer()
 
 
+async def load_principal(token: str, db: AsyncSession) -> Optional[User]:
+    """
+    Пользователь по access token
+
+    Токен декодируется один раз до истечения, пользователь берется из кэша,
+    поэтому в установившемся режиме запрос к таблице users не выполняется.
+    Проверку is_active выполняет вызывающий.
+    """
+    payload = verify_access_token_cached(token)
+    if payload is None:
+        return None
+
+    user_id = get_token_subject(payload)
+    if user_id is None:
+        return None
+
+    user = principal_cache.get(user_id)
+    if user is None:
+        result = await db.execute(select(User).where(User.id == user_id))
+        user = result.scalar_one_or_none()
+        if user is not None:
+            principal_cache.set(user)
+
+    return user
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db)
@@ -34,18 +61,7 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    token = credentials.credentials
-    payload = verify_token(token, token_type="access")
-    
-    if payload is None:
-        raise credentials_exception
-    
-    user_id: Optional[int] = payload.get("sub")
-    if user_id is None:
-        raise credentials_exception
-    
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    user = await load_principal(credentials.credentials, db)
     
     if user is None:
         raise credentials_exception
@@ -77,18 +93,7 @@ async def get_current_user_optional(
     if not credentials:
         return None
 
-    token = credentials.credentials
-    payload = verify_token(token, token_type="access")
-
-    if payload is None:
-        return None
-
-    user_id: Optional[int] = payload.get("sub")
-    if user_id is None:
-        return None
-
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    user = await load_principal(credentials.credentials, db)
 
     if user is None or not user.is_active:
         return None
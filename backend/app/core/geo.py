@@ -0,0 +1,138 @@
+"""
+Геопространственные вычисления без PostGIS
+
+Ячейка точки - Z-order (Morton) код: широта и долгота квантуются в
+CELL_BITS бит каждая, биты чередуются. Ячейка уровня L (L бит на ось) -
+это общий префикс кодов, то есть непрерывный диапазон целых чисел, поэтому
+поиск по области сводится к нескольким диапазонам по btree-индексу.
+Точное расстояние считается формулой гаверсинуса над массивами NumPy.
+"""
+import math
+from typing import List, Tuple
+
+import numpy as np
+
+CELL_BITS = 26  # ~0.3 м по широте на максимальном уровне
+EARTH_RADIUS_M = 6_371_008.8
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS_M / 180
+# Сколько ячеек может пересекать квадрат вокруг круга (число диапазонов в запросе)
+MAX_COVERING_CELLS = 16
+
+
+def _spread(value: int) -> int:
+    """Разнести биты числа через один (0b111 -> 0b10101)"""
+    value &= 0x3FFFFFF
+    value = (value | (value << 16)) & 0x0000FFFF0000FFFF
+    value = (value | (value << 8)) & 0x00FF00FF00FF00FF
+    value = (value | (value << 4)) & 0x0F0F0F0F0F0F0F0F
+    value = (value | (value << 2)) & 0x3333333333333333
+    value = (value | (value << 1)) & 0x5555555555555555
+    return value
+
+
+def grid_cell(lat: float, lon: float, level: int) -> Tuple[int, int]:
+    """Координаты ячейки уровня level (x - долгота, y - широта)"""
+    size = 1 << level
+    x = min(int((lon + 180.0) / 360.0 * size), size - 1)
+    y = min(int((lat + 90.0) / 180.0 * size), size - 1)
+    return x, y
+
+
+def geo_cell(lat: float, lon: float) -> int:
+    """Morton-код точки на максимальном уровне"""
+    x, y = grid_cell(lat, lon, CELL_BITS)
+    return _spread(x) | (_spread(y) << 1)
+
+
+def _cos_at(lat: float) -> float:
+    """Косинус широты (в градусах), не меньше 1e-6 у полюса"""
+    return max(math.cos(math.radians(lat)), 1e-6)
+
+
+def _point_distance_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Расстояние по сфере между двумя точками в метрах"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (
+        math.sin((phi2 - phi1) / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(min(a, 1.0)))
+
+
+def _cell_distance_m(lat: float, lon: float, south: float, north: float, west: float, east: float) -> float:
+    """
+    Расстояние по сфере от точки до ближайшей точки ячейки
+
+    Равнопромежуточная оценка (долгота * cos широты) у полюса завышает
+    расстояние из-за схождения меридианов и отбрасывала бы задетые ячейки.
+    """
+    if (lon - west) % 360.0 <= east - west:
+        # Точка в полосе долгот ячейки: ближайшая точка на ее меридиане
+        return max(south - lat, 0.0, lat - north) * METERS_PER_DEGREE
+
+    distance = math.inf
+    for edge in (west, east):
+        # Основание перпендикуляра на меридиан края; за 90 градусов - ближний полюс
+        cos_delta = math.cos(math.radians(lon - edge))
+        if cos_delta > 0:
+            foot = math.degrees(math.atan(math.tan(math.radians(lat)) / cos_delta))
+        else:
+            foot = math.copysign(90.0, lat)
+        nearest = min(max(foot, south), north)
+        distance = min(distance, _point_distance_m(lat, lon, nearest, edge))
+    return distance
+
+
+def covering_ranges(lat: float, lon: float, radius_m: float) -> List[Tuple[int, int]]:
+    """
+    Диапазоны geo_cell [lo, hi), покрывающие круг radius_m вокруг точки
+
+    Берется самый мелкий уровень, на котором описанный квадрат пересекает
+    не больше MAX_COVERING_CELLS ячеек; ячейки дальше radius_m по сфере
+    отбрасываются, соседние диапазоны объединяются.
+    """
+    lat_span = radius_m / METERS_PER_DEGREE
+    lat_lo, lat_hi = max(lat - lat_span, -90.0), min(lat + lat_span, 90.0)
+    # Градус долготы короче всего у края круга, ближнего к полюсу
+    lon_span = min(lat_span / _cos_at(max(abs(lat_lo), abs(lat_hi))), 180.0)
+
+    for level in range(CELL_BITS, -1, -1):
+        size = 1 << level
+        # Долготы за антимеридианом сворачиваются по модулю числа ячеек ниже
+        x0 = math.floor((lon - lon_span + 180.0) / 360.0 * size)
+        x1 = min(math.floor((lon + lon_span + 180.0) / 360.0 * size), x0 + size - 1)
+        y0, y1 = grid_cell(lat_lo, 0.0, level)[1], grid_cell(lat_hi, 0.0, level)[1]
+        if (x1 - x0 + 1) * (y1 - y0 + 1) <= MAX_COVERING_CELLS:
+            break
+
+    cell_lon, cell_lat = 360.0 / size, 180.0 / size
+    # Запас только на округление: расстояние до ячейки точное
+    limit = radius_m * 1.001
+    prefixes = []
+    for y in range(y0, y1 + 1):
+        south = y * cell_lat - 90.0
+        for x in range(x0, x1 + 1):
+            west = x * cell_lon - 180.0
+            if _cell_distance_m(lat, lon, south, south + cell_lat, west, west + cell_lon) <= limit:
+                prefixes.append(_spread(x % size) | (_spread(y) << 1))
+
+    shift = 2 * (CELL_BITS - level)
+    ranges: List[Tuple[int, int]] = []
+    for prefix in sorted(prefixes):
+        lo, hi = prefix << shift, (prefix + 1) << shift
+        if ranges and ranges[-1][1] == lo:
+            ranges[-1] = (ranges[-1][0], hi)
+        else:
+            ranges.append((lo, hi))
+    return ranges
+
+
+def haversine_m(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Расстояния в метрах от точки до массива точек"""
+    lat1, lon1 = math.radians(lat), math.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
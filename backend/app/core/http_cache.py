@@ -0,0 +1,125 @@
+"""
+Условные GET-запросы (ETag / Last-Modified) и заголовки Cache-Control
+"""
+import hashlib
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response
+
+from app.core.config import settings
+from app.db.changes import changes
+
+
+def make_etag(body: bytes) -> str:
+    """Сильный ETag по содержимому ответа"""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def version_epoch() -> int:
+    """
+    Номер текущего интервала HTTP_CACHE_VERSION_TTL_SECONDS
+
+    Версии ChangeTracker видят только записи этого процесса; изменения из
+    других воркеров, скриптов и прямого SQL они пропускают. Эпоха ограничивает
+    время, в течение которого такие изменения отвечают 304.
+    """
+    return int(time.time() // settings.HTTP_CACHE_VERSION_TTL_SECONDS)
+
+
+def version_etag(*parts: Any) -> str:
+    """
+    ETag по версиям данных и параметрам запроса, без сериализации ответа
+
+    Версии ChangeTracker сбрасываются при перезапуске, поэтому в ETag
+    входит boot_id процесса, а также эпоха (version_epoch).
+    """
+    raw = "|".join(str(part) for part in (changes.boot_id, version_epoch(), *parts))
+    return make_etag(raw.encode())
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Проверка заголовка If-None-Match на совпадение с ETag"""
+    if not if_none_match:
+        return False
+
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    if "*" in candidates:
+        return True
+
+    # Для If-None-Match используется слабое сравнение (RFC 9110)
+    bare_etag = etag.removeprefix("W/")
+    return any(tag.removeprefix("W/") == bare_etag for tag in candidates)
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[float] = None) -> bool:
+    """
+    Актуальна ли у клиента закэшированная версия
+
+    If-None-Match имеет приоритет; If-Modified-Since проверяется только без него.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        return etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(last_modified) <= since
+
+    return False
+
+
+def cache_headers(etag: str, last_modified: Optional[float] = None, private: bool = False) -> Dict[str, str]:
+    """
+    Заголовки кэширования ответа
+
+    Args:
+        etag: ETag ответа
+        last_modified: Время изменения данных (unix time)
+        private: Ответ содержит персональные данные (is_favorite) - только кэш клиента
+            с обязательной перепроверкой; иначе допускается общий кэш на HTTP_CACHE_MAX_AGE
+    """
+    if private:
+        cache_control = "private, no-cache"
+    else:
+        cache_control = f"public, max-age={settings.HTTP_CACHE_MAX_AGE}"
+
+    headers = {
+        "ETag": etag,
+        "Cache-Control": cache_control,
+        "Vary": "Authorization",
+    }
+    if last_modified is not None:
+        headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+    return headers
+
+
+def conditional_get(
+    request: Request,
+    response: Response,
+    etag: str,
+    last_modified: Optional[float] = None,
+    private: bool = False
+) -> Optional[Response]:
+    """
+    Проставить заголовки кэширования и проверить условный запрос
+
+    Returns:
+        Ответ 304, если у клиента актуальная версия, иначе None
+        (заголовки уже добавлены в response обработчика)
+    """
+    if last_modified is not None:
+        # Не раньше начала эпохи: If-Modified-Since устаревает вместе с ETag
+        last_modified = max(last_modified, version_epoch() * settings.HTTP_CACHE_VERSION_TTL_SECONDS)
+
+    headers = cache_headers(etag, last_modified, private)
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,177 @@
+"""
+Метрики Prometheus
+
+MetricsMiddleware - чистый ASGI middleware. Гистограммы запросов копятся в
+простых списках (как PoolMetrics) без блокировок prometheus_client: весь код
+выполняется в одном event loop, а в объекты Prometheus они превращаются только
+при сборе метрик. Маршрут берется из шаблона (scope["route"].path), а не из
+URL, чтобы число серий не росло с числом id. Стоимость запроса к БД
+дополнительно отдается в заголовке Server-Timing.
+"""
+import time
+from bisect import bisect_left
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+from prometheus_client.core import (
+    CounterMetricFamily,
+    GaugeMetricFamily,
+    HistogramMetricFamily,
+    Metric,
+)
+from prometheus_client.registry import Collector
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.db.instrumentation import RequestStats, request_stats
+from app.db.pool import pool_metrics, pool_status
+
+# Маршрут для запросов, не сопоставленных ни с одним роутом (404)
+UNMATCHED_ROUTE = "unmatched"
+
+
+class LabeledHistogram:
+    """Гистограмма с метками: серия на каждый набор значений меток"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], buckets: Tuple[float, ...]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = list(labelnames)
+        self.buckets = buckets
+        self._series: Dict[tuple, list] = {}
+
+    def observe(self, labels: tuple, value: float) -> None:
+        """Учесть значение в серии labels"""
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def collect(self) -> Metric:
+        """Серии в виде HistogramMetricFamily"""
+        family = HistogramMetricFamily(self.name, self.documentation, labels=self.labelnames)
+        for labels, (counts, total) in list(self._series.items()):
+            cumulative = 0
+            buckets: List[Tuple[str, float]] = []
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                buckets.append((str(bound), cumulative))
+            family.add_metric(list(labels), buckets, total)
+        return family
+
+
+REQUEST_LATENCY = LabeledHistogram(
+    "http_request_duration_seconds",
+    "Время обработки HTTP-запроса",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+REQUEST_DB_STATEMENTS = LabeledHistogram(
+    "http_request_db_statements",
+    "Число SQL-выражений на HTTP-запрос",
+    ["route"],
+    buckets=(0, 1, 2, 3, 4, 5, 7, 10, 15, 25, 50),
+)
+REQUEST_DB_SECONDS = LabeledHistogram(
+    "http_request_db_seconds",
+    "Суммарное время SQL-выражений на HTTP-запрос",
+    ["route"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+
+def route_template(scope: Scope) -> str:
+    """Шаблон пути маршрута, обработавшего запрос"""
+    route = scope.get("route")
+    return getattr(route, "path", UNMATCHED_ROUTE)
+
+
+class MetricsMiddleware:
+    """Задержка запросов по маршруту и статусу, число и время SQL-выражений"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = request_stats.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                timing = f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.statements} queries"'
+                message["headers"] = [*message.get("headers", ()), (b"server-timing", timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_stats.reset(token)
+            route = route_template(scope)
+            REQUEST_LATENCY.observe((scope["method"], route, str(status_code)), time.perf_counter() - started)
+            REQUEST_DB_STATEMENTS.observe((route,), stats.statements)
+            REQUEST_DB_SECONDS.observe((route,), stats.db_seconds)
+
+
+class RuntimeCollector(Collector):
+    """Гистограммы запросов и снимок пулов (БД, bcrypt) в момент сбора метрик"""
+
+    def __init__(self, engine: Any, password_hasher: Any):
+        self.engine = engine
+        self.password_hasher = password_hasher
+
+    def collect(self) -> Iterator[Metric]:
+        yield REQUEST_LATENCY.collect()
+        yield REQUEST_DB_STATEMENTS.collect()
+        yield REQUEST_DB_SECONDS.collect()
+
+        pool = pool_status(self.engine.pool)
+        for key in ("size", "max_overflow", "checked_out", "idle", "overflow", "saturation"):
+            if key in pool:
+                yield GaugeMetricFamily(f"db_pool_{key}", f"Пул соединений: {key}", value=pool[key])
+
+        buckets = list(pool_metrics.histogram().items())
+        yield HistogramMetricFamily(
+            "db_pool_wait_seconds",
+            "Время ожидания соединения из пула",
+            buckets=buckets,
+            sum_value=pool_metrics.wait_seconds_total,
+        )
+        yield CounterMetricFamily(
+            "db_pool_overflow_events", "Соединения, открытые сверх pool_size",
+            value=pool_metrics.overflow_events,
+        )
+        yield CounterMetricFamily(
+            "db_pool_timeouts", "Таймауты ожидания соединения", value=pool_metrics.timeouts,
+        )
+
+        hasher = self.password_hasher.stats()
+        for key in ("workers", "in_flight", "queue_depth"):
+            yield GaugeMetricFamily(f"password_hasher_{key}", f"Пул bcrypt: {key}", value=hasher[key])
+        for key in ("completed", "rejected"):
+            yield CounterMetricFamily(f"password_hasher_{key}", f"Пул bcrypt: {key}", value=hasher[key])
+        yield HistogramMetricFamily(
+            "password_hasher_hash_seconds",
+            "Время bcrypt в воркере пула",
+            buckets=list(self.password_hasher.hash_histogram().items()),
+            sum_value=self.password_hasher.hash_seconds_total,
+        )
+        yield HistogramMetricFamily(
+            "password_hasher_wait_seconds",
+            "Время ожидания свободного воркера bcrypt",
+            buckets=list(self.password_hasher.wait_histogram().items()),
+            sum_value=self.password_hasher.wait_seconds_total,
+        )
+
+
+def metrics_response() -> Response:
+    """Текущие метрики в текстовом формате Prometheus"""
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,77 @@
+import base64
+import json
+import math
+from datetime import datetime
+from typing import Any, Tuple, Type, Union
+
+from fastapi import HTTPException, status
+
+
+# Значение ключа сортировки в курсоре: created_at, счетчик или рейтинг
+CursorValue = Union[datetime, int, float]
+
+# Диапазон колонок Integer (int4): id и счетчики
+INT_MIN, INT_MAX = -2 ** 31, 2 ** 31 - 1
+
+
+def encode_cursor(sort_value: CursorValue, item_id: int, sort: str = "newest") -> str:
+    """Кодирование позиции (значение сортировки, id) в непрозрачный курсор сортировки sort"""
+    value = sort_value.isoformat() if isinstance(sort_value, datetime) else sort_value
+    raw = json.dumps([sort, value, item_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, value_type: Type = datetime, sort: str = "newest") -> Tuple[CursorValue, int]:
+    """
+    Декодирование курсора обратно в (значение сортировки, id)
+
+    Args:
+        cursor: Курсор из encode_cursor
+        value_type: Тип значения сортировки (datetime, int или float)
+        sort: Сортировка, с которой курсор должен быть выдан
+
+    Raises:
+        HTTPException: Если курсор поврежден, подделан или выдан для другой сортировки
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, value, item_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise _invalid_cursor()
+    if cursor_sort != sort:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor does not match sort"
+        )
+
+    try:
+        return _sort_value(value, value_type), _integer(item_id)
+    except (ValueError, TypeError):
+        raise _invalid_cursor()
+
+
+def _invalid_cursor() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid cursor"
+    )
+
+
+def _integer(value: Any) -> int:
+    # bool - подкласс int, float (4.7) молча округлился бы
+    if type(value) is not int or not INT_MIN <= value <= INT_MAX:
+        raise ValueError(value)
+    return value
+
+
+def _sort_value(value: Any, value_type: Type) -> CursorValue:
+    if value_type is datetime:
+        if not isinstance(value, str):
+            raise TypeError(value)
+        return datetime.fromisoformat(value)
+    if value_type is int:
+        return _integer(value)
+    # json принимает 1e309, Infinity и NaN
+    if type(value) not in (int, float) or not math.isfinite(value):
+        raise ValueError(value)
+    return float(value)
@@ -0,0 +1,200 @@
+"""
+Профилирование отдельного запроса по требованию администратора
+
+Запрос с заголовком X-Profile (или параметром _profile) и токеном
+администратора выполняется под cProfile. Режимы:
+    store    - профиль сохраняется в кольцо файлов PROFILE_DIR
+               (последние PROFILE_KEEP), id возвращается в X-Profile-Id;
+    download - вместо ответа отдается файл .pstats.
+Файлы открываются `python -m pstats`, snakeviz или конвертером в speedscope.
+
+Без заголовка middleware только проверяет его наличие. cProfile видит весь
+код потока, поэтому в профиль попадают и параллельные запросы того же
+event loop; одновременно профилируется не больше одного запроса.
+"""
+import asyncio
+import cProfile
+import os
+import re
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs
+
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.dependencies import get_current_admin_user, get_current_user
+from app.db.session import AsyncSessionLocal
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_QUERY = "_profile"
+PROFILE_MODES = ("store", "download")
+PROFILE_SUFFIX = ".pstats"
+
+_PROFILE_ID = re.compile(r"^[\w.-]+$")
+
+
+class ProfileStore:
+    """Кольцо файлов профилей на диске"""
+
+    def __init__(self, directory: str, keep: int):
+        self.directory = Path(directory)
+        self.keep = keep
+
+    def path(self, profile_id: str) -> Optional[Path]:
+        """Путь к профилю или None, если его нет"""
+        if not _PROFILE_ID.match(profile_id):
+            return None
+        path = self.directory / f"{profile_id}{PROFILE_SUFFIX}"
+        return path if path.is_file() else None
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Профили, новые первыми"""
+        if not self.directory.is_dir():
+            return []
+        files = sorted(self.directory.glob(f"*{PROFILE_SUFFIX}"), key=os.path.getmtime, reverse=True)
+        return [
+            {
+                "id": path.name[:-len(PROFILE_SUFFIX)],
+                "size": path.stat().st_size,
+                "created_at": path.stat().st_mtime,
+            }
+            for path in files
+        ]
+
+    def save(self, profile_id: str, profiler: cProfile.Profile) -> Path:
+        """Сохранить профиль и удалить самые старые сверх keep"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{profile_id}{PROFILE_SUFFIX}"
+        profiler.dump_stats(path)
+
+        files = sorted(self.directory.glob(f"*{PROFILE_SUFFIX}"), key=os.path.getmtime, reverse=True)
+        for stale in files[self.keep:]:
+            stale.unlink(missing_ok=True)
+        return path
+
+
+profile_store = ProfileStore(settings.PROFILE_DIR, settings.PROFILE_KEEP)
+
+
+def requested_mode(scope: Scope) -> Optional[str]:
+    """Режим профилирования из заголовка или параметра запроса"""
+    for name, value in scope["headers"]:
+        if name == PROFILE_HEADER:
+            mode = value.decode("latin-1").strip().lower()
+            return mode if mode in PROFILE_MODES else "store"
+
+    query_string = scope.get("query_string", b"")
+    if PROFILE_QUERY.encode() in query_string:
+        values = parse_qs(query_string.decode("latin-1")).get(PROFILE_QUERY)
+        if values:
+            mode = values[0].lower()
+            return mode if mode in PROFILE_MODES else "store"
+    return None
+
+
+async def is_admin_request(scope: Scope) -> bool:
+    """Токен запроса принадлежит активному администратору"""
+    authorization = next(
+        (value.decode("latin-1") for name, value in scope["headers"] if name == b"authorization"),
+        ""
+    )
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+
+    credentials = HTTPAuthorizationCredentials(scheme=scheme, credentials=token)
+    async with AsyncSessionLocal() as db:
+        try:
+            await get_current_admin_user(await get_current_user(credentials, db))
+        except HTTPException:
+            return False
+    return True
+
+
+def profile_name(scope: Scope) -> str:
+    """Имя профиля: время, метод и путь запроса"""
+    path = re.sub(r"[^\w-]+", "_", scope["path"]).strip("_") or "root"
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{scope['method'].lower()}-{path[:60]}-{uuid.uuid4().hex[:6]}"
+
+
+class ProfilerMiddleware:
+    """cProfile для запросов администратора с X-Profile"""
+
+    def __init__(self, app: ASGIApp, store: ProfileStore = profile_store):
+        self.app = app
+        self.store = store
+        self._busy = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        mode = requested_mode(scope)
+        if mode is None or self._busy or not await is_admin_request(scope):
+            await self.app(scope, receive, send)
+            return
+        if self._busy:
+            # Пока проверялся токен, профилирование начал другой запрос
+            await self.app(scope, receive, send)
+            return
+
+        self._busy = True
+        profile_id = profile_name(scope)
+        profiler = cProfile.Profile()
+        try:
+            if mode == "download":
+                await self._download(scope, receive, send, profiler, profile_id)
+            else:
+                await self._store(scope, receive, send, profiler, profile_id)
+        finally:
+            self._busy = False
+
+    async def _store(self, scope: Scope, receive: Receive, send: Send,
+                     profiler: cProfile.Profile, profile_id: str) -> None:
+        async def send_with_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), (b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profiler.disable()
+            await asyncio.to_thread(self.store.save, profile_id, profiler)
+
+    async def _download(self, scope: Scope, receive: Receive, send: Send,
+                        profiler: cProfile.Profile, profile_id: str) -> None:
+        status_code = 500
+
+        async def discard(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+
+        profiler.enable()
+        try:
+            await self.app(scope, receive, discard)
+        finally:
+            profiler.disable()
+
+        path = await asyncio.to_thread(self.store.save, profile_id, profiler)
+        body = await asyncio.to_thread(path.read_bytes)
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"application/octet-stream"),
+                (b"content-length", str(len(body)).encode()),
+                (b"content-disposition", f'attachment; filename="{path.name}"'.encode()),
+                (b"x-profile-id", profile_id.encode()),
+                (b"x-profile-status", str(status_code).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,124 @@
+"""
+Бюджет SQL-выражений на запрос (для разработки и staging)
+
+Маршрут объявляет бюджет декоратором @query_budget(n). При
+QUERY_BUDGET_MODE=log|raise QueryBudgetMiddleware перед отправкой ответа
+сверяет число выражений с бюджетом и ищет одинаковые выражения, повторенные
+QUERY_REPEAT_THRESHOLD раз и более (вероятный N+1). В режиме log нарушения
+пишутся в лог, в режиме raise запрос завершается ошибкой.
+При QUERY_BUDGET_MODE=off middleware не подключается и ничего не стоит.
+"""
+import logging
+from typing import Any, Callable, List, Optional, TypeVar
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.db.instrumentation import RequestStats, request_stats
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+BUDGET_ATTRIBUTE = "__query_budget__"
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """Маршрут превысил бюджет SQL-выражений или выполнил N+1"""
+
+
+def query_budget(max_statements: int) -> Callable[[F], F]:
+    """Объявить максимальное число SQL-выражений для обработчика маршрута"""
+    def decorator(func: F) -> F:
+        setattr(func, BUDGET_ATTRIBUTE, max_statements)
+        return func
+    return decorator
+
+
+def route_budget(route: Any) -> Optional[int]:
+    """Объявленный бюджет маршрута или None"""
+    return getattr(getattr(route, "endpoint", None), BUDGET_ATTRIBUTE, None)
+
+
+def budget_violations(route_path: str, budget: int, stats: RequestStats,
+                      repeat_threshold: int) -> List[str]:
+    """Описания нарушений бюджета и повторяющихся выражений"""
+    violations = []
+    if stats.statements > budget:
+        violations.append(f"{route_path}: {stats.statements} SQL statements, budget {budget}")
+
+    for statement, count in (stats.statement_counts or {}).items():
+        if count >= repeat_threshold:
+            violations.append(
+                f"{route_path}: statement executed {count} times (possible N+1): "
+                f"{' '.join(statement.split())[:200]}"
+            )
+    return violations
+
+
+class QueryBudgetMiddleware:
+    """Проверка бюджета SQL-выражений; подключается внутри MetricsMiddleware"""
+
+    def __init__(self, app: ASGIApp, mode: str = "log", default_budget: int = 10,
+                 repeat_threshold: int = 3):
+        self.app = app
+        self.mode = mode
+        self.default_budget = default_budget
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = request_stats.get()
+        token = None
+        if stats is None:
+            stats = RequestStats(scope)
+            token = request_stats.set(stats)
+        stats.statement_counts = {}
+
+        async def send_checked(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                self.check(scope, stats)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_checked)
+        finally:
+            if token is not None:
+                request_stats.reset(token)
+
+    def check(self, scope: Scope, stats: RequestStats) -> None:
+        """Сообщить о нарушениях (до отправки ответа, чтобы в режиме raise вернуть 500)"""
+        route = scope.get("route")
+        if route is None:
+            return
+
+        budget = route_budget(route)
+        violations = budget_violations(
+            route.path,
+            self.default_budget if budget is None else budget,
+            stats,
+            self.repeat_threshold,
+        )
+        if not violations:
+            return
+
+        for violation in violations:
+            logger.warning("Query budget: %s", violation)
+        if self.mode == "raise":
+            raise QueryBudgetExceeded("; ".join(violations))
+
+
+def install_query_budget(app: Any) -> None:
+    """Подключить проверку бюджета, если она включена в настройках"""
+    if settings.QUERY_BUDGET_MODE == "off":
+        return
+
+    app.add_middleware(
+        QueryBudgetMiddleware,
+        mode=settings.QUERY_BUDGET_MODE,
+        default_budget=settings.QUERY_BUDGET_DEFAULT,
+        repeat_threshold=settings.QUERY_REPEAT_THRESHOLD,
+    )
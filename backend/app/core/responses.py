@@ -0,0 +1,52 @@
+"""
+Быстрая сериализация ответов без повторного прохода через Pydantic
+
+JSON (orjson) по умолчанию; MessagePack (ormsgpack), если клиент запросил
+его в Accept (см. app.core.content_negotiation).
+"""
+from contextvars import ContextVar
+from typing import Any, Dict, List
+
+import orjson
+import ormsgpack
+from fastapi import Response
+from sqlalchemy.engine import Result
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+# Формат ответа текущего запроса: json или msgpack
+response_format: ContextVar[str] = ContextVar("response_format", default="json")
+
+
+def dump_json(content: Any) -> bytes:
+    """Кодирование в JSON-байты (datetime в UTC выводится с суффиксом Z, как в Pydantic)"""
+    return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+
+
+def dump_msgpack(content: Any) -> bytes:
+    """Кодирование в MessagePack; datetime - строкой ISO 8601, как в JSON"""
+    return ormsgpack.packb(content, option=ormsgpack.OPT_UTC_Z)
+
+
+def row_dicts(result: Result) -> List[Dict[str, Any]]:
+    """Строки Core-запроса в виде словарей"""
+    return [row._asdict() for row in result]
+
+
+class FastJSONResponse(Response):
+    """
+    JSON-ответ для уже готовых dict/list, кодируемый orjson
+
+    Возвращается из обработчика напрямую, поэтому response_model
+    используется только для документации и не валидирует данные.
+    Если запрос согласован на MessagePack, тело сразу кодируется в него
+    (без промежуточного JSON).
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if response_format.get() == "msgpack":
+            self.media_type = MSGPACK_MEDIA_TYPE
+            return dump_msgpack(content)
+        return dump_json(content)
@@ -1,14 +1,23 @@
 import hashlib
 import hmac
+import time
+from functools import lru_cache
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 from urllib.parse import parse_qsl
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.core.config import settings
+from app.core.cache import TTLCache
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Декодированные access-токены по хэшу токена, хранятся до истечения exp
+_access_token_cache = TTLCache(
+    max_size=settings.TOKEN_CACHE_MAX_SIZE,
+    ttl_seconds=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Проверка пароля"""
@@ -53,6 +62,37 @@ def verify_token(token: str, token_type: str = "access") -> Optional[Dict[str, A
         return None
 
 
+def verify_access_token_cached(token: str) -> Optional[Dict[str, Any]]:
+    """Проверка access token с кэшированием результата до истечения токена"""
+    key = hashlib.sha256(token.encode()).digest()
+    payload = _access_token_cache.get(key)
+    if payload is not None:
+        return payload
+
+    payload = verify_token(token, token_type="access")
+    if payload is not None:
+        _access_token_cache.set(key, payload, ttl_seconds=payload["exp"] - time.time())
+    return payload
+
+
+def get_token_subject(payload: Dict[str, Any]) -> Optional[int]:
+    """ID пользователя из claim sub (в JWT sub - строка)"""
+    try:
+        return int(payload["sub"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+@lru_cache(maxsize=4)
+def get_webapp_secret_key(bot_token: str) -> bytes:
+    """Секретный ключ проверки initData: HMAC_SHA256("WebAppData", bot_token)"""
+    return hmac.new(
+        key="WebAppData".encode(),
+        msg=bot_token.encode(),
+        digestmod=hashlib.sha256
+    ).digest()
+
+
 def validate_telegram_auth(init_data: str) -> Optional[Dict[str, Any]]:
     """
     Валидация Telegram Web App initData согласно официальной документации
@@ -85,12 +125,8 @@ def validate_telegram_auth(init_data: str) -> Optional[Dict[str, Any]]:
         else:
             bot_token = settings.TELEGRAM_BOT_TOKEN
         
-        # Создаем секретный ключ: HMAC_SHA256("WebAppData", bot_token)
-        secret_key = hmac.new(
-            key="WebAppData".encode(),
-            msg=bot_token.encode(),
-            digestmod=hashlib.sha256
-        ).digest()
+        # Секретный ключ вычисляется один раз на токен бота
+        secret_key = get_webapp_secret_key(bot_token)
         
         # Проверяем подпись: HMAC_SHA256(secret_key, data_check_string)
         calculated_hash = hmac.new(
@@ -99,7 +135,7 @@ def validate_telegram_auth(init_data: str) -> Optional[Dict[str, Any]]:
             digestmod=hashlib.sha256
         ).hexdigest()
         
-        if calculated_hash != received_hash:
+        if not hmac.compare_digest(calculated_hash, received_hash):
             return None
         
         # Проверяем время (auth_date не должен быть старше 24 часов)
@@ -0,0 +1,103 @@
+"""
+Отслеживание изменений в БД для инвалидации in-process кэшей
+
+Каждая таблица имеет счетчик версий, который увеличивается после успешного
+commit транзакции, изменившей ее строки. Кэши сравнивают сохраненную версию
+с текущей или подписываются на изменения для инкрементального обновления.
+"""
+import logging
+import secrets
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# (операция, объект): операция - "insert", "update" или "delete"
+Change = Tuple[str, Any]
+Subscriber = Callable[[List[Change]], None]
+
+_PENDING_KEY = "pending_changes"
+
+
+class ChangeTracker:
+    """Версии таблиц и подписчики, уведомляемые после commit"""
+
+    def __init__(self):
+        # Версии живут в памяти процесса: boot_id отличает их от версий до перезапуска
+        self.boot_id = secrets.token_hex(8)
+        self.started_at = time.time()
+        self._versions: Dict[str, int] = defaultdict(int)
+        self._changed_at: Dict[str, float] = {}
+        self._subscribers: Dict[str, List[Subscriber]] = defaultdict(list)
+
+    def version(self, table: str) -> int:
+        """Текущая версия таблицы"""
+        return self._versions[table]
+
+    def last_modified(self, table: str) -> float:
+        """Время последнего изменения таблицы (unix time, не раньше старта процесса)"""
+        return self._changed_at.get(table, self.started_at)
+
+    def subscribe(self, table: str, callback: Subscriber) -> None:
+        """Подписка на изменения таблицы (вызывается после commit)"""
+        self._subscribers[table].append(callback)
+
+    def mark(self, session: Any, table: str, op: str = "update", obj: Optional[Any] = None) -> None:
+        """
+        Зарегистрировать изменение, сделанное в обход ORM (Core insert/update/delete)
+
+        Args:
+            session: Сессия (Session или AsyncSession), в которой выполнено изменение
+            table: Имя таблицы
+            op: Тип операции
+            obj: Объект или данные строки для подписчиков
+        """
+        session.info.setdefault(_PENDING_KEY, []).append((table, op, obj))
+
+    def bump(self, table: str, changes: Optional[List[Change]] = None) -> None:
+        """Увеличить версию таблицы и уведомить подписчиков"""
+        self._versions[table] += 1
+        self._changed_at[table] = time.time()
+        for callback in self._subscribers[table]:
+            try:
+                callback(changes or [])
+            except Exception:
+                logger.exception("Change subscriber failed for table %s", table)
+
+    def _collect(self, session: Session, flush_context: Any) -> None:
+        pending = session.info.setdefault(_PENDING_KEY, [])
+        for op, objects in (
+            ("insert", session.new),
+            ("update", session.dirty),
+            ("delete", session.deleted),
+        ):
+            for obj in objects:
+                if op == "update" and not session.is_modified(obj):
+                    continue
+                pending.append((obj.__tablename__, op, obj))
+
+    def _dispatch(self, session: Session) -> None:
+        pending = session.info.pop(_PENDING_KEY, None)
+        if not pending:
+            return
+
+        by_table: Dict[str, List[Change]] = defaultdict(list)
+        for table, op, obj in pending:
+            by_table[table].append((op, obj))
+
+        for table, table_changes in by_table.items():
+            self.bump(table, table_changes)
+
+    def _discard(self, session: Session) -> None:
+        session.info.pop(_PENDING_KEY, None)
+
+
+changes = ChangeTracker()
+
+event.listen(Session, "after_flush", changes._collect)
+event.listen(Session, "after_commit", changes._dispatch)
+event.listen(Session, "after_rollback", changes._discard)
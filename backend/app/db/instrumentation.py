@@ -0,0 +1,76 @@
+"""
+Учет SQL-запросов текущего HTTP-запроса
+
+Middleware кладет в contextvar объект RequestStats, а события engine
+(before/after_cursor_execute) добавляют в него число выражений и время в БД.
+Вне HTTP-запроса (скрипты, lifespan) contextvar пуст и учет не ведется.
+Тексты выражений копятся только в режиме бюджета запросов (statement_counts).
+Время начала выражения хранится в context._query_started и доступно другим
+обработчикам after_cursor_execute (журнал медленных запросов).
+"""
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class RequestStats:
+    """Стоимость запроса к БД в рамках одного HTTP-запроса"""
+
+    __slots__ = ("scope", "statements", "db_seconds", "statement_counts")
+
+    def __init__(self, scope: Optional[Dict[str, Any]] = None) -> None:
+        # ASGI scope запроса: после маршрутизации в нем есть scope["route"]
+        self.scope = scope
+        self.statements = 0
+        self.db_seconds = 0.0
+        # SQL -> число выполнений; None - не собирать (режим бюджета выключен)
+        self.statement_counts: Optional[Dict[str, int]] = None
+
+
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def _before_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any,
+                           context: Any, executemany: bool) -> None:
+    context._query_started = time.perf_counter()
+
+
+def _record(context: Any) -> None:
+    stats = request_stats.get()
+    started = getattr(context, "_query_started", None)
+    if stats is None or started is None:
+        return
+
+    stats.statements += 1
+    stats.db_seconds += time.perf_counter() - started
+    if stats.statement_counts is not None:
+        stats.statement_counts[context.statement] = stats.statement_counts.get(context.statement, 0) + 1
+
+
+def _after_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any,
+                          context: Any, executemany: bool) -> None:
+    _record(context)
+
+
+def _handle_error(exception_context: Any) -> None:
+    # Выражение завершилось ошибкой: after_cursor_execute не будет вызван
+    if exception_context.execution_context is not None:
+        _record(exception_context.execution_context)
+
+
+def current_route() -> Optional[str]:
+    """Шаблон маршрута текущего HTTP-запроса (None вне запроса)"""
+    stats = request_stats.get()
+    if stats is None or stats.scope is None:
+        return None
+    return getattr(stats.scope.get("route"), "path", None)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Подключить учет выражений к синхронному engine (AsyncEngine.sync_engine)"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
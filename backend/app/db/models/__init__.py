@@ -2,5 +2,6 @@ from app.db.models.user import User
 from app.db.models.city import City
 from app.db.models.attraction import Attraction
 from app.db.models.favorite import Favorite
+from app.db.models.review import Review
 
-__all__ = ["User", "City", "Attraction", "Favorite"]
+__all__ = ["User", "City", "Attraction", "Favorite", "Review"]
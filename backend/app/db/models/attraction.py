@@ -1,8 +1,21 @@
-from sqlalchemy import Column, Integer, String, Text, Float, Boolean, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    BigInteger, Column, Computed, Integer, String, Text, Float, Boolean, DateTime, ForeignKey, Index, event
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
+from app.core.geo import geo_cell
 from app.db.base import Base
 
+# Конфигурация полнотекстового поиска и выражение для search_vector:
+# название важнее адреса, адрес важнее описания (веса A/B/C для ts_rank)
+SEARCH_CONFIG = "russian"
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('russian', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(address, '')), 'B') || "
+    "setweight(to_tsvector('russian', coalesce(description, '')), 'C')"
+)
+
 
 class Attraction(Base):
     __tablename__ = "attractions"
@@ -14,13 +27,73 @@ class Attraction(Base):
     address = Column(String)
     photo_url = Column(String)  # Одно фото (URL) для MVP
     category = Column(String, index=True)  # Музей, Парк, Памятник и т.д.
-    rating = Column(Float, default=0.0)
+    # Средняя оценка отзывов (rating_sum / rating_count); до первого отзыва - редакционная,
+    # после удаления последнего - 0
+    rating = Column(Float, nullable=False, default=0.0, server_default="0")
+    # Суммы оценок для O(1) обновления среднего (app/services/reviews.py)
+    rating_sum = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_count = Column(Integer, nullable=False, default=0, server_default="0")
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Число добавлений в избранное: меняется вместе с favorites, сверяется
+    # scripts/reconcile_favorites_count.py
+    favorites_count = Column(Integer, nullable=False, default=0, server_default="0")
+    latitude = Column(Float)
+    longitude = Column(Float)
+    # Morton-код ячейки (app.core.geo) для поиска рядом по btree; вычисляется из координат
+    geo_cell = Column(BigInteger)
+    # Генерируемая колонка для полнотекстового поиска; не загружается вместе с объектом
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR_EXPRESSION, persisted=True)))
 
     # Relationships
     city = relationship("City", back_populates="attractions")
     favorites = relationship("Favorite", back_populates="attraction", cascade="all, delete-orphan")
+    reviews = relationship("Review", back_populates="attraction", cascade="all, delete-orphan")
+
+    # Индекс под keyset-пагинацию списка: фильтры + порядок (created_at, id)
+    __table_args__ = (
+        Index(
+            "ix_attractions_listing",
+            is_active, city_id, category, created_at.desc(), id.desc(),
+        ),
+        # Сортировки в пределах города без Sort в плане (фильтр только по city_id)
+        Index(
+            "ix_attractions_newest", city_id, created_at.desc(), id.desc(),
+            postgresql_where=is_active == True,
+        ),
+        Index(
+            "ix_attractions_popular", city_id, favorites_count.desc(), id.desc(),
+            postgresql_where=is_active == True,
+        ),
+        Index(
+            "ix_attractions_top_rated", city_id, rating.desc(), id.desc(),
+            postgresql_where=is_active == True,
+        ),
+        # Полнотекстовый поиск; триграммный индекс по name создается миграцией (нужен pg_trgm)
+        Index("ix_attractions_search_vector", search_vector, postgresql_using="gin"),
+        # Кандидаты поиска по частым словам: совпадения в порядке рейтинга index-only scan
+        Index(
+            "ix_attractions_search_by_rating", rating.desc(), id.desc(),
+            postgresql_include=["search_vector"],
+            postgresql_where=is_active == True,
+        ),
+        # Поиск рядом: кандидаты читаются index-only scan (координаты в INCLUDE)
+        Index(
+            "ix_attractions_geo_cell", geo_cell,
+            postgresql_include=["latitude", "longitude", "id"],
+            postgresql_where=is_active == True,
+        ),
+    )
 
     def __repr__(self):
         return f"<Attraction(id={self.id}, name={self.name}, city_id={self.city_id})>"
+
+
+@event.listens_for(Attraction, "before_insert")
+@event.listens_for(Attraction, "before_update")
+def _update_geo_cell(mapper, connection, target: Attraction) -> None:
+    """Пересчитать geo_cell при записи координат через ORM"""
+    if target.latitude is None or target.longitude is None:
+        target.geo_cell = None
+    else:
+        target.geo_cell = geo_cell(target.latitude, target.longitude)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base import Base
@@ -8,7 +8,7 @@ class Favorite(Base):
     __tablename__ = "favorites"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     attraction_id = Column(Integer, ForeignKey("attractions.id", ondelete="CASCADE"), nullable=False, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -19,6 +19,8 @@ class Favorite(Base):
     # Уникальный constraint - пользователь не может добавить одну достопримечательность дважды
     __table_args__ = (
         UniqueConstraint('user_id', 'attraction_id', name='unique_user_attraction'),
+        # Курсорная пагинация списка избранного (новые первыми)
+        Index("ix_favorites_listing", user_id, created_at.desc(), id.desc()),
     )
 
     def __repr__(self):
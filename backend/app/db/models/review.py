@@ -0,0 +1,32 @@
+from sqlalchemy import (
+    CheckConstraint, Column, Integer, SmallInteger, Text, DateTime, ForeignKey, Index, UniqueConstraint
+)
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+
+class Review(Base):
+    __tablename__ = "reviews"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    attraction_id = Column(Integer, ForeignKey("attractions.id", ondelete="CASCADE"), nullable=False)
+    rating = Column(SmallInteger, nullable=False)  # Оценка 1-5
+    text = Column(Text)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    # Relationships
+    user = relationship("User")
+    attraction = relationship("Attraction", back_populates="reviews")
+
+    # Один отзыв пользователя на достопримечательность; keyset-пагинация отзывов (новые первыми)
+    __table_args__ = (
+        UniqueConstraint('user_id', 'attraction_id', name='unique_user_review'),
+        CheckConstraint('rating BETWEEN 1 AND 5', name='ck_reviews_rating'),
+        Index("ix_reviews_listing", attraction_id, created_at.desc(), id.desc()),
+    )
+
+    def __repr__(self):
+        return f"<Review(id={self.id}, user_id={self.user_id}, attraction_id={self.attraction_id})>"
@@ -0,0 +1,92 @@
+"""
+Пул соединений с метриками: занятые соединения, время ожидания, overflow
+"""
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# Границы корзин гистограммы времени ожидания соединения (секунды)
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class PoolMetrics:
+    """Накопленные метрики выдачи соединений из пула"""
+
+    def __init__(self, buckets: tuple = WAIT_BUCKETS):
+        self.buckets = buckets
+        self.wait_counts: List[int] = [0] * (len(buckets) + 1)
+        self.wait_seconds_total = 0.0
+        self.checkouts = 0
+        self.overflow_events = 0
+        self.timeouts = 0
+
+    def observe_wait(self, seconds: float) -> None:
+        """Учесть время получения соединения"""
+        self.wait_counts[bisect_left(self.buckets, seconds)] += 1
+        self.wait_seconds_total += seconds
+        self.checkouts += 1
+
+    def histogram(self) -> Dict[str, int]:
+        """Накопительная гистограмма ожидания (le -> количество)"""
+        result = {}
+        cumulative = 0
+        for bound, count in zip((*self.buckets, "+Inf"), self.wait_counts):
+            cumulative += count
+            result[str(bound)] = cumulative
+        return result
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool, измеряющий ожидание соединения и выход в overflow"""
+
+    def connect(self) -> Any:
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            pool_metrics.timeouts += 1
+            raise
+        finally:
+            pool_metrics.observe_wait(time.perf_counter() - started)
+
+    def _inc_overflow(self) -> bool:
+        # Счетчик overflow начинается с -pool_size: > 0 - соединение сверх pool_size
+        created = super()._inc_overflow()
+        if created and self._overflow > 0:
+            pool_metrics.overflow_events += 1
+        return created
+
+
+def pool_status(pool: Any) -> Dict[str, Any]:
+    """
+    Состояние пула и накопленные метрики
+
+    saturation - доля занятых соединений от предела pool_size + max_overflow.
+    """
+    if not isinstance(pool, AsyncAdaptedQueuePool):
+        return {"pool": type(pool).__name__}
+
+    capacity = pool.size() + max(pool._max_overflow, 0)
+    checked_out = pool.checkedout()
+    return {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "checked_out": checked_out,
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "saturation": round(checked_out / capacity, 3) if capacity else 0.0,
+        "checkouts": pool_metrics.checkouts,
+        "wait_seconds_avg": (
+            pool_metrics.wait_seconds_total / pool_metrics.checkouts if pool_metrics.checkouts else 0.0
+        ),
+        "wait_seconds_histogram": pool_metrics.histogram(),
+        "overflow_events": pool_metrics.overflow_events,
+        "timeouts": pool_metrics.timeouts,
+    }
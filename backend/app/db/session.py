@@ -1,15 +1,35 @@
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
 from typing import AsyncGenerator
 
 from app.core.config import settings
+from app.db import changes  # noqa - регистрация обработчиков изменений
+from app.db.instrumentation import instrument_engine
+from app.db.pool import InstrumentedQueuePool
+from app.db.slow_queries import slow_query_log
+
+database_url = make_url(settings.DATABASE_URL)
+if database_url.get_driver_name() == "asyncpg":
+    # Кэш подготовленных выражений asyncpg (0 - отключить, например за PgBouncer)
+    database_url = database_url.update_query_dict({
+        "prepared_statement_cache_size": str(settings.DB_PREPARED_STATEMENT_CACHE_SIZE)
+    })
 
 # Создаем async engine
 engine = create_async_engine(
-    settings.DATABASE_URL,
+    database_url,
     echo=settings.DEBUG,
     future=True,
+    poolclass=InstrumentedQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
 )
+instrument_engine(engine.sync_engine)
+slow_query_log.install(engine)
 
 # Создаем async session factory
 AsyncSessionLocal = async_sessionmaker(
@@ -36,7 +56,7 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
 async def init_db() -> None:
     """Инициализация БД (создание таблиц)"""
     from app.db.base import Base
-    from app.db.models import user, city, attraction, favorite  # noqa - импорт моделей
+    from app.db.models import user, city, attraction, favorite, review  # noqa - импорт моделей
 
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
@@ -0,0 +1,202 @@
+"""
+Журнал медленных SQL-выражений
+
+Выражения дольше SLOW_QUERY_THRESHOLD_MS попадают в лог и в статистику,
+сгруппированную по нормализованному тексту (литералы, номера параметров и
+списки IN свернуты). Значения параметров не сохраняются - только их типы.
+
+Вне production для медленных SELECT дополнительно снимается план
+EXPLAIN (ANALYZE, BUFFERS): в отдельной задаче и на отдельном соединении,
+чтобы ошибка EXPLAIN не оборвала транзакцию запроса, не чаще раза в
+SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS на выражение.
+"""
+import asyncio
+import logging
+import re
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.db.instrumentation import current_route, request_stats
+
+logger = logging.getLogger(__name__)
+
+# Опция выполнения, отключающая журнал (для самих EXPLAIN)
+SKIP_OPTION = "skip_slow_query_log"
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAMETER = re.compile(r"\$\d+(?:::\w+(?:\[\])?)?|%\(\w+\)s|\?")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_statement(statement: str) -> str:
+    """Текст выражения без литералов и конкретных параметров"""
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _PARAMETER.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _IN_LIST.sub("(...)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+def redact_parameters(parameters: Any, executemany: bool = False) -> Any:
+    """Параметры без значений: только типы"""
+    if executemany:
+        return f"<{len(parameters)} rows>"
+    if isinstance(parameters, dict):
+        return {key: _redact(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_redact(value) for value in parameters]
+    return _redact(parameters)
+
+
+def _redact(value: Any) -> Optional[str]:
+    return None if value is None else f"<{type(value).__name__}>"
+
+
+class SlowQueryLog:
+    """Статистика медленных выражений и кольцевой буфер планов"""
+
+    def __init__(self, threshold_ms: float, max_statements: int, plan_buffer: int,
+                 explain: bool, explain_interval_seconds: int):
+        self.threshold_ms = threshold_ms
+        self.max_statements = max_statements
+        self.explain = explain
+        self.explain_interval_seconds = explain_interval_seconds
+        self.statements: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.plans: Deque[Dict[str, Any]] = deque(maxlen=plan_buffer)
+        self._explained_at: Dict[str, float] = {}
+        self._engine: Optional[AsyncEngine] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    def install(self, engine: AsyncEngine) -> None:
+        """Подключить журнал к engine (после instrument_engine)"""
+        if self.threshold_ms <= 0:
+            return
+        self._engine = engine
+        event.listen(engine.sync_engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _after_cursor_execute(self, conn: Any, cursor: Any, statement: str, parameters: Any,
+                              context: Any, executemany: bool) -> None:
+        started = getattr(context, "_query_started", None)
+        if started is None:
+            return
+        duration_ms = (time.perf_counter() - started) * 1000
+        if duration_ms < self.threshold_ms or context.execution_options.get(SKIP_OPTION):
+            return
+
+        self.record(statement, parameters, duration_ms, executemany)
+
+    def record(self, statement: str, parameters: Any, duration_ms: float,
+               executemany: bool = False) -> None:
+        """Учесть медленное выражение"""
+        normalized = normalize_statement(statement)
+        route = current_route()
+        redacted = redact_parameters(parameters, executemany)
+        logger.warning(
+            "Slow query %.1f ms on %s: %s params=%s",
+            duration_ms, route or "-", normalized[:500], redacted
+        )
+
+        entry = self.statements.get(normalized)
+        if entry is None:
+            if len(self.statements) >= self.max_statements:
+                self.statements.popitem(last=False)
+            entry = self.statements[normalized] = {
+                "statement": normalized,
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "routes": [],
+            }
+        else:
+            self.statements.move_to_end(normalized)
+
+        entry["count"] += 1
+        entry["total_ms"] += duration_ms
+        entry["max_ms"] = max(entry["max_ms"], duration_ms)
+        entry["last_params"] = redacted
+        entry["last_seen"] = datetime.now(timezone.utc)
+        if route and route not in entry["routes"] and len(entry["routes"]) < 10:
+            entry["routes"].append(route)
+
+        if self._should_explain(normalized, statement, executemany):
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:  # engine используется вне event loop
+                return
+            self._explained_at[normalized] = time.monotonic()
+            task = loop.create_task(
+                self._capture_plan(normalized, statement, parameters, duration_ms, route, redacted)
+            )
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def top(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Выражения с наибольшим суммарным временем"""
+        entries = sorted(self.statements.values(), key=lambda entry: entry["total_ms"], reverse=True)
+        return [
+            {**entry, "avg_ms": entry["total_ms"] / entry["count"]}
+            for entry in entries[:limit]
+        ]
+
+    def recent_plans(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Последние снятые планы (новые первыми)"""
+        return list(self.plans)[::-1][:limit]
+
+    def clear(self) -> None:
+        """Сбросить статистику и планы"""
+        self.statements.clear()
+        self.plans.clear()
+        self._explained_at.clear()
+
+    def _should_explain(self, normalized: str, statement: str, executemany: bool) -> bool:
+        if not self.explain or executemany or self._engine is None:
+            return False
+        if self._engine.dialect.name != "postgresql":
+            return False
+        # ANALYZE выполняет выражение повторно - только для чтения
+        if not statement.lstrip().upper().startswith("SELECT"):
+            return False
+
+        explained_at = self._explained_at.get(normalized)
+        return explained_at is None or time.monotonic() - explained_at >= self.explain_interval_seconds
+
+    async def _capture_plan(self, normalized: str, statement: str, parameters: Any,
+                            duration_ms: float, route: Optional[str], redacted: Any) -> None:
+        # EXPLAIN не относится к запросу, вызвавшему его
+        request_stats.set(None)
+        try:
+            async with self._engine.connect() as conn:
+                conn = await conn.execution_options(**{SKIP_OPTION: True})
+                result = await conn.exec_driver_sql(
+                    f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}", parameters
+                )
+                plan = result.scalar()
+                await conn.rollback()
+        except Exception:
+            logger.exception("EXPLAIN failed for slow query: %s", normalized[:500])
+            return
+
+        self.plans.append({
+            "statement": normalized,
+            "params": redacted,
+            "duration_ms": duration_ms,
+            "route": route,
+            "captured_at": datetime.now(timezone.utc),
+            "plan": plan,
+        })
+
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+    max_statements=settings.SLOW_QUERY_MAX_STATEMENTS,
+    plan_buffer=settings.SLOW_QUERY_PLAN_BUFFER,
+    explain=settings.ENVIRONMENT != "production",
+    explain_interval_seconds=settings.SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS,
+)
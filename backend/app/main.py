@@ -1,13 +1,27 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
+from prometheus_client import REGISTRY
 
 from app.core.config import settings
-from app.db.session import init_db, close_db
+from app.core.content_negotiation import ContentNegotiationMiddleware
+from app.core.metrics import MetricsMiddleware, RuntimeCollector, metrics_response
+from app.core.query_budget import install_query_budget
+from app.core.profiler import ProfilerMiddleware
+from app.db.session import AsyncSessionLocal, engine, init_db, close_db
+from app.db.pool import pool_status
 from app.api.v1 import auth_router
 from app.api.v1.cities import router as cities_router
 from app.api.v1.attractions import router as attractions_router
 from app.api.v1.favorites import router as favorites_router
+from app.api.v1.reviews import router as reviews_router
+from app.api.v1.admin import router as admin_router
+from app.api.v1.suggest import router as suggest_router
+from app.services.password_hasher import password_hasher
+from app.services.attraction_clusters import cluster_index
+from app.services.attraction_search import detect_trigram
+from app.services.suggest_index import suggest_index
 
 
 async def seed_database():
@@ -35,8 +49,13 @@ async def lifespan(app: FastAPI):
     # Startup
     await init_db()
     await seed_database()
+    async with AsyncSessionLocal() as session:
+        await suggest_index.build(session)
+        await cluster_index.build(session)
+        await detect_trigram(session)
     yield
     # Shutdown
+    password_hasher.shutdown()
     await close_db()
 
 
@@ -56,11 +75,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Профилирование по X-Profile (только для администраторов)
+app.add_middleware(ProfilerMiddleware)
+
+# Бюджет SQL-выражений (только при QUERY_BUDGET_MODE=log|raise)
+install_query_budget(app)
+
+# JSON или MessagePack для /api/v1 по заголовку Accept
+app.add_middleware(ContentNegotiationMiddleware)
+
+# Метрики: добавлен последним, поэтому оборачивает все остальные middleware
+app.add_middleware(MetricsMiddleware)
+REGISTRY.register(RuntimeCollector(engine, password_hasher))
+
 # Подключение роутеров
 app.include_router(auth_router, prefix="/api/v1/auth", tags=["auth"])
 app.include_router(cities_router, prefix="/api/v1/cities", tags=["cities"])
 app.include_router(attractions_router, prefix="/api/v1/attractions", tags=["attractions"])
+app.include_router(reviews_router, prefix="/api/v1/attractions", tags=["reviews"])
 app.include_router(favorites_router, prefix="/api/v1/favorites", tags=["favorites"])
+app.include_router(suggest_router, prefix="/api/v1/suggest", tags=["suggest"])
+app.include_router(admin_router, prefix="/api/v1/admin", tags=["admin"])
 
 
 @app.get("/")
@@ -77,3 +112,24 @@ async def root():
 async def health_check():
     """Проверка здоровья приложения"""
     return {"status": "healthy"}
+
+
+@app.get("/ready")
+async def readiness_check():
+    """
+    Готовность принимать запросы: состояние пула соединений с БД
+
+    Возвращает 503, когда все соединения пула (включая overflow) заняты.
+    """
+    pool = pool_status(engine.pool)
+    ready = pool.get("saturation", 0.0) < 1.0
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "saturated", "db_pool": pool}
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Метрики в формате Prometheus"""
+    return metrics_response()
@@ -0,0 +1,36 @@
+from datetime import datetime
+from typing import Any, Optional
+from pydantic import BaseModel
+
+
+class SlowQueryStat(BaseModel):
+    statement: str
+    count: int
+    total_ms: float
+    avg_ms: float
+    max_ms: float
+    routes: list[str]
+    last_params: Any = None
+    last_seen: datetime
+
+
+class SlowQueryPlan(BaseModel):
+    statement: str
+    params: Any = None
+    duration_ms: float
+    route: Optional[str] = None
+    captured_at: datetime
+    plan: Any
+
+
+class SlowQueryReport(BaseModel):
+    threshold_ms: float
+    explain_enabled: bool
+    statements: list[SlowQueryStat]
+    plans: list[SlowQueryPlan]
+
+
+class ProfileInfo(BaseModel):
+    id: str
+    size: int
+    created_at: datetime
@@ -1,6 +1,6 @@
 from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel, ConfigDict
+from typing import Optional, Union
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class AttractionBase(BaseModel):
@@ -9,6 +9,8 @@ class AttractionBase(BaseModel):
     address: Optional[str] = None
     photo_url: Optional[str] = None
     category: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
 
 
 class AttractionCreate(AttractionBase):
@@ -19,6 +21,7 @@ class AttractionResponse(AttractionBase):
     id: int
     city_id: int
     rating: float
+    rating_count: int = 0  # Число отзывов, по которым посчитан rating
     is_active: bool
     created_at: datetime
     is_favorite: Optional[bool] = False  # Будет заполняться в API
@@ -26,8 +29,65 @@ class AttractionResponse(AttractionBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class AttractionCard(BaseModel):
+    """Облегченная карточка для списков (без описания и адреса)"""
+    id: int
+    name: str
+    photo_url: Optional[str] = None
+    category: Optional[str] = None
+    rating: float
+
+
+class AttractionSparse(BaseModel):
+    """Запись с набором полей из ?fields= (например, пресет card); отсутствующих полей нет в ответе"""
+    id: int
+    city_id: Optional[int] = None
+    name: Optional[str] = None
+    description: Optional[str] = None
+    address: Optional[str] = None
+    photo_url: Optional[str] = None
+    category: Optional[str] = None
+    rating: Optional[float] = None
+    rating_count: Optional[int] = None
+    is_active: Optional[bool] = None
+    created_at: Optional[datetime] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    is_favorite: Optional[bool] = None
+
+
 class AttractionList(BaseModel):
-    items: list[AttractionResponse]
-    total: int
+    items: list[Union[AttractionResponse, AttractionSparse]]  # AttractionSparse при fields != full
+    total: Optional[int] = None  # None при total_mode=none
     page: int
     page_size: int
+    next_cursor: Optional[str] = None  # Курсор следующей страницы (None - конец списка)
+
+
+class AttractionSearchResult(BaseModel):
+    items: list[AttractionResponse]
+    query: str
+    fuzzy: bool = False  # True - найдено по похожим названиям (опечатка в запросе)
+
+
+class AttractionNearby(AttractionResponse):
+    distance_m: float  # Расстояние до точки запроса
+
+
+class AttractionNearbyList(BaseModel):
+    items: list[AttractionNearby]  # Ближайшие первыми
+    latitude: float
+    longitude: float
+    radius: float
+
+
+class AttractionCluster(BaseModel):
+    latitude: float  # Центроид точек ячейки
+    longitude: float
+    count: int
+    sample_id: int  # Запись ячейки с лучшим рейтингом
+
+
+class AttractionClusterList(BaseModel):
+    items: list[AttractionCluster]
+    zoom: int
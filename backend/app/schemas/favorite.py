@@ -1,6 +1,7 @@
 from datetime import datetime
-from pydantic import BaseModel, ConfigDict
-from app.schemas.attraction import AttractionResponse
+from typing import Optional, Union
+from pydantic import BaseModel, ConfigDict, Field
+from app.schemas.attraction import AttractionCard, AttractionResponse
 
 
 class FavoriteCreate(BaseModel):
@@ -17,6 +18,29 @@ class FavoriteResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class FavoriteCard(BaseModel):
+    id: int
+    user_id: int
+    attraction_id: int
+    created_at: datetime
+    attraction: AttractionCard
+
+
 class FavoriteList(BaseModel):
-    items: list[FavoriteResponse]
+    items: list[Union[FavoriteResponse, FavoriteCard]]  # FavoriteCard при view=card
     total: int
+    next_cursor: Optional[str] = None  # Курсор следующей страницы (None - конец списка)
+
+
+class FavoriteIds(BaseModel):
+    ids: list[int]  # id достопримечательностей в избранном, по возрастанию
+
+
+class FavoriteBatch(BaseModel):
+    add: list[int] = Field(default_factory=list, max_length=100)
+    remove: list[int] = Field(default_factory=list, max_length=100)
+
+
+class FavoriteBatchResult(BaseModel):
+    added: list[int]  # Фактически добавленные id
+    removed: list[int]  # Фактически удаленные id
@@ -0,0 +1,30 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class ReviewCreate(BaseModel):
+    rating: int = Field(..., ge=1, le=5)
+    text: Optional[str] = Field(None, max_length=2000)
+
+
+class ReviewResponse(BaseModel):
+    id: int
+    user_id: int
+    attraction_id: int
+    rating: int
+    text: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ReviewSaved(ReviewResponse):
+    attraction_rating: float  # Средняя оценка после изменения
+    attraction_rating_count: int
+
+
+class ReviewList(BaseModel):
+    items: list[ReviewResponse]
+    next_cursor: Optional[str] = None  # Курсор следующей страницы (None - конец списка)
@@ -0,0 +1,14 @@
+from typing import Literal, Optional
+from pydantic import BaseModel
+
+
+class SuggestItem(BaseModel):
+    type: Literal["city", "attraction"]
+    id: int
+    name: str
+    city_id: Optional[int] = None  # Город достопримечательности (для городов - None)
+
+
+class SuggestList(BaseModel):
+    items: list[SuggestItem]
+    query: str
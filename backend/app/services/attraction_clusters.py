@@ -0,0 +1,254 @@
+"""
+Кластеры достопримечательностей для карты
+
+Для каждого города и каждого уровня масштаба (zoom веб-карты) заранее
+посчитаны ячейки сетки: число точек, сумма координат (центроид) и запись с
+лучшим рейтингом. Ячейка уровня zoom - четверть тайла по каждой оси
+(grid_cell уровня zoom + 2, около 64 px на тайлах 256 px).
+
+Структура обновляется после commit по событиям changes: добавление,
+перемещение, смена рейтинга и деактивация меняют только ячейки затронутой
+точки. Если уходит лучшая запись ячейки, лучшая пересчитывается по точкам
+города. Изменения без данных строки приводят к перестроению в фоне.
+"""
+import math
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.geo import grid_cell
+from app.db.changes import Change, changes
+from app.db.models.attraction import Attraction
+from app.services.memory_index import MemoryIndex, fetch_rows
+
+MIN_ZOOM = 4
+MAX_ZOOM = 18
+# Ячейка - 1/2**CELLS_PER_TILE_BITS тайла по каждой оси
+CELLS_PER_TILE_BITS = 2
+
+# Точка: (city_id, широта, долгота, рейтинг)
+Point = Tuple[int, float, float, float]
+
+FINEST_LEVEL = MAX_ZOOM + CELLS_PER_TILE_BITS
+
+
+class Cluster:
+    """Агрегат ячейки"""
+
+    __slots__ = ("count", "lat_sum", "lon_sum", "best_rating", "best_id")
+
+    def __init__(self):
+        self.count = 0
+        self.lat_sum = 0.0
+        self.lon_sum = 0.0
+        self.best_rating = -1.0
+        self.best_id = 0
+
+    def offer(self, attraction_id: int, rating: float) -> None:
+        """Учесть запись как кандидата в лучшие (при равном рейтинге - меньший id)"""
+        if rating > self.best_rating or (rating == self.best_rating and attraction_id < self.best_id):
+            self.best_rating = rating
+            self.best_id = attraction_id
+
+
+def zoom_level(zoom: int) -> int:
+    """Уровень сетки grid_cell для zoom карты"""
+    return min(max(zoom, MIN_ZOOM), MAX_ZOOM) + CELLS_PER_TILE_BITS
+
+
+def cell_key(x: int, y: int) -> int:
+    """Ключ ячейки: координаты сетки в одном int (дешевле кортежа)"""
+    return x << 32 | y
+
+
+def cell_keys(lat: float, lon: float) -> List[int]:
+    """
+    Ключи ячеек точки на всех уровнях, от MIN_ZOOM до MAX_ZOOM
+
+    Ячейка более крупного уровня - сдвиг координат самого мелкого уровня.
+    """
+    x, y = grid_cell(lat, lon, FINEST_LEVEL)
+    return [
+        cell_key(x >> shift, y >> shift)
+        for shift in range(MAX_ZOOM - MIN_ZOOM, -1, -1)
+    ]
+
+
+class CityClusters:
+    """Ячейки всех уровней одного города"""
+
+    def __init__(self):
+        # Индекс списка - zoom - MIN_ZOOM
+        self.levels: List[Dict[int, Cluster]] = [{} for _ in range(MIN_ZOOM, MAX_ZOOM + 1)]
+        self.points: Set[int] = set()
+        # Границы точек города (только расширяются): города вне видимой области пропускаются
+        self.min_lat = self.min_lon = math.inf
+        self.max_lat = self.max_lon = -math.inf
+
+
+class ClusterIndex(MemoryIndex):
+    """Кластеры по городам и уровням масштаба"""
+
+    def __init__(self):
+        super().__init__()
+        self._cities: Dict[int, CityClusters] = {}
+        self._points: Dict[int, Point] = {}
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    async def fetch(self, db: AsyncSession) -> List[Tuple[int, int, float, float, Optional[float]]]:
+        """Активные достопримечательности с координатами: (id, city_id, широта, долгота, рейтинг)"""
+        return await fetch_rows(db, select(
+            Attraction.id, Attraction.city_id, Attraction.latitude,
+            Attraction.longitude, Attraction.rating,
+        ).where(
+            Attraction.is_active == True,
+            Attraction.latitude.is_not(None),
+            Attraction.longitude.is_not(None),
+        ))
+
+    def prepare(
+        self, rows: List[Tuple[int, int, float, float, Optional[float]]]
+    ) -> Tuple[Dict[int, CityClusters], Dict[int, Point]]:
+        """Города и точки по строкам (id, city_id, широта, долгота, рейтинг)"""
+        index = ClusterIndex()
+        for attraction_id, city_id, lat, lon, rating in rows:
+            index._add(attraction_id, (city_id, lat, lon, rating or 0.0))
+        return index._cities, index._points
+
+    def install(self, state: Tuple[Dict[int, CityClusters], Dict[int, Point]]) -> None:
+        self._cities, self._points = state
+        self.ready = True
+        self.generation += 1
+
+    def upsert(self, attraction_id: int, city_id: int, lat: float, lon: float, rating: float) -> None:
+        """Добавить или переместить точку"""
+        point = (city_id, lat, lon, rating or 0.0)
+        if self._points.get(attraction_id) == point:
+            return
+        self._remove(attraction_id)
+        self._add(attraction_id, point)
+        self.generation += 1
+
+    def remove(self, attraction_id: int) -> None:
+        """Убрать точку (если она есть)"""
+        if self._remove(attraction_id):
+            self.generation += 1
+
+    def clusters(
+        self,
+        min_lon: float,
+        min_lat: float,
+        max_lon: float,
+        max_lat: float,
+        zoom: int,
+        city_id: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Кластеры уровня zoom, ячейки которых пересекают прямоугольник"""
+        level = zoom_level(zoom)
+        x0, y0 = grid_cell(min_lat, min_lon, level)
+        x1, y1 = grid_cell(max_lat, max_lon, level)
+        area = (x1 - x0 + 1) * (y1 - y0 + 1)
+
+        if city_id is not None:
+            cities = [self._cities[city_id]] if city_id in self._cities else []
+        else:
+            cities = self._cities.values()
+
+        items = []
+        for city in cities:
+            if (city.max_lat < min_lat or city.min_lat > max_lat
+                    or city.max_lon < min_lon or city.min_lon > max_lon):
+                continue
+            cells = city.levels[level - MIN_ZOOM - CELLS_PER_TILE_BITS]
+            if area < len(cells):
+                # Видимая область меньше числа ячеек города: перебираем область
+                found = (cells.get(cell_key(x, y)) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1))
+                selected = [cluster for cluster in found if cluster is not None]
+            else:
+                selected = [
+                    cluster for key, cluster in cells.items()
+                    if x0 <= key >> 32 <= x1 and y0 <= key & 0xFFFFFFFF <= y1
+                ]
+            for cluster in selected:
+                items.append({
+                    "latitude": round(cluster.lat_sum / cluster.count, 6),
+                    "longitude": round(cluster.lon_sum / cluster.count, 6),
+                    "count": cluster.count,
+                    "sample_id": cluster.best_id,
+                })
+        return items
+
+    def _add(self, attraction_id: int, point: Point) -> None:
+        city_id, lat, lon, rating = point
+        city = self._cities.get(city_id)
+        if city is None:
+            city = self._cities[city_id] = CityClusters()
+        self._points[attraction_id] = point
+        city.points.add(attraction_id)
+        city.min_lat, city.max_lat = min(city.min_lat, lat), max(city.max_lat, lat)
+        city.min_lon, city.max_lon = min(city.min_lon, lon), max(city.max_lon, lon)
+
+        for cells, key in zip(city.levels, cell_keys(lat, lon)):
+            cluster = cells.get(key)
+            if cluster is None:
+                cluster = cells[key] = Cluster()
+            cluster.count += 1
+            cluster.lat_sum += lat
+            cluster.lon_sum += lon
+            cluster.offer(attraction_id, rating)
+
+    def _remove(self, attraction_id: int) -> bool:
+        point = self._points.pop(attraction_id, None)
+        if point is None:
+            return False
+        city_id, lat, lon, _ = point
+        city = self._cities[city_id]
+        city.points.discard(attraction_id)
+        if not city.points:
+            del self._cities[city_id]
+            return True
+
+        keys = cell_keys(lat, lon)
+        orphaned: List[Tuple[int, Cluster]] = []
+        for level, (cells, key) in enumerate(zip(city.levels, keys)):
+            cluster = cells[key]
+            cluster.count -= 1
+            if not cluster.count:
+                del cells[key]
+                continue
+            cluster.lat_sum -= lat
+            cluster.lon_sum -= lon
+            if cluster.best_id == attraction_id:
+                cluster.best_rating, cluster.best_id = -1.0, 0
+                orphaned.append((level, cluster))
+
+        # Ушла лучшая запись ячеек: один проход по точкам города. Ячейки точки
+        # вложены, поэтому точка вне крупной ячейки не попадает и в мелкие.
+        for other_id in city.points if orphaned else ():
+            _, other_lat, other_lon, other_rating = self._points[other_id]
+            x, y = grid_cell(other_lat, other_lon, FINEST_LEVEL)
+            for level, cluster in orphaned:
+                shift = MAX_ZOOM - MIN_ZOOM - level
+                if cell_key(x >> shift, y >> shift) != keys[level]:
+                    break
+                cluster.offer(other_id, other_rating)
+        return True
+
+    def _on_change(self, items: List[Change]) -> None:
+        self._apply_changes(items, {"city_id", "latitude", "longitude", "is_active"}, self._apply_row)
+
+    def _apply_row(self, attraction_id: int, data: Optional[Dict[str, Any]]) -> None:
+        if data is None or not data["is_active"] or data["latitude"] is None or data["longitude"] is None:
+            self.remove(attraction_id)
+        else:
+            self.upsert(
+                attraction_id, data["city_id"], data["latitude"], data["longitude"],
+                data.get("rating") or 0.0
+            )
+
+
+cluster_index = ClusterIndex()
+changes.subscribe("attractions", cluster_index._on_change)
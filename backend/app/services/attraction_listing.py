@@ -0,0 +1,230 @@
+"""
+Выборка страницы списка достопримечательностей вместе с общим количеством
+"""
+import asyncio
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.responses import row_dicts
+from app.db.models.attraction import Attraction
+from app.db.session import AsyncSessionLocal
+from app.services.count_cache import attraction_counts
+
+
+# Колонки AttractionResponse: выбираются Core-запросом без загрузки ORM-объектов
+ATTRACTION_COLUMNS = (
+    Attraction.id,
+    Attraction.city_id,
+    Attraction.name,
+    Attraction.description,
+    Attraction.address,
+    Attraction.photo_url,
+    Attraction.category,
+    Attraction.rating,
+    Attraction.rating_count,
+    Attraction.is_active,
+    Attraction.created_at,
+    Attraction.latitude,
+    Attraction.longitude,
+)
+
+ATTRACTION_FIELDS = {column.key: column for column in ATTRACTION_COLUMNS}
+# Поля, вычисляемые приложением (не колонки)
+COMPUTED_FIELDS = ("is_favorite",)
+# Наборы полей для ?fields=; card - карточка списка во фронтенде (без описания и адреса)
+FIELD_PRESETS = {
+    "card": ("id", "name", "photo_url", "category", "rating", "is_favorite"),
+    "full": (*ATTRACTION_FIELDS, *COMPUTED_FIELDS),
+}
+
+
+def parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """
+    Поля ответа из ?fields=: имена пресетов и полей через запятую
+
+    id добавляется всегда (нужен для курсора и is_favorite); порядок - как в
+    AttractionResponse, чтобы одинаковые наборы давали одинаковый ETag.
+
+    Raises:
+        HTTPException: Если поле или пресет неизвестны
+    """
+    requested = {"id"}
+    for name in (fields or "full").split(","):
+        name = name.strip()
+        if name in FIELD_PRESETS:
+            requested.update(FIELD_PRESETS[name])
+        elif name in ATTRACTION_FIELDS or name in COMPUTED_FIELDS:
+            requested.add(name)
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown field: {name}"
+            )
+    return tuple(name for name in FIELD_PRESETS["full"] if name in requested)
+
+
+# Сортировки списка: колонка (по убыванию, при равенстве - id по убыванию) и тип
+# значения в курсоре. Каждой соответствует индекс по (city_id, ключ, id):
+# ix_attractions_newest, ix_attractions_popular, ix_attractions_top_rated
+SORT_KEYS = {
+    "newest": (Attraction.created_at, datetime),
+    "popular": (Attraction.favorites_count, int),
+    "rating": (Attraction.rating, float),
+}
+
+
+def build_list_query(
+    city_id: Optional[int],
+    category: Optional[str],
+    fields: Sequence[str] = FIELD_PRESETS["full"]
+) -> Select:
+    """Запрос активных достопримечательностей с фильтрами (без пагинации), только колонки fields"""
+    columns = [ATTRACTION_FIELDS[name] for name in fields if name in ATTRACTION_FIELDS]
+    query = select(*columns).where(Attraction.is_active == True)
+
+    if city_id:
+        query = query.where(Attraction.city_id == city_id)
+
+    if category:
+        query = query.where(Attraction.category == category)
+
+    return query
+
+
+def count_query(query: Select) -> Select:
+    """COUNT по запросу списка"""
+    return select(func.count()).select_from(query.subquery())
+
+
+async def count_total(query: Select, db: AsyncSession) -> int:
+    """Точное количество строк запроса"""
+    result = await db.execute(count_query(query))
+    return result.scalar()
+
+
+async def estimate_total(query: Select, db: AsyncSession) -> int:
+    """
+    Оценка количества строк по плану запроса (без выполнения COUNT)
+
+    Запрос компилируется диалектом соединения, значения фильтров передаются
+    параметрами драйвера: в тексте SQL нет пользовательского ввода.
+    """
+    connection = await db.connection()
+    compiled = query.compile(dialect=connection.dialect)
+    params = compiled.construct_params()
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+    result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled.string}", params)
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+# Параллельная оценка держит второе соединение, пока первое ждет страницу. Если все
+# соединения пула заняты запросами, ждущими второго, пул зависает до таймаута,
+# поэтому вторые соединения ограничены половиной пула, сверх нее - последовательно.
+_side_connections = asyncio.Semaphore(max(1, (settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW) // 2))
+
+
+async def _estimate_in_new_session(query: Select) -> int:
+    """Оценка в отдельной сессии (отдельное соединение из пула)"""
+    async with AsyncSessionLocal() as session:
+        return await estimate_total(query, session)
+
+
+async def fetch_page(
+    query: Select,
+    key: Tuple[Optional[int], Optional[str]],
+    page: int,
+    page_size: int,
+    cursor: Optional[str],
+    total_mode: str,
+    db: AsyncSession,
+    sort: str = "newest"
+) -> Tuple[List[Dict[str, Any]], Optional[int], Optional[str]]:
+    """
+    Получить страницу списка и общее количество
+
+    Если total нет в кэше, страница и total берутся одним запросом: COUNT
+    подзапросом в списке колонок (и в режиме курсора - фильтр курсора в него
+    не входит). Оценка по EXPLAIN выполняется параллельно на отдельном
+    соединении (или последовательно, если лимит вторых соединений исчерпан).
+
+    Args:
+        query: Запрос с фильтрами из build_list_query
+        key: Ключ кэша количества (city_id, category)
+        page: Номер страницы (если нет курсора)
+        page_size: Размер страницы
+        cursor: Курсор keyset-пагинации
+        total_mode: exact, estimate или none
+        db: Сессия БД
+        sort: Ключ из SORT_KEYS
+
+    Returns:
+        (строки достопримечательностей, total, курсор следующей страницы)
+    """
+    total = None
+    if total_mode != "none":
+        total = attraction_counts.get(key, allow_stale=total_mode == "estimate")
+    need_total = total_mode != "none" and total is None
+
+    sort_column, cursor_type = SORT_KEYS[sort]
+    # sort_key - значение для курсора (favorites_count не входит в ответ)
+    page_query = query.add_columns(sort_column.label("sort_key")).order_by(
+        sort_column.desc(), Attraction.id.desc()
+    )
+    if cursor:
+        cursor_value, cursor_id = decode_cursor(cursor, cursor_type, sort)
+        page_query = page_query.where(
+            tuple_(sort_column, Attraction.id) < tuple_(cursor_value, cursor_id)
+        )
+    else:
+        page_query = page_query.offset((page - 1) * page_size)
+
+    # Берем на одну запись больше, чтобы понять, есть ли следующая страница
+    page_query = page_query.limit(page_size + 1)
+
+    if need_total and total_mode == "exact":
+        # Не count(*) OVER (): окно читает все подходящие строки целиком (1.5 с на 1M),
+        # подзапрос считается по индексу один раз (InitPlan)
+        attractions = row_dicts(await db.execute(
+            page_query.add_columns(count_query(query).scalar_subquery().label("query_total"))
+        ))
+        for attraction in attractions:
+            total = attraction.pop("query_total")
+        if not attractions:
+            # Страница за концом списка: подзапросу не в чем вернуться
+            total = 0 if page == 1 and not cursor else await count_total(query, db)
+    elif need_total and not _side_connections.locked():
+        async with _side_connections:
+            total, result = await asyncio.gather(
+                _estimate_in_new_session(query),
+                db.execute(page_query)
+            )
+        attractions = row_dicts(result)
+    elif need_total:
+        attractions = row_dicts(await db.execute(page_query))
+        total = await estimate_total(query, db)
+    else:
+        attractions = row_dicts(await db.execute(page_query))
+
+    if need_total and total_mode == "exact":
+        attraction_counts.set(key, total)
+
+    next_cursor = None
+    if len(attractions) > page_size:
+        attractions = attractions[:page_size]
+        last = attractions[-1]
+        next_cursor = encode_cursor(last["sort_key"], last["id"], sort)
+    for attraction in attractions:
+        del attraction["sort_key"]
+
+    return attractions, total, next_cursor
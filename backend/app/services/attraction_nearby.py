@@ -0,0 +1,70 @@
+"""
+Поиск достопримечательностей рядом с точкой
+
+Кандидаты выбираются по geo_cell: круг покрывается несколькими ячейками
+(диапазонами Morton-кодов, app.core.geo), которые читаются index-only scan
+по частичному btree-индексу. Из кандидатов загружаются только id и
+координаты (тремя массивами в одной строке), точное расстояние считается
+гаверсинусом в NumPy, и полные строки запрашиваются лишь для ближайших
+limit записей.
+"""
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.geo import covering_ranges, haversine_m
+from app.core.responses import row_dicts
+from app.db.models.attraction import Attraction
+from app.services.attraction_listing import ATTRACTION_COLUMNS
+
+
+async def find_nearby(
+    lat: float,
+    lon: float,
+    radius_m: float,
+    category: Optional[str],
+    limit: int,
+    db: AsyncSession
+) -> List[Dict[str, Any]]:
+    """Активные достопримечательности в радиусе radius_m, ближайшие первыми (с distance_m)"""
+    cells = or_(*[
+        and_(Attraction.geo_cell >= lo, Attraction.geo_cell < hi)
+        for lo, hi in covering_ranges(lat, lon, radius_m)
+    ])
+    # Одна строка из трех массивов: без разбора тысяч строк-кандидатов в Python
+    query = select(
+        func.array_agg(Attraction.id),
+        func.array_agg(Attraction.latitude),
+        func.array_agg(Attraction.longitude),
+    ).where(Attraction.is_active == True, cells)
+    if category:
+        query = query.where(Attraction.category == category)
+
+    candidate_ids, lats, lons = (await db.execute(query)).one()
+    if not candidate_ids:
+        return []
+
+    points = np.array([lats, lons], dtype=np.float64)
+    distances = haversine_m(lat, lon, points[0], points[1])
+    inside = np.flatnonzero(distances <= radius_m)
+    if inside.size > limit:
+        inside = inside[np.argpartition(distances[inside], limit - 1)[:limit]]
+    inside = inside[np.argsort(distances[inside], kind="stable")]
+
+    ids = np.array(candidate_ids, dtype=np.int64)[inside].tolist()
+    if not ids:
+        return []
+    rows = {
+        row["id"]: row
+        for row in row_dicts(await db.execute(select(*ATTRACTION_COLUMNS).where(Attraction.id.in_(ids))))
+    }
+
+    attractions = []
+    for attraction_id, distance in zip(ids, distances[inside].tolist()):
+        row = rows.get(attraction_id)
+        if row is not None:  # Строку могли удалить между запросами
+            row["distance_m"] = round(distance, 1)
+            attractions.append(row)
+    return attractions
@@ -0,0 +1,132 @@
+"""
+Полнотекстовый поиск достопримечательностей
+
+Совпадения ищутся по search_vector (GIN, конфигурация russian) через
+websearch_to_tsquery. Ранжируются не все совпадения, а не более
+CANDIDATE_POOL лучших по рейтингу: для частого слова это index-only scan
+ix_attractions_search_by_rating до набора кандидатов, для редкого - GIN.
+Порядок - ts_rank вместе с рейтингом; полные строки читаются только для
+итоговых limit. Если совпадений нет, а в БД есть pg_trgm (проверяется при
+старте приложения), ищутся похожие названия (опечатки) по триграммному
+индексу.
+
+Результаты популярных запросов кэшируются до изменения таблицы attractions
+(и не дольше SEARCH_CACHE_TTL_SECONDS).
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import Select, func, literal_column, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.responses import row_dicts
+from app.db.changes import changes
+from app.db.models.attraction import SEARCH_CONFIG, Attraction
+from app.services.attraction_listing import ATTRACTION_COLUMNS
+
+# Доля рейтинга в итоговой оценке (остальное - ts_rank, нормированный в [0, 1))
+RATING_WEIGHT = 0.3
+MAX_RATING = 5.0
+# Совпадений, ранжируемых ts_rank (лучшие по рейтингу); при меньшем числе
+# совпадений порядок точный
+CANDIDATE_POOL = 200
+
+# Наличие расширения pg_trgm (detect_trigram при старте приложения)
+trigram_available = False
+
+# (запрос, фильтры, limit) -> (версия attractions, строки, fuzzy)
+search_results = TTLCache(
+    max_size=settings.SEARCH_CACHE_MAX_SIZE,
+    ttl_seconds=settings.SEARCH_CACHE_TTL_SECONDS,
+)
+
+
+async def detect_trigram(db: AsyncSession) -> bool:
+    """
+    Проверить, установлено ли расширение pg_trgm
+
+    Вызывается при старте, а не в запросе: иначе первый нечеткий поиск
+    платил бы лишним выражением. После установки расширения нужен перезапуск.
+    """
+    global trigram_available
+    result = await db.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"))
+    trigram_available = result.scalar() is not None
+    return trigram_available
+
+
+def _filtered(query: Select, city_id: Optional[int], category: Optional[str]) -> Select:
+    query = query.where(Attraction.is_active == True)
+    if city_id:
+        query = query.where(Attraction.city_id == city_id)
+    if category:
+        query = query.where(Attraction.category == category)
+    return query
+
+
+def build_search_query(q: str, city_id: Optional[int], category: Optional[str], limit: int) -> Select:
+    """CANDIDATE_POOL лучших по рейтингу совпадений, упорядоченные по ts_rank и рейтингу"""
+    ts_query = func.websearch_to_tsquery(literal_column(f"'{SEARCH_CONFIG}'::regconfig"), q)
+    candidates = _filtered(
+        select(Attraction.id, Attraction.search_vector, Attraction.rating)
+        .where(Attraction.search_vector.op("@@")(ts_query)),
+        city_id,
+        category,
+    ).order_by(Attraction.rating.desc(), Attraction.id.desc()).limit(CANDIDATE_POOL).cte("candidates")
+
+    # Нормализация 32: rank / (rank + 1), чтобы ранг был сопоставим с рейтингом
+    score = (
+        func.ts_rank(candidates.c.search_vector, ts_query, 32) * (1 - RATING_WEIGHT)
+        + func.coalesce(candidates.c.rating, 0) / MAX_RATING * RATING_WEIGHT
+    ).label("score")
+    ranked = (
+        select(candidates.c.id, score)
+        .order_by(score.desc(), candidates.c.id.desc())
+        .limit(limit)
+        .cte("ranked")
+    )
+    return (
+        select(*ATTRACTION_COLUMNS)
+        .join(ranked, ranked.c.id == Attraction.id)
+        .order_by(ranked.c.score.desc(), Attraction.id.desc())
+    )
+
+
+def build_fuzzy_query(q: str, city_id: Optional[int], category: Optional[str], limit: int) -> Select:
+    """Похожие названия по триграммам (name % q использует ix_attractions_name_trgm)"""
+    similarity = func.similarity(Attraction.name, q)
+    return _filtered(
+        select(*ATTRACTION_COLUMNS).where(Attraction.name.op("%")(q)),
+        city_id,
+        category,
+    ).order_by(similarity.desc(), Attraction.id.desc()).limit(limit)
+
+
+async def search_attractions(
+    q: str,
+    city_id: Optional[int],
+    category: Optional[str],
+    limit: int,
+    db: AsyncSession
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    Найти достопримечательности
+
+    Returns:
+        (строки достопримечательностей, найдены ли они нечетким поиском)
+    """
+    key = (" ".join(q.lower().split()), city_id, category, limit)
+    version = changes.version("attractions")
+    cached = search_results.get(key)
+    if cached is not None and cached[0] == version:
+        # Копии: вызывающий дополняет строки (is_favorite)
+        return [dict(row) for row in cached[1]], cached[2]
+
+    attractions = row_dicts(await db.execute(build_search_query(q, city_id, category, limit)))
+    fuzzy = False
+    if not attractions and trigram_available:
+        attractions = row_dicts(await db.execute(build_fuzzy_query(q, city_id, category, limit)))
+        fuzzy = True
+
+    search_results.set(key, (version, [dict(row) for row in attractions], fuzzy))
+    return attractions, fuzzy
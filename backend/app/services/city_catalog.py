@@ -0,0 +1,87 @@
+import asyncio
+import time
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.http_cache import make_etag
+from app.core.responses import dump_json, row_dicts
+from app.db.changes import changes
+from app.db.models.city import City
+
+# Сериализованный ответ и его ETag
+CachedBody = Tuple[bytes, str]
+
+
+class CityCatalog:
+    """
+    In-process кэш каталога городов
+
+    Заполняется одним запросом, хранит готовые JSON-ответы со списком
+    и с каждым городом. Сбрасывается при изменении строк таблицы cities
+    (версия из ChangeTracker) и по TTL на случай изменений из других процессов.
+    """
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._version: Optional[int] = None
+        self._expires_at = 0.0
+        self._list: Optional[CachedBody] = None
+        self._by_id: Dict[int, CachedBody] = {}
+        self._lock = asyncio.Lock()
+
+    def is_fresh(self) -> bool:
+        """Актуален ли кэш"""
+        return (
+            self._list is not None
+            and self._version == changes.version("cities")
+            and self._expires_at > time.monotonic()
+        )
+
+    async def get_list(self, db: AsyncSession) -> CachedBody:
+        """Список активных городов"""
+        await self._ensure_loaded(db)
+        return self._list
+
+    async def get_city(self, city_id: int, db: AsyncSession) -> Optional[CachedBody]:
+        """Активный город по id или None"""
+        await self._ensure_loaded(db)
+        return self._by_id.get(city_id)
+
+    def invalidate(self) -> None:
+        """Сбросить кэш"""
+        self._version = None
+
+    async def _ensure_loaded(self, db: AsyncSession) -> None:
+        if self.is_fresh():
+            return
+
+        async with self._lock:
+            if self.is_fresh():
+                return
+
+            # Версию фиксируем до запроса: изменение во время загрузки вызовет повторную
+            version = changes.version("cities")
+            result = await db.execute(
+                select(City.id, City.name, City.country, City.is_active, City.created_at)
+                .where(City.is_active == True)
+                .order_by(City.name)
+            )
+            cities = row_dicts(result)
+
+            by_id = {}
+            for city in cities:
+                body = dump_json(city)
+                by_id[city["id"]] = (body, make_etag(body))
+
+            list_body = dump_json({"items": cities, "total": len(cities)})
+
+            self._list = (list_body, make_etag(list_body))
+            self._by_id = by_id
+            self._version = version
+            self._expires_at = time.monotonic() + self.ttl_seconds
+
+
+city_catalog = CityCatalog(settings.CATALOG_CACHE_TTL_SECONDS)
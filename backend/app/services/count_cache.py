@@ -0,0 +1,65 @@
+import time
+from typing import Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.db.changes import changes
+
+# Ключ фильтра списка: (city_id, category)
+FilterKey = Tuple[Optional[int], Optional[str]]
+
+
+class CountCache:
+    """
+    Кэш общего количества строк по ключу фильтра
+
+    Запись считается точной, пока версия таблицы не изменилась,
+    и устаревает по TTL в любом случае. Категория приходит из запроса,
+    поэтому число ключей ограничено: при переполнении вытесняются самые старые.
+    """
+
+    def __init__(self, table: str, ttl_seconds: int, max_entries: int = 10000):
+        self.table = table
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[FilterKey, Tuple[int, float, int]] = {}
+
+    def get(self, key: FilterKey, allow_stale: bool = False) -> Optional[int]:
+        """
+        Получить количество из кэша
+
+        Args:
+            key: Ключ фильтра
+            allow_stale: Вернуть значение, даже если таблица изменилась после его записи
+
+        Returns:
+            Количество или None, если в кэше нет подходящего значения
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        version, expires_at, total = entry
+        if expires_at < time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        if not allow_stale and version != changes.version(self.table):
+            return None
+        return total
+
+    def set(self, key: FilterKey, total: int) -> None:
+        """Сохранить точное количество для текущей версии таблицы"""
+        self._entries.pop(key, None)
+        if len(self._entries) >= self.max_entries:
+            self._entries.pop(next(iter(self._entries)))
+        self._entries[key] = (
+            changes.version(self.table),
+            time.monotonic() + self.ttl_seconds,
+            total,
+        )
+
+    def clear(self) -> None:
+        """Очистить кэш"""
+        self._entries.clear()
+
+
+attraction_counts = CountCache("attractions", settings.COUNT_CACHE_TTL_SECONDS)
@@ -0,0 +1,56 @@
+"""
+Счетчик избранного у достопримечательностей (attractions.favorites_count)
+
+Счетчик меняется тем же выражением, что и favorites: запросы добавления и
+удаления избранного подключают CTE из favorites_count_cte, поэтому лишних
+обращений к БД нет. Изменения в обход этих запросов (каскадное удаление
+пользователя, ручные правки) дают расхождение, которое исправляет reconcile
+(scripts/reconcile_favorites_count.py по расписанию).
+"""
+from typing import List
+
+from sqlalchemy import CTE, Select, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.attraction import Attraction
+from app.db.models.favorite import Favorite
+
+
+def favorites_count_cte(attraction_ids: Select, delta: int, name: str = "counted") -> CTE:
+    """CTE, меняющий счетчик на delta у достопримечательностей из подзапроса"""
+    return (
+        update(Attraction)
+        .where(Attraction.id.in_(attraction_ids))
+        .values(favorites_count=Attraction.favorites_count + delta)
+        .cte(name)
+    )
+
+
+async def reconcile(db: AsyncSession, dry_run: bool = False) -> List[int]:
+    """
+    Пересчитать счетчик по таблице favorites там, где он разошелся
+
+    Returns:
+        id исправленных (при dry_run - расходящихся) достопримечательностей
+    """
+    actual = (
+        select(Attraction.id, func.count(Favorite.id).label("count"))
+        .outerjoin(Favorite, Favorite.attraction_id == Attraction.id)
+        .group_by(Attraction.id)
+        .subquery()
+    )
+    drifted = Attraction.id == actual.c.id, Attraction.favorites_count != actual.c.count
+
+    if dry_run:
+        result = await db.execute(select(Attraction.id).where(*drifted).order_by(Attraction.id))
+        return list(result.scalars())
+
+    result = await db.execute(
+        update(Attraction)
+        .where(*drifted)
+        .values(favorites_count=actual.c.count)
+        .returning(Attraction.id)
+    )
+    fixed = sorted(result.scalars())
+    await db.commit()
+    return fixed
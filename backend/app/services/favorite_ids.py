@@ -0,0 +1,86 @@
+from array import array
+from bisect import bisect_left, insort
+from typing import Iterable, List, Optional, Set
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.changes import Change, changes
+from app.db.models.favorite import Favorite
+from app.services.favorite_versions import favorite_versions
+
+
+def contains(ids: array, attraction_id: int) -> bool:
+    """Есть ли id в отсортированном массиве"""
+    index = bisect_left(ids, attraction_id)
+    return index < len(ids) and ids[index] == attraction_id
+
+
+class FavoriteIdCache:
+    """
+    id избранных достопримечательностей по пользователям
+
+    Хранит отсортированный массив int (8 байт на id) и загружается при первом
+    обращении. После commit массив обновляется на месте по событиям changes;
+    если пользователь изменения неизвестен (массовая операция), кэш сбрасывается.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: int):
+        self._ids = TTLCache(max_size=max_size, ttl_seconds=ttl_seconds)
+
+    async def get(self, user_id: int, db: AsyncSession) -> array:
+        """Отсортированные id избранного пользователя"""
+        ids = self._ids.get(user_id)
+        if ids is not None:
+            return ids
+
+        version = favorite_versions.version(user_id)
+        result = await db.execute(
+            select(Favorite.attraction_id)
+            .where(Favorite.user_id == user_id)
+            .order_by(Favorite.attraction_id)
+        )
+        ids = array("l", result.scalars())
+        # Избранное изменилось во время запроса: массив может быть устаревшим
+        if favorite_versions.version(user_id) == version:
+            self._ids.set(user_id, ids)
+        return ids
+
+    async def flags(self, user_id: int, attraction_ids: Iterable[int], db: AsyncSession) -> Set[int]:
+        """Какие из attraction_ids в избранном пользователя"""
+        ids = await self.get(user_id, db)
+        return {attraction_id for attraction_id in attraction_ids if contains(ids, attraction_id)}
+
+    def invalidate(self, user_id: Optional[int] = None) -> None:
+        """Сбросить пользователя (или весь кэш, если user_id не указан)"""
+        if user_id is None:
+            self._ids.clear()
+        else:
+            self._ids.pop(user_id)
+
+    def _on_change(self, items: List[Change]) -> None:
+        for op, obj in items:
+            data = obj if isinstance(obj, dict) else getattr(obj, "__dict__", {})
+            user_id, attraction_id = data.get("user_id"), data.get("attraction_id")
+            if user_id is None:
+                self.invalidate()
+                continue
+
+            ids = self._ids.get(user_id)
+            if ids is None:
+                continue
+            if attraction_id is None or op == "update":
+                self.invalidate(user_id)
+            elif op == "insert" and not contains(ids, attraction_id):
+                insort(ids, attraction_id)
+            elif op == "delete" and contains(ids, attraction_id):
+                del ids[bisect_left(ids, attraction_id)]
+
+
+favorite_id_cache = FavoriteIdCache(
+    max_size=settings.FAVORITE_IDS_CACHE_MAX_SIZE,
+    ttl_seconds=settings.FAVORITE_IDS_CACHE_TTL_SECONDS,
+)
+changes.subscribe("favorites", favorite_id_cache._on_change)
@@ -0,0 +1,67 @@
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from app.core.config import settings
+from app.db.changes import Change, changes
+
+
+class FavoriteVersions:
+    """
+    Версии избранного по пользователям
+
+    Нужны для ETag персональных ответов (флаг is_favorite): изменение избранного
+    одного пользователя не сбрасывает кэш клиентов остальных. Если пользователь
+    изменения неизвестен (массовая операция), увеличивается общая эпоха.
+
+    Версия - номер изменения в общей последовательности. Хранятся max_size
+    пользователей, изменявших избранное последними; у остальных версия - номер
+    последнего вытесненного изменения. Он не меньше их собственного, поэтому
+    после вытеснения версия не возвращается к значению, которое клиент уже видел.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._epoch = 0
+        self._epoch_changed_at: Optional[float] = None
+        self._sequence = 0
+        # user_id -> (номер изменения, время); порядок - по времени изменения
+        self._versions: "OrderedDict[int, Tuple[int, float]]" = OrderedDict()
+        self._evicted: Tuple[int, float] = (0, 0.0)
+
+    def __len__(self) -> int:
+        return len(self._versions)
+
+    def version(self, user_id: int) -> str:
+        """Версия избранного пользователя"""
+        user_version, _ = self._versions.get(user_id, self._evicted)
+        return f"{self._epoch}.{user_version}"
+
+    def last_modified(self, user_id: int) -> float:
+        """Время последнего изменения избранного пользователя"""
+        _, changed_at = self._versions.get(user_id, self._evicted)
+        return max(
+            changed_at,
+            self._epoch_changed_at or changes.started_at,
+        )
+
+    def _on_change(self, items: List[Change]) -> None:
+        changed_at = changes.last_modified("favorites")
+        for _, obj in items:
+            user_id = getattr(obj, "user_id", None)
+            if user_id is None and isinstance(obj, dict):
+                user_id = obj.get("user_id")
+
+            if user_id is None:
+                self._epoch += 1
+                self._epoch_changed_at = changed_at
+                continue
+
+            self._sequence += 1
+            self._versions[user_id] = (self._sequence, changed_at)
+            self._versions.move_to_end(user_id)
+            while len(self._versions) > self.max_size:
+                _, self._evicted = self._versions.popitem(last=False)
+
+
+favorite_versions = FavoriteVersions(max_size=settings.FAVORITE_VERSIONS_MAX_SIZE)
+changes.subscribe("favorites", favorite_versions._on_change)
@@ -0,0 +1,130 @@
+"""
+Основа индексов в памяти, которые обновляются по событиям changes
+
+Индекс строится из БД (build) и после commit получает изменения строк.
+Изменение с полными данными строки применяется на месте; изменение без
+данных (массовые Core-операции, частичное обновление) приводит к
+перестроению в фоне.
+
+Перестроение читает строки из БД, строит новое содержимое в потоке (event
+loop не останавливается) и подменяет им старое. Изменения, пришедшие за это
+время, применяются и к старому содержимому, и повторно - к новому, поэтому
+снимок БД, прочитанный раньше них, их не затирает. Запрос перестроения во
+время перестроения запускает его еще раз после текущего.
+"""
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.changes import Change
+from app.db.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Строк за одно чтение курсора: между порциями event loop обслуживает запросы
+FETCH_CHUNK = 5000
+
+# (id строки, данные строки или None для удаления)
+ApplyRow = Callable[[int, Optional[Dict[str, Any]]], None]
+
+
+async def fetch_rows(db: AsyncSession, query: Select) -> List[Tuple[Any, ...]]:
+    """Строки запроса порциями по FETCH_CHUNK (серверный курсор)"""
+    result = await db.stream(query)
+    rows: List[Tuple[Any, ...]] = []
+    async for partition in result.partitions(FETCH_CHUNK):
+        rows.extend(tuple(row) for row in partition)
+    return rows
+
+
+class MemoryIndex(ABC):
+    """Индекс в памяти с фоновым перестроением"""
+
+    def __init__(self):
+        self._rebuild_task: Optional[asyncio.Task] = None
+        self._rebuild_requested = False
+        # Изменения, пришедшие во время перестроения (None - перестроения нет)
+        self._replay: Optional[List[Tuple[List[Change], Set[str], ApplyRow]]] = None
+        self.ready = False
+        # Растет при каждом изменении содержимого (для ETag ответов)
+        self.generation = 0
+
+    @abstractmethod
+    async def fetch(self, db: AsyncSession) -> List[Tuple[Any, ...]]:
+        """Строки для построения индекса"""
+
+    @abstractmethod
+    def prepare(self, rows: List[Tuple[Any, ...]]) -> Any:
+        """Содержимое индекса из строк; self не меняется (выполняется в потоке)"""
+
+    @abstractmethod
+    def install(self, state: Any) -> None:
+        """Заменить содержимое результатом prepare"""
+
+    async def build(self, db: AsyncSession) -> None:
+        """Построить индекс по данным БД"""
+        self.load(await self.fetch(db))
+
+    def load(self, rows: List[Tuple[Any, ...]]) -> None:
+        """Заменить содержимое индекса строками"""
+        self.install(self.prepare(rows))
+
+    def _apply_changes(self, items: List[Change], fields: Set[str], apply: ApplyRow) -> None:
+        """
+        Применить изменения строк через apply
+
+        Для удаления apply получает None. Если у изменения нет id или
+        хотя бы одного из fields, индекс перестраивается целиком.
+        """
+        if self._replay is not None:
+            self._replay.append((items, fields, apply))
+
+        for op, obj in items:
+            data = obj if isinstance(obj, dict) else getattr(obj, "__dict__", None)
+            row_id = data.get("id") if data else None
+            if row_id is None:
+                self._schedule_rebuild()
+                return
+
+            if op == "delete":
+                apply(row_id, None)
+            elif not fields <= data.keys():
+                # Частичное обновление: актуальные данные только в БД
+                self._schedule_rebuild()
+                return
+            else:
+                apply(row_id, data)
+
+    def _schedule_rebuild(self) -> None:
+        if self._rebuild_task is not None and not self._rebuild_task.done():
+            # Снимок текущего перестроения может не содержать этого изменения
+            self._rebuild_requested = True
+            return
+        try:
+            self._rebuild_task = asyncio.get_running_loop().create_task(self._rebuild())
+        except RuntimeError:  # вне event loop (скрипты): индекс перестроится при следующем старте
+            self.ready = False
+
+    async def _rebuild(self) -> None:
+        try:
+            while True:
+                self._rebuild_requested = False
+                self._replay = []
+                async with AsyncSessionLocal() as session:
+                    rows = await self.fetch(session)
+                state = await asyncio.to_thread(self.prepare, rows)
+
+                replay, self._replay = self._replay, None
+                self.install(state)
+                for items, fields, apply in replay:
+                    self._apply_changes(items, fields, apply)
+                if not self._rebuild_requested:
+                    break
+        except Exception:
+            logger.exception("%s rebuild failed", type(self).__name__)
+        finally:
+            self._replay = None
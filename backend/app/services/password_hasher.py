@@ -0,0 +1,144 @@
+"""
+Хеширование и проверка паролей вне event loop
+
+bcrypt занимает ~100 мс CPU на вызов; выполнение прямо в обработчике
+останавливает все остальные запросы воркера. Вызовы уходят в ограниченный
+пул потоков (или процессов), а при переполнении очереди запрос получает 503.
+"""
+import asyncio
+import time
+from bisect import bisect_left
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.security import get_password_hash, verify_password
+
+# Границы гистограмм (секунды): bcrypt с cost 12 - порядка 0.1-0.3 с
+HASH_BUCKETS = (0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 1.0, 2.5)
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _timed_call(func: Callable, *args: Any) -> Tuple[Any, float]:
+    """Выполнить функцию в воркере и вернуть результат с временем выполнения"""
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+class PasswordHasher:
+    """Пул для bcrypt с ограниченной очередью и метриками"""
+
+    def __init__(self, workers: int, max_queue: int, executor_type: str = "thread"):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.executor_type = executor_type
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+
+        # Метрики
+        self.completed = 0
+        self.rejected = 0
+        self.hash_seconds_total = 0.0
+        self.hash_seconds_max = 0.0
+        self.wait_seconds_total = 0.0
+        self.hash_counts: List[int] = [0] * (len(HASH_BUCKETS) + 1)
+        self.wait_counts: List[int] = [0] * (len(WAIT_BUCKETS) + 1)
+
+    @property
+    def queue_depth(self) -> int:
+        """Число вызовов, ожидающих свободного воркера"""
+        return max(0, self._pending - self.workers)
+
+    async def hash(self, password: str) -> str:
+        """Хеширование пароля"""
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Проверка пароля"""
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    def stats(self) -> Dict[str, Any]:
+        """Снимок метрик пула"""
+        return {
+            "workers": self.workers,
+            "in_flight": self._pending,
+            "queue_depth": self.queue_depth,
+            "max_queue": self.max_queue,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "hash_seconds_avg": self.hash_seconds_total / self.completed if self.completed else 0.0,
+            "hash_seconds_max": self.hash_seconds_max,
+            "wait_seconds_avg": self.wait_seconds_total / self.completed if self.completed else 0.0,
+        }
+
+    def hash_histogram(self) -> Dict[str, int]:
+        """Накопительная гистограмма времени bcrypt в воркере (le -> количество)"""
+        return _cumulative(HASH_BUCKETS, self.hash_counts)
+
+    def wait_histogram(self) -> Dict[str, int]:
+        """Накопительная гистограмма ожидания свободного воркера (le -> количество)"""
+        return _cumulative(WAIT_BUCKETS, self.wait_counts)
+
+    def shutdown(self) -> None:
+        """Остановить пул"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix="password-hasher"
+                )
+        return self._executor
+
+    async def _run(self, func: Callable, *args: Any) -> Any:
+        if self._pending >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, try again later",
+                headers={"Retry-After": "1"}
+            )
+
+        self._pending += 1
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            result, hash_seconds = await loop.run_in_executor(
+                self._get_executor(), _timed_call, func, *args
+            )
+        finally:
+            self._pending -= 1
+
+        wait_seconds = max(0.0, time.perf_counter() - started - hash_seconds)
+        self.completed += 1
+        self.hash_seconds_total += hash_seconds
+        self.hash_seconds_max = max(self.hash_seconds_max, hash_seconds)
+        self.hash_counts[bisect_left(HASH_BUCKETS, hash_seconds)] += 1
+        self.wait_seconds_total += wait_seconds
+        self.wait_counts[bisect_left(WAIT_BUCKETS, wait_seconds)] += 1
+        return result
+
+
+def _cumulative(buckets: Tuple[float, ...], counts: List[int]) -> Dict[str, int]:
+    result = {}
+    cumulative = 0
+    for bound, count in zip((*buckets, "+Inf"), counts):
+        cumulative += count
+        result[str(bound)] = cumulative
+    return result
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+    executor_type=settings.PASSWORD_HASH_EXECUTOR,
+)
@@ -0,0 +1,56 @@
+from typing import List, Optional
+
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.changes import Change, changes
+from app.db.models.user import User
+
+USER_COLUMNS = tuple(column.key for column in User.__table__.columns)
+
+
+class PrincipalCache:
+    """
+    Кэш пользователей для авторизации запросов
+
+    Хранит снимки колонок User и на каждый запрос отдает новый detached-объект,
+    чтобы запросы не делили один экземпляр. Запись сбрасывается после commit,
+    изменившего пользователя (в т.ч. is_active/is_admin), и по TTL.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: int):
+        self._users = TTLCache(max_size=max_size, ttl_seconds=ttl_seconds)
+
+    def get(self, user_id: int) -> Optional[User]:
+        """Пользователь из кэша или None"""
+        data = self._users.get(user_id)
+        if data is None:
+            return None
+
+        user = User(**data)
+        make_transient_to_detached(user)
+        return user
+
+    def set(self, user: User) -> None:
+        """Сохранить снимок пользователя"""
+        self._users.set(user.id, {key: getattr(user, key) for key in USER_COLUMNS})
+
+    def invalidate(self, user_id: Optional[int] = None) -> None:
+        """Сбросить пользователя (или весь кэш, если user_id не указан)"""
+        if user_id is None:
+            self._users.clear()
+        else:
+            self._users.pop(user_id)
+
+    def _on_change(self, items: List[Change]) -> None:
+        for _, obj in items:
+            user_id = obj.get("id") if isinstance(obj, dict) else getattr(obj, "id", None)
+            self.invalidate(user_id)
+
+
+principal_cache = PrincipalCache(
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+changes.subscribe("users", principal_cache._on_change)
@@ -0,0 +1,209 @@
+"""
+Отзывы и средняя оценка достопримечательностей
+
+Средняя хранится вместе с суммой и числом оценок (rating_sum, rating_count)
+и меняется тем же выражением, что и отзыв: запрос записи отзыва подключает
+CTE rated, который сдвигает суммы на разницу оценок и пересчитывает
+rating = rating_sum / rating_count. Пересчета по всем отзывам на чтении нет.
+До первого отзыва rating редакционный; после удаления последнего отзыва он
+сбрасывается в 0. Каскадные удаления обходят суммы - их исправляет recompute
+(scripts/recompute_ratings.py).
+
+rated возвращает строку достопримечательности: по ней обработчики changes
+(подсказки, кластеры) обновляются без перестроения.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import CTE, Float, Select, case, cast, delete, func, literal, select, true, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.changes import changes
+from app.db.models.attraction import Attraction
+from app.db.models.review import Review
+
+REVIEW_COLUMNS = (
+    Review.id, Review.user_id, Review.attraction_id, Review.rating,
+    Review.text, Review.created_at, Review.updated_at,
+)
+
+# Колонки достопримечательности для обработчиков changes (см. suggest_index, attraction_clusters)
+RATED_COLUMNS = (
+    Attraction.id, Attraction.city_id, Attraction.name, Attraction.is_active,
+    Attraction.latitude, Attraction.longitude, Attraction.rating, Attraction.rating_count,
+)
+
+
+def rating_delta_cte(source: CTE, sum_delta: Any, count_delta: Any) -> CTE:
+    """
+    CTE, сдвигающий суммы оценок достопримечательностей из source.attraction_id
+
+    source - всегда записанный отзыв, поэтому нулевое число оценок значит,
+    что удален последний отзыв: rating сбрасывается в 0.
+    """
+    new_sum = Attraction.rating_sum + sum_delta
+    new_count = Attraction.rating_count + count_delta
+    return (
+        update(Attraction)
+        .where(Attraction.id == source.c.attraction_id)
+        .values(
+            rating_sum=new_sum,
+            rating_count=new_count,
+            rating=case((new_count > 0, cast(new_sum, Float) / new_count), else_=0.0),
+        )
+        .returning(*RATED_COLUMNS)
+        .cte("rated")
+    )
+
+
+def _with_rated(review: CTE, rated: CTE) -> List[Any]:
+    """Колонки отзыва и (с префиксом attraction__) обновленной достопримечательности"""
+    return [
+        *[review.c[column.key] for column in REVIEW_COLUMNS],
+        *[rated.c[column.key].label(f"attraction__{column.key}") for column in RATED_COLUMNS],
+    ]
+
+
+def build_list_query(
+    attraction_id: int, limit: int, after: Optional[Tuple[datetime, int]] = None
+) -> Select:
+    """
+    Страница отзывов активной достопримечательности, новые первыми
+
+    Страница выбирается LATERAL-подзапросом к target, поэтому нет строк -
+    достопримечательности нет; одна строка с id NULL - отзывов нет.
+    """
+    target = select(Attraction.id).where(
+        Attraction.id == attraction_id,
+        Attraction.is_active == True
+    ).cte("target")
+    page = (
+        select(*REVIEW_COLUMNS)
+        .where(Review.attraction_id == target.c.id)
+        .order_by(Review.created_at.desc(), Review.id.desc())
+        .limit(limit)
+    )
+    if after:
+        page = page.where(tuple_(Review.created_at, Review.id) < tuple_(*after))
+    page = page.lateral("page")
+    return (
+        select(*[page.c[column.key] for column in REVIEW_COLUMNS])
+        .select_from(target.outerjoin(page, true()))
+        .order_by(page.c.created_at.desc(), page.c.id.desc())
+    )
+
+
+def build_create_query(user_id: int, attraction_id: int, rating: int, text: Optional[str]) -> Select:
+    """
+    Создание отзыва одним выражением
+
+    Нет строк - достопримечательности нет; id отзыва NULL - отзыв уже есть.
+    """
+    target = select(Attraction.id).where(
+        Attraction.id == attraction_id,
+        Attraction.is_active == True
+    ).cte("target")
+    inserted = (
+        pg_insert(Review)
+        .from_select(
+            ["user_id", "attraction_id", "rating", "text"],
+            select(literal(user_id), target.c.id, literal(rating), literal(text))
+        )
+        .on_conflict_do_nothing(constraint="unique_user_review")
+        .returning(*REVIEW_COLUMNS)
+        .cte("inserted")
+    )
+    rated = rating_delta_cte(inserted, inserted.c.rating, 1)
+    return (
+        select(*_with_rated(inserted, rated))
+        .select_from(target.outerjoin(inserted, true()).outerjoin(rated, true()))
+    )
+
+
+def build_update_query(user_id: int, attraction_id: int, rating: int, text: Optional[str]) -> Select:
+    """Изменение своего отзыва; старая оценка блокируется и вычитается из суммы"""
+    old = select(Review.id, Review.rating).where(
+        Review.user_id == user_id,
+        Review.attraction_id == attraction_id
+    ).with_for_update().cte("old")
+    updated = (
+        update(Review)
+        .where(Review.id == old.c.id)
+        .values(rating=rating, text=text, updated_at=func.now())
+        .returning(*REVIEW_COLUMNS, (Review.rating - old.c.rating).label("delta"))
+        .cte("updated")
+    )
+    rated = rating_delta_cte(updated, updated.c.delta, 0)
+    return select(*_with_rated(updated, rated)).select_from(updated.join(rated, true()))
+
+
+def build_delete_query(user_id: int, attraction_id: int) -> Select:
+    """Удаление своего отзыва с вычитанием оценки"""
+    deleted = (
+        delete(Review)
+        .where(Review.user_id == user_id, Review.attraction_id == attraction_id)
+        .returning(*REVIEW_COLUMNS)
+        .cte("deleted")
+    )
+    rated = rating_delta_cte(deleted, -deleted.c.rating, -1)
+    return select(*_with_rated(deleted, rated)).select_from(deleted.join(rated, true()))
+
+
+def split_row(row: Any) -> tuple[Dict[str, Any], Dict[str, Any]]:
+    """Строка запроса записи -> (отзыв, данные достопримечательности для changes)"""
+    data = row._asdict()
+    attraction = {
+        column.key: data.pop(f"attraction__{column.key}") for column in RATED_COLUMNS
+    }
+    return data, attraction
+
+
+async def recompute(db: AsyncSession, dry_run: bool = False) -> List[int]:
+    """
+    Пересчитать суммы и средние по таблице reviews там, где они разошлись
+
+    Разошедшиеся строки без отзывов (отзывы удалены каскадом) получают
+    rating 0, как после удаления последнего отзыва.
+
+    Returns:
+        id исправленных (при dry_run - расходящихся) достопримечательностей
+    """
+    actual = (
+        select(
+            Attraction.id,
+            func.coalesce(func.sum(Review.rating), 0).label("total"),
+            func.count(Review.id).label("count"),
+        )
+        .outerjoin(Review, Review.attraction_id == Attraction.id)
+        .group_by(Attraction.id)
+        .subquery()
+    )
+    average = cast(actual.c.total, Float) / func.nullif(actual.c.count, 0)
+    drifted = (
+        Attraction.id == actual.c.id,
+        (Attraction.rating_sum != actual.c.total)
+        | (Attraction.rating_count != actual.c.count)
+        | ((actual.c.count > 0) & (Attraction.rating != average)),
+    )
+
+    if dry_run:
+        result = await db.execute(select(Attraction.id).where(*drifted).order_by(Attraction.id))
+        return list(result.scalars())
+
+    result = await db.execute(
+        update(Attraction)
+        .where(*drifted)
+        .values(
+            rating_sum=actual.c.total,
+            rating_count=actual.c.count,
+            rating=case((actual.c.count > 0, average), else_=0.0),
+        )
+        .returning(Attraction.id)
+    )
+    fixed = sorted(result.scalars())
+    if fixed:
+        # Массовое изменение: подсказки и кластеры перестраиваются целиком
+        changes.mark(db, "attractions", "update")
+    await db.commit()
+    return fixed
@@ -0,0 +1,233 @@
+"""
+Подсказки по префиксу названий городов и достопримечательностей
+
+Индекс целиком в памяти: отсортированный массив токенов (хвосты названия,
+начинающиеся с каждого слова: "московский кремль", "кремль") и параллельный
+массив ключей ранга. Ключ ранга - одно целое, в котором упакованы порядок
+записи (город, рейтинг, длина названия) и ее ссылка, поэтому лучшие k записей
+диапазона выбираются сравнением чисел, без Python-функции ключа. Префикс
+находится бинарным поиском. Для префиксов с большим диапазоном совпадений
+лучшие k запоминаются (top-k на узел) и поддерживаются при вставке; удаление
+записи сбрасывает только затронутые списки.
+
+Индекс строится при старте из City и Attraction и обновляется после commit
+по событиям changes. Изменения без данных строки (массовые Core-операции)
+приводят к перестроению в фоне.
+"""
+import re
+from array import array
+from bisect import bisect_left
+from heapq import merge, nlargest
+from operator import itemgetter
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import literal, null, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.changes import Change, changes
+from app.db.models.attraction import Attraction
+from app.db.models.city import City
+from app.services.memory_index import MemoryIndex, fetch_rows
+
+MAX_LIMIT = 20
+# Диапазон, который просматривается целиком; шире - используется top-k префикса
+SCAN_LIMIT = 256
+# Длина хранимого токена; более длинные запросы дофильтровываются по названию
+TOKEN_MAX_LEN = 32
+# Токенов в одной сортировке при построении (см. prepare)
+SORT_CHUNK = 50000
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+_REF_OFFSET = 1 << 32
+_REF_MASK = (1 << 33) - 1
+
+# Запись: (тип, id, название, city_id, рейтинг, нормализованное название)
+Entry = Tuple[str, int, str, Optional[int], float, str]
+
+
+def normalize(text: str) -> str:
+    """Нижний регистр, ё -> е, слова через один пробел"""
+    return _NON_WORD.sub(" ", text.lower().replace("ё", "е")).strip()
+
+
+def tokens(normalized: str) -> List[str]:
+    """Хвосты названия от начала каждого слова"""
+    words = normalized.split()
+    return [" ".join(words[i:])[:TOKEN_MAX_LEN] for i in range(len(words))]
+
+
+def entry_ref(kind: str, entry_id: int) -> int:
+    """Ссылка на запись: города - отрицательные id, достопримечательности - положительные"""
+    return -entry_id if kind == "city" else entry_id
+
+
+def rank_key(ref: int, entry: Entry) -> int:
+    """
+    Ключ ранга: больше - выше в подсказках
+
+    Биты (старшие первыми): город (1), рейтинг * 100 (9), 1023 - длина
+    названия (10), ссылка со смещением 2**32 (33).
+    """
+    kind, _, name, _, rating, _ = entry
+    rating_bits = min(max(int(round(rating * 100)), 0), 511)
+    length_bits = 1023 - min(len(name), 1023)
+    return (((kind == "city") << 19 | rating_bits << 10 | length_bits) << 33) | (ref + _REF_OFFSET)
+
+
+def key_ref(key: int) -> int:
+    """Ссылка на запись из ключа ранга"""
+    return (key & _REF_MASK) - _REF_OFFSET
+
+
+class SuggestIndex(MemoryIndex):
+    """Префиксный индекс названий с ранжированием: города, затем рейтинг"""
+
+    def __init__(self):
+        super().__init__()
+        self._entries: Dict[int, Entry] = {}
+        self._keys: List[str] = []
+        self._ranks = array("q")
+        self._top: Dict[str, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def token_count(self) -> int:
+        return len(self._keys)
+
+    async def fetch(self, db: AsyncSession) -> List[Tuple[str, int, str, Optional[int], float]]:
+        """Активные города и достопримечательности: (тип, id, название, city_id, рейтинг)"""
+        cities = await fetch_rows(db, select(
+            literal("city"), City.id, City.name, null(), literal(0.0)
+        ).where(City.is_active == True))
+        attractions = await fetch_rows(db, select(
+            literal("attraction"), Attraction.id, Attraction.name, Attraction.city_id, Attraction.rating
+        ).where(Attraction.is_active == True))
+        return cities + attractions
+
+    def prepare(
+        self, rows: List[Tuple[str, int, str, Optional[int], float]]
+    ) -> Tuple[Dict[int, Entry], List[str], array]:
+        """Записи, отсортированные токены и ключи ранга по строкам (тип, id, название, city_id, рейтинг)"""
+        entries: Dict[int, Entry] = {}
+        pairs: List[Tuple[str, int]] = []
+        for kind, entry_id, name, city_id, rating in rows:
+            ref = entry_ref(kind, entry_id)
+            entry = entries[ref] = (kind, entry_id, name, city_id, rating or 0.0, normalize(name))
+            key = rank_key(ref, entry)
+            pairs.extend((token, key) for token in tokens(entry[5]))
+        # Порядок записей с одинаковым токеном не важен: сравниваются только строки.
+        # list.sort не отпускает GIL на все время сортировки, поэтому большой массив
+        # сортируется частями, а слияние (Python-код) уступает поток event loop
+        chunks = [sorted(pairs[i:i + SORT_CHUNK], key=itemgetter(0)) for i in range(0, len(pairs), SORT_CHUNK)]
+        pairs = list(merge(*chunks, key=itemgetter(0)))
+        return entries, [token for token, _ in pairs], array("q", (key for _, key in pairs))
+
+    def install(self, state: Tuple[Dict[int, Entry], List[str], array]) -> None:
+        self._entries, self._keys, self._ranks = state
+        self._top = {}
+        self.ready = True
+        self.generation += 1
+
+    def suggest(self, q: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Лучшие записи, у которых слово названия начинается с q"""
+        query = normalize(q)
+        if not query or not self.ready:
+            return []
+
+        limit = min(limit, MAX_LIMIT)
+        prefix = query[:TOKEN_MAX_LEN]
+        if len(query) > TOKEN_MAX_LEN:
+            # Токены обрезаны: проверяем совпадение по полному названию
+            lo, hi = self._range(prefix)
+            keys = [
+                key for key in set(self._ranks[lo:hi])
+                if f" {query}" in f" {self._entries[key_ref(key)][5]}"
+            ]
+            top = nlargest(limit, keys)
+        else:
+            top = self._top_keys(prefix)[:limit]
+
+        return [self._item(key_ref(key)) for key in top]
+
+    def upsert(self, kind: str, entry_id: int, name: str, city_id: Optional[int], rating: float) -> None:
+        """Добавить или обновить запись"""
+        self.remove(kind, entry_id)
+        ref = entry_ref(kind, entry_id)
+        entry = self._entries[ref] = (kind, entry_id, name, city_id, rating or 0.0, normalize(name))
+        self.generation += 1
+
+        key = rank_key(ref, entry)
+        for token in tokens(entry[5]):
+            index = bisect_left(self._keys, token)
+            self._keys.insert(index, token)
+            self._ranks.insert(index, key)
+            # Поддержать сохраненные top-k всех префиксов токена
+            for end in range(1, len(token) + 1):
+                top = self._top.get(token[:end])
+                if top is None or key in top:
+                    continue
+                if len(top) < MAX_LIMIT or key > top[-1]:
+                    top.append(key)
+                    top.sort(reverse=True)
+                    del top[MAX_LIMIT:]
+
+    def remove(self, kind: str, entry_id: int) -> None:
+        """Удалить запись (если она есть)"""
+        ref = entry_ref(kind, entry_id)
+        entry = self._entries.pop(ref, None)
+        if entry is None:
+            return
+        self.generation += 1
+
+        key = rank_key(ref, entry)
+        for token in tokens(entry[5]):
+            index = bisect_left(self._keys, token)
+            while index < len(self._keys) and self._keys[index] == token:
+                if self._ranks[index] == key:
+                    del self._keys[index]
+                    del self._ranks[index]
+                    break
+                index += 1
+            for end in range(1, len(token) + 1):
+                top = self._top.get(token[:end])
+                if top is not None and key in top:
+                    del self._top[token[:end]]
+
+    def _range(self, prefix: str) -> Tuple[int, int]:
+        lo = bisect_left(self._keys, prefix)
+        return lo, bisect_left(self._keys, prefix + "\uffff", lo)
+
+    def _top_keys(self, prefix: str) -> List[int]:
+        top = self._top.get(prefix)
+        if top is not None:
+            return top
+
+        lo, hi = self._range(prefix)
+        # Одна запись может встречаться в диапазоне несколькими токенами
+        top = nlargest(MAX_LIMIT, set(self._ranks[lo:hi]))
+        if hi - lo > SCAN_LIMIT:
+            self._top[prefix] = top
+        return top
+
+    def _item(self, ref: int) -> Dict[str, Any]:
+        kind, entry_id, name, city_id, _, _ = self._entries[ref]
+        return {"type": kind, "id": entry_id, "name": name, "city_id": city_id}
+
+    def _on_change(self, kind: str, items: List[Change]) -> None:
+        self._apply_changes(
+            items, {"name", "is_active"}, lambda entry_id, data: self._apply_row(kind, entry_id, data)
+        )
+
+    def _apply_row(self, kind: str, entry_id: int, data: Optional[Dict[str, Any]]) -> None:
+        if data is None or not data["is_active"]:
+            self.remove(kind, entry_id)
+        else:
+            self.upsert(kind, entry_id, data["name"], data.get("city_id"), data.get("rating") or 0.0)
+
+
+suggest_index = SuggestIndex()
+changes.subscribe("cities", lambda items: suggest_index._on_change("city", items))
+changes.subscribe("attractions", lambda items: suggest_index._on_change("attraction", items))
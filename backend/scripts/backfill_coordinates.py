@@ -0,0 +1,138 @@
+"""
+Заполнение координат достопримечательностей
+
+Источники:
+    --csv FILE    CSV с колонками id,latitude,longitude (например, выгрузка
+                  из справочника или ручная разметка);
+    --geocode     геокодирование адреса "address, город" через Nominatim
+                  (OpenStreetMap, не чаще 1 запроса в секунду) для записей
+                  без координат;
+    --recompute   пересчитать geo_cell для всех записей с координатами
+                  (после изменения схемы ячеек или записи координат в обход ORM).
+
+geo_cell вычисляется здесь же: массовые UPDATE идут через Core, минуя
+ORM-событие модели.
+
+Использование:
+    python scripts/backfill_coordinates.py --csv coordinates.csv
+    python scripts/backfill_coordinates.py --geocode --limit 100
+    python scripts/backfill_coordinates.py --recompute
+"""
+import argparse
+import asyncio
+import csv
+import sys
+from pathlib import Path
+
+# Добавляем путь к проекту
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx
+from sqlalchemy import bindparam, select, update
+from app.core.geo import geo_cell
+from app.db.changes import changes
+from app.db.models import Attraction, City
+from app.db.session import AsyncSessionLocal, engine
+
+BATCH_SIZE = 1000
+NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
+NOMINATIM_DELAY_SECONDS = 1.0
+USER_AGENT = "tourist-app-backfill/1.0"
+
+# Core-таблица: executemany по своим id (ORM-вариант требует bulk-режима по первичному ключу)
+attractions_table = Attraction.__table__
+UPDATE_COORDINATES = (
+    update(attractions_table)
+    .where(attractions_table.c.id == bindparam("attraction_id"))
+    .values(latitude=bindparam("lat"), longitude=bindparam("lon"), geo_cell=bindparam("cell"))
+)
+
+
+async def save(rows: list[tuple[int, float, float]]) -> None:
+    """Записать координаты пачками (id, широта, долгота)"""
+    async with AsyncSessionLocal() as session:
+        for start in range(0, len(rows), BATCH_SIZE):
+            batch = rows[start:start + BATCH_SIZE]
+            await session.execute(UPDATE_COORDINATES, [
+                {"attraction_id": attraction_id, "lat": lat, "lon": lon, "cell": geo_cell(lat, lon)}
+                for attraction_id, lat, lon in batch
+            ])
+            changes.mark(session, "attractions", "update")
+            await session.commit()
+            print(f"  обновлено {start + len(batch)}/{len(rows)}")
+
+
+def read_csv(path: str) -> list[tuple[int, float, float]]:
+    """Строки CSV id,latitude,longitude с проверкой диапазонов"""
+    rows = []
+    with open(path, newline="", encoding="utf-8") as file:
+        for line, record in enumerate(csv.DictReader(file), start=2):
+            lat, lon = float(record["latitude"]), float(record["longitude"])
+            if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+                raise ValueError(f"{path}:{line}: координаты вне диапазона: {lat}, {lon}")
+            rows.append((int(record["id"]), lat, lon))
+    return rows
+
+
+async def geocode(limit: int) -> list[tuple[int, float, float]]:
+    """Координаты записей без latitude по адресу и названию города"""
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(Attraction.id, Attraction.name, Attraction.address, City.name.label("city"))
+            .join(City, City.id == Attraction.city_id)
+            .where(Attraction.latitude.is_(None))
+            .order_by(Attraction.id)
+            .limit(limit)
+        )
+        pending = result.all()
+
+    rows = []
+    async with httpx.AsyncClient(headers={"User-Agent": USER_AGENT}, timeout=10) as client:
+        for index, item in enumerate(pending):
+            if index:
+                await asyncio.sleep(NOMINATIM_DELAY_SECONDS)
+            query = f"{item.address or item.name}, {item.city}"
+            response = await client.get(NOMINATIM_URL, params={"q": query, "format": "json", "limit": 1})
+            response.raise_for_status()
+            found = response.json()
+            if found:
+                rows.append((item.id, float(found[0]["lat"]), float(found[0]["lon"])))
+            else:
+                print(f"  не найдено: #{item.id} {query}")
+    return rows
+
+
+async def recompute() -> list[tuple[int, float, float]]:
+    """Все записи с координатами (geo_cell будет вычислен заново)"""
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(Attraction.id, Attraction.latitude, Attraction.longitude)
+            .where(Attraction.latitude.is_not(None), Attraction.longitude.is_not(None))
+        )
+        return [tuple(row) for row in result]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--csv", help="CSV с колонками id,latitude,longitude")
+    source.add_argument("--geocode", action="store_true", help="Геокодировать адреса через Nominatim")
+    source.add_argument("--recompute", action="store_true", help="Пересчитать geo_cell")
+    parser.add_argument("--limit", type=int, default=100, help="Максимум записей для --geocode")
+    args = parser.parse_args()
+
+    try:
+        if args.csv:
+            rows = read_csv(args.csv)
+        elif args.geocode:
+            rows = await geocode(args.limit)
+        else:
+            rows = await recompute()
+        print(f"Координат к записи: {len(rows)}")
+        await save(rows)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,192 @@
+"""
+Бенчмарк списка достопримечательностей на большой таблице
+
+Заполняет отдельный город синтетическими данными (generate_series)
+и замеряет задержку GET /api/v1/attractions в разных режимах,
+а также старый (COUNT + страница) и новый (одним запросом) пути под нагрузкой.
+
+Использование:
+    python scripts/bench_attractions.py --rows 1000000 --requests 200 --concurrency 20
+    python scripts/bench_attractions.py --cleanup
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Добавляем путь к проекту
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+# EXPLAIN медленных запросов (COUNT по 1M строк) искажал бы замеры
+os.environ.setdefault("SLOW_QUERY_THRESHOLD_MS", "0")
+
+import httpx
+from sqlalchemy import select, func, text, delete
+from app.main import app
+from app.db.session import AsyncSessionLocal, engine, init_db
+from app.db.models import City, Attraction
+from app.db.changes import changes
+from app.services.count_cache import attraction_counts
+from app.services.attraction_listing import build_list_query, count_total, fetch_page
+
+BENCH_CITY = "Benchmark City"
+SEED_BATCH = 100000
+
+
+async def seed(rows: int) -> int:
+    """Создать город и довести число его достопримечательностей до rows"""
+    async with AsyncSessionLocal() as session:
+        city_id = (await session.execute(
+            select(City.id).where(City.name == BENCH_CITY)
+        )).scalar()
+        if city_id is None:
+            city = City(name=BENCH_CITY, country="Benchmark")
+            session.add(city)
+            await session.commit()
+            city_id = city.id
+
+        existing = (await session.execute(
+            select(func.count()).select_from(Attraction).where(Attraction.city_id == city_id)
+        )).scalar()
+
+        for start in range(existing + 1, rows + 1, SEED_BATCH):
+            stop = min(start + SEED_BATCH - 1, rows)
+            await session.execute(text("""
+                INSERT INTO attractions
+                    (city_id, name, description, address, category, rating, is_active, created_at)
+                SELECT :city_id, 'Bench ' || g, repeat('Описание ', 20), 'Адрес ' || g,
+                       (ARRAY['Музей', 'Парк', 'Храм', 'Театр'])[1 + g % 4],
+                       (g % 50) / 10.0, true, now() - g * interval '1 second'
+                FROM generate_series(CAST(:start AS integer), CAST(:stop AS integer)) AS g
+            """), {"city_id": city_id, "start": start, "stop": stop})
+            changes.mark(session, "attractions", "insert")
+            await session.commit()
+            print(f"  вставлено {stop}/{rows}")
+
+        await session.execute(text("ANALYZE attractions"))
+        await session.commit()
+
+    return city_id
+
+
+async def cleanup() -> None:
+    """Удалить тестовый город вместе с достопримечательностями"""
+    async with AsyncSessionLocal() as session:
+        await session.execute(delete(City).where(City.name == BENCH_CITY))
+        changes.mark(session, "cities", "delete")
+        changes.mark(session, "attractions", "delete")
+        await session.commit()
+
+
+def report(label: str, samples: list[float]) -> None:
+    """Вывести p50/p99 в миллисекундах"""
+    percentiles = statistics.quantiles(samples, n=100)
+    print(f"{label:<40} p50={percentiles[49]:8.2f} ms  p99={percentiles[98]:8.2f} ms")
+
+
+async def measure(client: httpx.AsyncClient, params: dict, requests: int, cold: bool = False) -> list[float]:
+    """Последовательно выполнить запросы и вернуть задержки в мс"""
+    samples = []
+    for _ in range(requests):
+        if cold:
+            attraction_counts.clear()
+        started = time.perf_counter()
+        response = await client.get("/api/v1/attractions", params=params)
+        samples.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+    return samples
+
+
+async def run_count_modes(client: httpx.AsyncClient, city_id: int, requests: int) -> None:
+    """Сравнение режимов total_mode"""
+    base = {"city_id": city_id, "page_size": 20}
+    print("\ntotal_mode:")
+    report("exact, без кэша (COUNT на каждый вызов)", await measure(client, base, requests, cold=True))
+    report("exact, кэш прогрет", await measure(client, base, requests))
+    attraction_counts.clear()
+    report("estimate", await measure(client, {**base, "total_mode": "estimate"}, requests, cold=True))
+    report("none", await measure(client, {**base, "total_mode": "none"}, requests))
+
+
+async def legacy_page(city_id: int, page_size: int) -> None:
+    """Старый путь: COUNT и страница последовательно в одной сессии"""
+    query = build_list_query(city_id, None)
+    async with AsyncSessionLocal() as session:
+        await count_total(query, session)
+        await session.execute(
+            query.order_by(Attraction.created_at.desc()).offset(0).limit(page_size)
+        )
+
+
+async def single_query_page(city_id: int, page_size: int, cursor: str = None) -> None:
+    """Новый путь через fetch_page с холодным кэшем количества"""
+    attraction_counts.clear()
+    async with AsyncSessionLocal() as session:
+        await fetch_page(
+            build_list_query(city_id, None), (city_id, None),
+            1, page_size, cursor, "exact", session
+        )
+
+
+async def run_concurrent(call, requests: int, concurrency: int) -> list[float]:
+    """Выполнить requests вызовов с ограничением параллельности и вернуть задержки в мс"""
+    semaphore = asyncio.Semaphore(concurrency)
+    samples = []
+
+    async def timed():
+        async with semaphore:
+            started = time.perf_counter()
+            await call()
+            samples.append((time.perf_counter() - started) * 1000)
+
+    await asyncio.gather(*(timed() for _ in range(requests)))
+    return samples
+
+
+async def run_list_paths(city_id: int, requests: int, concurrency: int) -> None:
+    """Сравнение старого и нового пути выборки страницы с total"""
+    page_size = 20
+    async with AsyncSessionLocal() as session:
+        _, _, cursor = await fetch_page(
+            build_list_query(city_id, None), (city_id, None),
+            1, page_size, None, "none", session
+        )
+
+    print(f"\nстраница + total, параллельность {concurrency}:")
+    report("старый путь (COUNT, затем страница)",
+           await run_concurrent(lambda: legacy_page(city_id, page_size), requests, concurrency))
+    report("страница и COUNT одним запросом",
+           await run_concurrent(lambda: single_query_page(city_id, page_size), requests, concurrency))
+    report("курсор, COUNT тем же запросом",
+           await run_concurrent(lambda: single_query_page(city_id, page_size, cursor), requests, concurrency))
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000, help="Число достопримечательностей")
+    parser.add_argument("--requests", type=int, default=200, help="Запросов на сценарий")
+    parser.add_argument("--concurrency", type=int, default=20, help="Параллельных запросов")
+    parser.add_argument("--cleanup", action="store_true", help="Удалить тестовые данные и выйти")
+    args = parser.parse_args()
+
+    try:
+        if args.cleanup:
+            await cleanup()
+            return
+
+        await init_db()
+        print(f"📝 Подготовка {args.rows} строк...")
+        city_id = await seed(args.rows)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await run_count_modes(client, city_id, args.requests)
+        await run_list_paths(city_id, args.requests, args.concurrency)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,152 @@
+"""
+Бенчмарк кластеров достопримечательностей для карты
+
+Строит кластеры из синтетических точек (несколько городов, точки вокруг
+центра) и выводит время построения, память и задержку ответа для видимой
+области телефона на разных zoom: вызов индекса и полный HTTP-запрос
+GET /api/v1/attractions/clusters. Затем замеряет инкрементальные изменения;
+с --verify сверяет результат после них с построением с нуля.
+
+Использование:
+    python scripts/bench_clusters.py --cities 20 --points 5000
+    python scripts/bench_clusters.py --verify
+"""
+import argparse
+import asyncio
+import math
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Добавляем путь к проекту
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx
+from app.main import app
+from app.services.attraction_clusters import MAX_ZOOM, MIN_ZOOM, ClusterIndex, cluster_index
+
+# Видимая область телефона: ~400x800 px на тайлах 256 px
+VIEW_TILES = (1.6, 3.2)
+
+
+def synthetic_rows(cities: int, points: int, seed: int = 42) -> list[tuple]:
+    """Точки с нормальным разбросом ~10 км вокруг центров городов"""
+    rng = random.Random(seed)
+    rows, attraction_id = [], 0
+    for city_id in range(1, cities + 1):
+        center_lat, center_lon = rng.uniform(44, 64), rng.uniform(30, 130)
+        for _ in range(points):
+            attraction_id += 1
+            lat = center_lat + rng.gauss(0, 0.09)
+            lon = center_lon + rng.gauss(0, 0.09 / math.cos(math.radians(center_lat)))
+            rows.append((attraction_id, city_id, lat, lon, round(rng.uniform(0, 5), 1)))
+    return rows
+
+
+def viewport(lat: float, lon: float, zoom: int) -> tuple[float, float, float, float]:
+    """Прямоугольник видимой области телефона вокруг точки"""
+    half_lon = VIEW_TILES[0] * 360 / 2 ** zoom / 2
+    half_lat = VIEW_TILES[1] * 360 / 2 ** zoom / 2 * math.cos(math.radians(lat))
+    return lon - half_lon, lat - half_lat, lon + half_lon, lat + half_lat
+
+
+def report(label: str, samples: list[float], found: int) -> None:
+    percentiles = statistics.quantiles(samples, n=100)
+    print(f"{label:<16} p50={percentiles[49]:8.3f} ms  p99={percentiles[98]:8.3f} ms  кластеров={found}")
+
+
+def snapshot(index: ClusterIndex) -> dict:
+    """Содержимое всех уровней для сравнения"""
+    return {
+        (zoom, item["sample_id"], item["count"], round(item["latitude"], 5), round(item["longitude"], 5))
+        for zoom in range(MIN_ZOOM, MAX_ZOOM + 1)
+        for item in index.clusters(-180, -90, 180, 90, zoom)
+    }
+
+
+async def http_latency(rows: list[tuple], requests: int) -> None:
+    """Полный запрос к эндпоинту (без If-None-Match)"""
+    cluster_index.load(rows)
+    _, _, lat, lon, _ = rows[0]
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for zoom in (10, 13, 16):
+            bbox = ",".join(str(value) for value in viewport(lat, lon, zoom))
+            samples, found = [], 0
+            for _ in range(requests):
+                started = time.perf_counter()
+                response = await client.get("/api/v1/attractions/clusters", params={"bbox": bbox, "zoom": zoom})
+                samples.append((time.perf_counter() - started) * 1000)
+                found = len(response.json()["items"])
+            report(f"HTTP zoom={zoom}", samples, found)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cities", type=int, default=20, help="Число городов")
+    parser.add_argument("--points", type=int, default=5000, help="Точек на город")
+    parser.add_argument("--requests", type=int, default=500, help="Запросов на сценарий")
+    parser.add_argument("--verify", action="store_true", help="Сверить инкрементальные изменения с построением")
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.cities, args.points)
+    tracemalloc.start()
+    measured = ClusterIndex()
+    measured.load(rows)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del measured
+
+    index = ClusterIndex()
+    started = time.perf_counter()
+    index.load(rows)
+    print(f"Построение: {(time.perf_counter() - started) * 1000:.0f} ms для {len(rows)} точек, "
+          f"{MAX_ZOOM - MIN_ZOOM + 1} уровней")
+    print(f"Память: {memory / 2**20:.1f} MiB, {memory / len(rows):.0f} байт на точку\n")
+
+    _, _, lat, lon, _ = rows[0]
+    for zoom in (4, 8, 10, 12, 13, 14, 16, 18):
+        box = viewport(lat, lon, zoom)
+        samples = []
+        for _ in range(args.requests):
+            begin = time.perf_counter()
+            found = len(index.clusters(*box, zoom))
+            samples.append((time.perf_counter() - begin) * 1000)
+        report(f"zoom={zoom}", samples, found)
+    print()
+
+    rng = random.Random(7)
+    current = {row[0]: row for row in rows}
+    samples = []
+    for _ in range(args.requests):
+        attraction_id = rng.choice(list(current)) if rng.random() < 0.7 else max(current) + 1
+        begin = time.perf_counter()
+        if rng.random() < 0.2 and attraction_id in current:
+            index.remove(attraction_id)
+            del current[attraction_id]
+        else:
+            _, city_id, old_lat, old_lon, _ = current.get(attraction_id, rows[0])
+            row = (attraction_id, city_id, old_lat + rng.gauss(0, 0.01), old_lon + rng.gauss(0, 0.01),
+                   round(rng.uniform(0, 5), 1))
+            index.upsert(*row)
+            current[attraction_id] = row
+        samples.append((time.perf_counter() - begin) * 1000)
+    report("Изменение точки", samples, len(index))
+
+    if args.verify:
+        fresh = ClusterIndex()
+        fresh.load(list(current.values()))
+        ok = snapshot(index) == snapshot(fresh)
+        print("Сверка с построением с нуля:", "совпадает" if ok else "РАСХОЖДЕНИЕ")
+        if not ok:
+            sys.exit(1)
+    print()
+
+    asyncio.run(http_latency(rows, args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Бенчмарк добавления и удаления избранного
+
+Регистрирует временного пользователя и замеряет через HTTP:
+переключение одной записи (POST /api/v1/favorites + DELETE) и пакетное
+изменение (POST /api/v1/favorites/batch) на N записей. Для каждого
+сценария выводится задержка и число SQL-выражений на запрос (из заголовка
+Server-Timing, включая поиск пользователя при холодном кэше).
+
+Использование:
+    python scripts/bench_favorites.py --toggles 500 --batch 50
+"""
+import argparse
+import asyncio
+import re
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Добавляем путь к проекту
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx
+from sqlalchemy import delete, select
+from app.main import app
+from app.db.session import AsyncSessionLocal, engine
+from app.db.models import Attraction, Favorite, User
+from app.services.password_hasher import password_hasher
+
+PASSWORD = "bench-password"
+STATEMENTS = re.compile(r'desc="(\d+) queries"')
+
+
+class Scenario:
+    """Задержки и число выражений по запросам сценария"""
+
+    def __init__(self, label: str):
+        self.label = label
+        self.latencies: list[float] = []
+        self.statements: list[int] = []
+
+    async def call(self, client: httpx.AsyncClient, method: str, path: str, **kwargs) -> httpx.Response:
+        started = time.perf_counter()
+        response = await client.request(method, path, **kwargs)
+        self.latencies.append((time.perf_counter() - started) * 1000)
+        match = STATEMENTS.search(response.headers.get("server-timing", ""))
+        self.statements.append(int(match.group(1)) if match else 0)
+        response.raise_for_status()
+        return response
+
+    def report(self) -> None:
+        percentiles = statistics.quantiles(self.latencies, n=100) if len(self.latencies) > 1 else self.latencies * 99
+        print(f"{self.label:<24} p50={percentiles[49]:7.2f} ms  p99={percentiles[98]:7.2f} ms  "
+              f"выражений: {min(self.statements)}-{max(self.statements)}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--toggles", type=int, default=500, help="Переключений одной записи")
+    parser.add_argument("--batch", type=int, default=50, help="Записей в пакетном изменении (до 100)")
+    parser.add_argument("--rounds", type=int, default=50, help="Пакетных добавлений и удалений")
+    args = parser.parse_args()
+
+    email = f"bench-favorites-{uuid.uuid4().hex[:8]}@example.com"
+    try:
+        async with AsyncSessionLocal() as session:
+            ids = list((await session.execute(
+                select(Attraction.id).where(Attraction.is_active == True).order_by(Attraction.id).limit(args.batch)
+            )).scalars())
+        if not ids:
+            sys.exit("Нет активных достопримечательностей: заполните БД (scripts/seed_data.py)")
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            credentials = {"email": email, "password": PASSWORD}
+            (await client.post("/api/v1/auth/register", json=credentials)).raise_for_status()
+            tokens = (await client.post("/api/v1/auth/login", json=credentials)).json()
+            auth = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+            add, remove = Scenario("POST /favorites"), Scenario("DELETE /favorites/{id}")
+            for step in range(args.toggles):
+                attraction_id = ids[step % len(ids)]
+                await add.call(client, "POST", "/api/v1/favorites", headers=auth,
+                               json={"attraction_id": attraction_id})
+                await remove.call(client, "DELETE", f"/api/v1/favorites/{attraction_id}", headers=auth)
+
+            batch_add, batch_remove = Scenario(f"batch add x{len(ids)}"), Scenario(f"batch remove x{len(ids)}")
+            for _ in range(args.rounds):
+                added = (await batch_add.call(client, "POST", "/api/v1/favorites/batch", headers=auth,
+                                              json={"add": ids})).json()["added"]
+                if len(added) != len(ids):
+                    sys.exit(f"Пакет добавил {len(added)} из {len(ids)}")
+                await batch_remove.call(client, "POST", "/api/v1/favorites/batch", headers=auth,
+                                        json={"remove": ids})
+
+        for scenario in (add, remove, batch_add, batch_remove):
+            scenario.report()
+        per_item = statistics.median(batch_add.latencies) / len(ids)
+        print(f"\nПакет: {per_item:.3f} ms на запись против "
+              f"{statistics.median(add.latencies):.2f} ms на одиночное добавление")
+    finally:
+        async with AsyncSessionLocal() as session:
+            user_ids = select(User.id).where(User.email == email)
+            await session.execute(delete(Favorite).where(Favorite.user_id.in_(user_ids)))
+            await session.execute(delete(User).where(User.email == email))
+            await session.commit()
+        password_hasher.shutdown()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+"""
+Бенчмарк наборов полей списка достопримечательностей (?fields=)
+
+Заполняет тестовый город (как scripts/bench_attractions.py) и сравнивает
+страницу из 100 записей GET /api/v1/attractions с полным набором полей
+(поведение по умолчанию) и с урезанными: размер тела ответа и задержка
+полного HTTP-запроса (total из кэша, чтобы мерить только страницу).
+
+Использование:
+    python scripts/bench_fields.py --rows 100000 --requests 300
+    python scripts/bench_fields.py --cleanup
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Добавляем путь к проекту
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx
+from app.main import app
+from app.db.session import engine, init_db
+from scripts.bench_attractions import cleanup, seed
+
+PAGE_SIZE = 100
+FIELD_SETS = ["full", "card", "id,name,photo_url,rating"]
+
+
+async def measure(city_id: int, requests: int) -> None:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        baseline = None
+        for fields in FIELD_SETS:
+            params = {"city_id": city_id, "page_size": PAGE_SIZE, "fields": fields}
+            # Прогрев: total попадает в кэш количества
+            response = await client.get("/api/v1/attractions", params=params)
+            response.raise_for_status()
+            size = len(response.content)
+
+            samples = []
+            for _ in range(requests):
+                started = time.perf_counter()
+                await client.get("/api/v1/attractions", params=params)
+                samples.append((time.perf_counter() - started) * 1000)
+            percentiles = statistics.quantiles(samples, n=100)
+
+            baseline = baseline or (size, percentiles[49])
+            print(
+                f"fields={fields:<26} {size / 1024:8.1f} KiB ({size / baseline[0]:4.0%})  "
+                f"p50={percentiles[49]:7.2f} ms ({percentiles[49] / baseline[1]:4.0%})  "
+                f"p99={percentiles[98]:7.2f} ms"
+            )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000, help="Число записей в тестовом городе")
+    parser.add_argument("--requests", type=int, default=300, help="Запросов на набор полей")
+    parser.add_argument("--cleanup", action="store_true", help="Удалить тестовые данные и выйти")
+    args = parser.parse_args()
+
+    try:
+        await init_db()
+        if args.cleanup:
+            await cleanup()
+            print("Тестовые данные удалены")
+            return
+
+        city_id = await seed(args.rows)
+        print(f"Страница {PAGE_SIZE} записей, {args.requests} запросов на набор\n")
+        await measure(city_id, args.requests)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,111 @@
+"""
+Задержка каталога во время волны входов по паролю
+
+Замеряет GET /api/v1/cities (ответ из памяти) в трех режимах:
+без нагрузки, во время волны bcrypt прямо в event loop (старый путь)
+и во время волны POST /api/v1/auth/login (bcrypt в пуле).
+
+Использование:
+    python scripts/bench_login_storm.py --logins 200 --requests 300
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Добавляем путь к проекту
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx
+from sqlalchemy import delete
+from app.main import app
+from app.core.security import get_password_hash, verify_password
+from app.db.session import AsyncSessionLocal, engine, init_db
+from app.db.models import User
+from app.services.password_hasher import password_hasher
+
+PASSWORD = "bench-password"
+
+
+def report(label: str, samples: list[float]) -> None:
+    """Вывести p50/p99 в миллисекундах"""
+    percentiles = statistics.quantiles(samples, n=100)
+    print(f"{label:<32} p50={percentiles[49]:8.2f} ms  p99={percentiles[98]:8.2f} ms")
+
+
+async def catalog_latency(client: httpx.AsyncClient, requests: int) -> list[float]:
+    """Задержки запросов каталога, выполняемых подряд"""
+    samples = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = await client.get("/api/v1/cities")
+        samples.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+        await asyncio.sleep(0.005)
+    return samples
+
+
+async def inline_login(hashed_password: str, delay: float) -> None:
+    """Старый путь: bcrypt прямо в корутине"""
+    await asyncio.sleep(delay)
+    verify_password(PASSWORD, hashed_password)
+
+
+async def pooled_login(client: httpx.AsyncClient, email: str, delay: float) -> httpx.Response:
+    """Новый путь: POST /login, bcrypt в пуле"""
+    await asyncio.sleep(delay)
+    return await client.post("/api/v1/auth/login", json={"email": email, "password": PASSWORD})
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=200, help="Входов в волне")
+    parser.add_argument("--requests", type=int, default=300, help="Запросов каталога на сценарий")
+    parser.add_argument("--interval", type=float, default=0.01, help="Интервал между входами, с")
+    args = parser.parse_args()
+
+    email = f"bench-{uuid.uuid4().hex[:8]}@example.com"
+    hashed_password = get_password_hash(PASSWORD)
+
+    try:
+        await init_db()
+        async with AsyncSessionLocal() as session:
+            session.add(User(email=email, hashed_password=hashed_password, is_active=True))
+            await session.commit()
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await client.get("/api/v1/cities")  # прогрев кэша каталога
+            report("без нагрузки", await catalog_latency(client, args.requests))
+
+            storm = asyncio.gather(*(
+                inline_login(hashed_password, i * args.interval) for i in range(args.logins)
+            ))
+            report("bcrypt в event loop", await catalog_latency(client, args.requests))
+            await storm
+
+            storm = asyncio.gather(*(
+                pooled_login(client, email, i * args.interval) for i in range(args.logins)
+            ))
+            report("bcrypt в пуле", await catalog_latency(client, args.requests))
+            responses = await storm
+
+        statuses = {}
+        for response in responses:
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        print(f"\nОтветы login: {statuses}")
+        print(f"Пул: {password_hasher.stats()}")
+
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(User).where(User.email == email))
+            await session.commit()
+    finally:
+        password_hasher.shutdown()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,103 @@
+"""
+Накладные расходы MetricsMiddleware на запрос
+
+Вызывает минимальное ASGI-приложение напрямую (без HTTP и сети) с
+middleware и без него и выводит разницу в микросекундах на запрос.
+Отдельно замеряет стоимость событий engine на одно SQL-выражение
+(SELECT 1 в SQLite в памяти, чтобы время самой БД было минимальным).
+
+Использование:
+    python scripts/bench_metrics_overhead.py --requests 100000
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Добавляем путь к проекту
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import create_engine, text
+from starlette.routing import Route
+
+from app.core.metrics import MetricsMiddleware
+from app.db.instrumentation import RequestStats, instrument_engine, request_stats
+
+ROUTE = Route("/api/v1/attractions/{attraction_id}", endpoint=lambda request: None)
+
+
+async def endpoint(scope, receive, send) -> None:
+    """Минимальный ответ, как после сопоставления маршрута"""
+    scope["route"] = ROUTE
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-length", b"2")]})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def run(app, requests: int) -> float:
+    """Среднее время вызова приложения в микросекундах"""
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+    for i in range(requests):
+        scope = {"type": "http", "method": "GET", "path": f"/api/v1/attractions/{i}", "headers": []}
+        await app(scope, receive, send)
+    return (time.perf_counter() - started) / requests * 1_000_000
+
+
+def run_statements(statements: int, instrumented: bool) -> float:
+    """Среднее время SELECT 1 в микросекундах"""
+    engine = create_engine("sqlite://")
+    if instrumented:
+        instrument_engine(engine)
+        request_stats.set(RequestStats())
+
+    query = text("SELECT 1")
+    with engine.connect() as conn:
+        for _ in range(1000):  # прогрев
+            conn.execute(query)
+        started = time.perf_counter()
+        for _ in range(statements):
+            conn.execute(query)
+        elapsed = time.perf_counter() - started
+    engine.dispose()
+    return elapsed / statements * 1_000_000
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=100_000, help="Число вызовов на вариант")
+    parser.add_argument("--statements", type=int, default=50_000, help="Число SQL-выражений на вариант")
+    parser.add_argument("--rounds", type=int, default=5, help="Повторов; варианты чередуются, берется медиана")
+    args = parser.parse_args()
+
+    instrumented = MetricsMiddleware(endpoint)
+    await run(endpoint, 1000)  # прогрев
+    await run(instrumented, 1000)
+
+    bare, with_metrics = [], []
+    for _ in range(args.rounds):
+        bare.append(await run(endpoint, args.requests))
+        with_metrics.append(await run(instrumented, args.requests))
+    bare, with_metrics = statistics.median(bare), statistics.median(with_metrics)
+    print(f"без middleware:  {bare:6.2f} мкс/запрос")
+    print(f"с middleware:    {with_metrics:6.2f} мкс/запрос")
+    print(f"накладные:       {with_metrics - bare:6.2f} мкс/запрос")
+
+    bare, with_stats = [], []
+    for _ in range(args.rounds):
+        bare.append(run_statements(args.statements, instrumented=False))
+        with_stats.append(run_statements(args.statements, instrumented=True))
+    bare, with_stats = statistics.median(bare), statistics.median(with_stats)
+    print(f"\nSQL без учета:    {bare:6.2f} мкс/выражение")
+    print(f"SQL с учетом:     {with_stats:6.2f} мкс/выражение")
+    print(f"накладные:       {with_stats - bare:6.2f} мкс/выражение")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
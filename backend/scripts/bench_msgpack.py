@@ -0,0 +1,96 @@
+"""
+Бенчмарк MessagePack против JSON для страниц AttractionList
+
+Для страниц из 10 и 100 записей (все поля AttractionResponse) сравнивает
+размер тела без сжатия и после gzip (как отдал бы прокси) и время
+кодирования на сервере (dump_json / dump_msgpack) и декодирования на
+клиенте. База данных не нужна.
+
+Использование:
+    python scripts/bench_msgpack.py --iterations 5000
+    python scripts/bench_msgpack.py --description-length 1500
+"""
+import argparse
+import gzip
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Добавляем путь к проекту
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import orjson
+import ormsgpack
+from app.core.responses import dump_json, dump_msgpack
+
+PAGE_SIZES = (10, 100)
+
+
+def make_page(count: int, description_length: int) -> dict:
+    """Тело ответа GET /api/v1/attractions в том виде, в каком его кодирует FastJSONResponse"""
+    created_at = datetime.now(timezone.utc)
+    description = ("Описание достопримечательности. " * (description_length // 32 + 1))[:description_length]
+    items = [
+        {
+            "id": i,
+            "city_id": 1 + i % 7,
+            "name": f"Достопримечательность {i}",
+            "description": description,
+            "address": f"Улица {i}, Москва",
+            "photo_url": f"https://images.example.com/attractions/{i}.jpg",
+            "category": "Музей",
+            "rating": round(3.5 + (i % 15) / 10, 1),
+            "rating_count": i * 3,
+            "is_active": True,
+            "created_at": created_at - timedelta(minutes=i),
+            "latitude": 55.75 + i / 10000,
+            "longitude": 37.61 + i / 10000,
+            "is_favorite": i % 4 == 0,
+        }
+        for i in range(1, count + 1)
+    ]
+    return {"items": items, "total": 1000, "page": 1, "page_size": count, "next_cursor": None}
+
+
+def timed(iterations: int, call) -> float:
+    """Медиана времени вызова в микросекундах"""
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - started) * 1_000_000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=5000, help="Повторов на измерение")
+    parser.add_argument("--description-length", type=int, default=600, help="Длина описания, символов")
+    args = parser.parse_args()
+
+    print(f"{'':<14}{'байт':>9}{'gzip':>9}{'кодирование':>14}{'декодирование':>16}")
+    for page_size in PAGE_SIZES:
+        page = make_page(page_size, args.description_length)
+        json_body, msgpack_body = dump_json(page), dump_msgpack(page)
+        if ormsgpack.unpackb(msgpack_body) != orjson.loads(json_body):
+            sys.exit("MessagePack и JSON расходятся")
+
+        results = []
+        for label, body, encode, decode in (
+            ("json", json_body, dump_json, orjson.loads),
+            ("msgpack", msgpack_body, dump_msgpack, ormsgpack.unpackb),
+        ):
+            encode_us = timed(args.iterations, lambda: encode(page))
+            decode_us = timed(args.iterations, lambda: decode(body))
+            results.append((label, len(body), len(gzip.compress(body, 6)), encode_us, decode_us))
+
+        for label, size, compressed, encode_us, decode_us in results:
+            print(f"{f'{page_size} {label}':<14}{size:>9}{compressed:>9}{encode_us:>11.1f} µs{decode_us:>13.1f} µs")
+        (_, json_size, json_gzip, *_), (_, msgpack_size, msgpack_gzip, *_) = results
+        print(f"{'':<14}{msgpack_size / json_size:>9.0%}{msgpack_gzip / json_gzip:>9.0%}  (MessagePack / JSON)\n")
+
+
+if __name__ == "__main__":
+    main()
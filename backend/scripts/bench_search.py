@@ -0,0 +1,153 @@
+"""
+Бенчмарк полнотекстового поиска достопримечательностей
+
+Заполняет отдельный город синтетическими русскими названиями и описаниями
+(generate_series) и замеряет задержку GET /api/v1/attractions/search для
+частого слова, сочетания слов и запроса без совпадений: без кэша результатов
+(запрос в БД каждый раз) и с ним.
+
+Использование:
+    python scripts/bench_search.py --rows 1000000 --requests 200
+    python scripts/bench_search.py --cleanup
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Добавляем путь к проекту
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx
+from sqlalchemy import delete, func, select, text
+from app.main import app
+from app.db.session import AsyncSessionLocal, engine, init_db
+from app.db.models import City, Attraction
+from app.db.changes import changes
+from app.services.attraction_search import search_results
+
+BENCH_CITY = "Search Benchmark City"
+SEED_BATCH = 100000
+
+KINDS = ["Музей", "Парк", "Храм", "Театр", "Собор", "Дворец", "Галерея", "Усадьба"]
+WORDS = [
+    "старинный", "деревянный", "каменный", "городской", "речной", "северный", "купеческий",
+    "исторический", "литературный", "военный", "морской", "железнодорожный", "ботанический",
+    "археологический", "космический", "зоологический", "народный", "художественный",
+    "музыкальный", "краеведческий", "ремесленный", "торговый", "монастырский", "дворянский",
+]
+QUERIES = {
+    "частое слово": "музей",
+    "сочетание слов": "космический дворец",
+    "фраза с исключением": "художественный музей -старинный",
+    "нет совпадений": "аэродинамический",
+}
+
+
+def array_literal(values: list[str]) -> str:
+    return "ARRAY[" + ", ".join(f"'{value}'" for value in values) + "]"
+
+
+async def seed(rows: int) -> int:
+    """Создать город и довести число его достопримечательностей до rows"""
+    async with AsyncSessionLocal() as session:
+        city_id = (await session.execute(
+            select(City.id).where(City.name == BENCH_CITY)
+        )).scalar()
+        if city_id is None:
+            city = City(name=BENCH_CITY, country="Benchmark")
+            session.add(city)
+            await session.commit()
+            city_id = city.id
+
+        existing = (await session.execute(
+            select(func.count()).select_from(Attraction).where(Attraction.city_id == city_id)
+        )).scalar()
+
+        kinds, words = array_literal(KINDS), array_literal(WORDS)
+        for start in range(existing + 1, rows + 1, SEED_BATCH):
+            stop = min(start + SEED_BATCH - 1, rows)
+            await session.execute(text(f"""
+                INSERT INTO attractions
+                    (city_id, name, description, address, category, rating, is_active, created_at)
+                SELECT :city_id,
+                       ({kinds})[1 + g % 8] || ' ' || ({words})[1 + g % 24] || ' №' || g,
+                       'Здесь ' || ({words})[1 + (g / 24) % 24] || ' и '
+                           || ({words})[1 + (g / 576) % 24] || ' объект с богатой историей',
+                       'улица ' || ({words})[1 + (g / 7) % 24] || ', ' || g % 300,
+                       ({kinds})[1 + g % 8],
+                       (g % 50) / 10.0, true, now() - g * interval '1 second'
+                FROM generate_series(CAST(:start AS integer), CAST(:stop AS integer)) AS g
+            """), {"city_id": city_id, "start": start, "stop": stop})
+            changes.mark(session, "attractions", "insert")
+            await session.commit()
+            print(f"  вставлено {stop}/{rows}")
+
+        await session.execute(text("ANALYZE attractions"))
+        await session.commit()
+
+    return city_id
+
+
+async def cleanup() -> None:
+    """Удалить тестовый город вместе с достопримечательностями"""
+    async with AsyncSessionLocal() as session:
+        await session.execute(delete(City).where(City.name == BENCH_CITY))
+        changes.mark(session, "cities", "delete")
+        changes.mark(session, "attractions", "delete")
+        await session.commit()
+
+
+def report(label: str, samples: list[float], found: int) -> None:
+    """Вывести p50/p99 в миллисекундах"""
+    percentiles = statistics.quantiles(samples, n=100)
+    print(f"{label:<22} p50={percentiles[49]:7.2f} ms  p99={percentiles[98]:7.2f} ms  найдено={found}")
+
+
+async def measure(client: httpx.AsyncClient, q: str, requests: int, cached: bool) -> tuple[list[float], int]:
+    """Задержки поиска; каждый запрос - мимо HTTP-кэша (без If-None-Match)"""
+    samples, found = [], 0
+    for _ in range(requests):
+        if not cached:
+            search_results.clear()
+        started = time.perf_counter()
+        response = await client.get("/api/v1/attractions/search", params={"q": q})
+        samples.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+        found = len(response.json()["items"])
+    return samples, found
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Число достопримечательностей")
+    parser.add_argument("--requests", type=int, default=200, help="Запросов на сценарий")
+    parser.add_argument("--cleanup", action="store_true", help="Удалить тестовые данные и выйти")
+    args = parser.parse_args()
+
+    try:
+        if args.cleanup:
+            await cleanup()
+            return
+
+        await init_db()
+        started = time.perf_counter()
+        await seed(args.rows)
+        print(f"Данные готовы за {time.perf_counter() - started:.1f} с\n")
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for cached in (False, True):
+                print("С кэшем результатов:" if cached else "Без кэша результатов:")
+                for label, q in QUERIES.items():
+                    await measure(client, q, 5, cached)  # прогрев
+                    report(label, *await measure(client, q, args.requests, cached))
+                print()
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
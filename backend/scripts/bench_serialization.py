@@ -0,0 +1,112 @@
+"""
+Микробенчмарк сериализации списка достопримечательностей
+
+Сравнивает старый путь (ORM-объект -> model_validate -> model_dump ->
+AttractionResponse(**dict) -> валидация и кодирование FastAPI) с новым
+(строки Core-запроса -> dict -> orjson). База данных не нужна.
+
+Использование:
+    python scripts/bench_serialization.py --rows 100 --iterations 2000
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Добавляем путь к проекту
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from pydantic import TypeAdapter
+from app.core.responses import dump_json
+from app.db.models import Attraction
+from app.schemas.attraction import AttractionList, AttractionResponse
+
+LIST_ADAPTER = TypeAdapter(AttractionList)
+
+
+def make_rows(count: int) -> list[dict]:
+    """Строки в том виде, в каком их возвращает Core-запрос"""
+    created_at = datetime.now(timezone.utc)
+    return [
+        {
+            "id": i,
+            "city_id": 1,
+            "name": f"Достопримечательность {i}",
+            "description": "Описание достопримечательности. " * 10,
+            "address": f"Улица {i}, Москва",
+            "photo_url": f"https://images.example.com/{i}.jpg",
+            "category": "Музей",
+            "rating": 4.5,
+            "is_active": True,
+            "created_at": created_at,
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def legacy_path(rows: list[dict], favorite_ids: set[int]) -> bytes:
+    """Старый путь get_attractions + serialize_response FastAPI"""
+    attractions = [Attraction(**row) for row in rows]
+    items = []
+    for attraction in attractions:
+        attraction_dict = AttractionResponse.model_validate(attraction).model_dump()
+        attraction_dict['is_favorite'] = attraction.id in favorite_ids
+        items.append(AttractionResponse(**attraction_dict))
+    result = AttractionList(items=items, total=1000, page=1, page_size=len(items))
+
+    # FastAPI: dump -> повторная валидация по response_model -> JSON
+    validated = LIST_ADAPTER.validate_python(result.model_dump())
+    content = LIST_ADAPTER.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def fast_path(rows: list[dict], favorite_ids: set[int]) -> bytes:
+    """Новый путь: словари строк сразу в orjson"""
+    attractions = [dict(row) for row in rows]
+    for attraction in attractions:
+        attraction['is_favorite'] = attraction['id'] in favorite_ids
+    return dump_json({
+        "items": attractions,
+        "total": 1000,
+        "page": 1,
+        "page_size": len(attractions),
+        "next_cursor": None,
+    })
+
+
+def measure(label: str, func, rows: list[dict], iterations: int) -> None:
+    """Время на строку и пик выделенной памяти на страницу"""
+    favorite_ids = {row["id"] for row in rows[::3]}
+    func(rows, favorite_ids)  # прогрев
+
+    started = time.perf_counter()
+    for _ in range(iterations):
+        body = func(rows, favorite_ids)
+    elapsed = time.perf_counter() - started
+    per_row_us = elapsed / iterations / len(rows) * 1e6
+
+    tracemalloc.start()
+    func(rows, favorite_ids)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{label:<12} {per_row_us:8.2f} μs/строка  пик {peak / 1024:8.1f} KiB/страница  {len(body)} байт")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100, help="Строк на странице")
+    parser.add_argument("--iterations", type=int, default=2000, help="Повторов")
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    print(f"Страница из {args.rows} строк, {args.iterations} повторов:")
+    measure("старый путь", legacy_path, rows, args.iterations)
+    measure("orjson", fast_path, rows, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
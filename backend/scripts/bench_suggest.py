@@ -0,0 +1,123 @@
+"""
+Бенчмарк префиксного индекса подсказок
+
+Строит индекс из синтетических названий (или из текущей БД с --from-db) и
+выводит время построения, память на запись (tracemalloc) и задержку поиска
+по префиксам разной длины: первый запрос префикса (расчет top-k) и
+повторный. Отдельно замеряется инкрементальное добавление записи.
+
+Использование:
+    python scripts/bench_suggest.py --rows 100000 --lookups 2000
+    python scripts/bench_suggest.py --from-db
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Добавляем путь к проекту
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.suggest_index import SuggestIndex
+
+KINDS = ["Музей", "Парк", "Храм", "Театр", "Собор", "Дворец", "Галерея", "Усадьба", "Мост", "Площадь"]
+WORDS = [
+    "старинный", "деревянный", "каменный", "городской", "речной", "северный", "купеческий",
+    "исторический", "литературный", "военный", "морской", "железнодорожный", "ботанический",
+    "археологический", "космический", "зоологический", "народный", "художественный",
+    "музыкальный", "краеведческий", "ремесленный", "торговый", "монастырский", "дворянский",
+]
+SURNAMES = ["Пушкина", "Толстого", "Чехова", "Гоголя", "Лермонтова", "Есенина", "Шолохова", "Гагарина"]
+PREFIXES = ["м", "му", "муз", "музе", "музей ко", "пушк", "ёлк", "дворец ст", "xyz"]
+
+
+def synthetic_rows(count: int, seed: int = 42) -> list[tuple]:
+    """Города и достопримечательности со случайными названиями из 2-4 слов"""
+    rng = random.Random(seed)
+    cities = max(count // 1000, 1)
+    rows = [("city", i, f"Город {rng.choice(WORDS)} {i}", None, 0.0) for i in range(1, cities + 1)]
+    for i in range(1, count - cities + 1):
+        words = [rng.choice(KINDS), rng.choice(WORDS)]
+        if rng.random() < 0.5:
+            words.append(f"имени {rng.choice(SURNAMES)}")
+        rows.append(("attraction", i, " ".join(words), rng.randint(1, cities), round(rng.uniform(0, 5), 1)))
+    return rows
+
+
+async def rows_from_db() -> SuggestIndex:
+    """Индекс, построенный из БД (как при старте приложения)"""
+    from app.db.session import AsyncSessionLocal, engine
+
+    index = SuggestIndex()
+    try:
+        async with AsyncSessionLocal() as session:
+            started = time.perf_counter()
+            await index.build(session)
+            print(f"Построение из БД: {(time.perf_counter() - started) * 1000:.1f} ms")
+    finally:
+        await engine.dispose()
+    return index
+
+
+def timed(samples: int, call) -> list[float]:
+    """Задержки вызова в микросекундах"""
+    result = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        call()
+        result.append((time.perf_counter() - started) * 1_000_000)
+    return result
+
+
+def report(label: str, samples: list[float]) -> None:
+    percentiles = statistics.quantiles(samples, n=100) if len(samples) > 1 else samples * 99
+    print(f"{label:<24} p50={percentiles[49]:9.1f} µs  p99={percentiles[98]:9.1f} µs")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000, help="Число записей (города + достопримечательности)")
+    parser.add_argument("--lookups", type=int, default=2000, help="Повторных запросов на префикс")
+    parser.add_argument("--from-db", action="store_true", help="Строить индекс из текущей БД")
+    args = parser.parse_args()
+
+    if args.from_db:
+        index = asyncio.run(rows_from_db())
+    else:
+        rows = synthetic_rows(args.rows)
+        # Память - на отдельном экземпляре: tracemalloc замедляет построение
+        tracemalloc.start()
+        measured = SuggestIndex()
+        measured.load(rows)
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del measured
+
+        index = SuggestIndex()
+        started = time.perf_counter()
+        index.load(rows)
+        elapsed = time.perf_counter() - started
+        print(f"Построение: {elapsed * 1000:.1f} ms для {len(index)} записей")
+        print(f"Память: {memory / 2**20:.1f} MiB, {memory / len(index):.0f} байт на запись "
+              f"({index.token_count / len(index):.2f} токена на запись)")
+    print()
+
+    for prefix in PREFIXES:
+        first = timed(1, lambda: index.suggest(prefix))
+        repeated = timed(args.lookups, lambda: index.suggest(prefix))
+        found = len(index.suggest(prefix))
+        print(f"'{prefix}': первый запрос {first[0]:9.1f} µs, найдено {found}")
+        report("  повторные", repeated)
+
+    print()
+    counter = iter(range(10**9, 2 * 10**9))
+    upserts = timed(1000, lambda: index.upsert("attraction", next(counter), "Музей космический новый", 1, 4.5))
+    report("Добавление записи", upserts)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Нагрузочная проверка входа через Telegram
+
+Отправляет одновременно N первых входов новых пользователей (и столько же
+повторных с теми же telegram_id) в POST /api/v1/auth/telegram, проверяет,
+что все запросы успешны и создано ровно N пользователей, и выводит задержки.
+
+Использование:
+    python scripts/bench_telegram_login.py --users 500
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+# Добавляем путь к проекту
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx
+from sqlalchemy import delete, func, select
+from app.main import app
+from app.core.config import settings
+from app.core.security import get_webapp_secret_key
+from app.db.session import AsyncSessionLocal, engine, init_db
+from app.db.models import User
+
+
+def make_init_data(telegram_id: int) -> str:
+    """Подписанный initData, как его формирует Telegram"""
+    fields = {
+        "auth_date": str(int(time.time())),
+        "query_id": f"bench{telegram_id}",
+        "user": json.dumps({"id": telegram_id, "first_name": "Bench", "username": f"bench{telegram_id}"}),
+    }
+    data_check_string = "\n".join(f"{key}={value}" for key, value in sorted(fields.items()))
+    bot_token = settings.TELEGRAM_SECRET_KEY or settings.TELEGRAM_BOT_TOKEN
+    fields["hash"] = hmac.new(
+        key=get_webapp_secret_key(bot_token),
+        msg=data_check_string.encode(),
+        digestmod=hashlib.sha256
+    ).hexdigest()
+    return urlencode(fields)
+
+
+async def login(client: httpx.AsyncClient, init_data: str) -> tuple[int, float]:
+    """Один вход: (статус, задержка в мс)"""
+    started = time.perf_counter()
+    response = await client.post("/api/v1/auth/telegram", json={"init_data": init_data})
+    return response.status_code, (time.perf_counter() - started) * 1000
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=500, help="Число новых пользователей")
+    args = parser.parse_args()
+
+    # telegram_id - Integer, поэтому диапазон выбирается в пределах int4
+    base_id = random.randint(1_000_000_000, 2_000_000_000 - args.users)
+    telegram_ids = list(range(base_id, base_id + args.users))
+    # Каждый пользователь входит дважды одновременно - гонка за уникальный telegram_id
+    payloads = [make_init_data(telegram_id) for telegram_id in telegram_ids * 2]
+    random.shuffle(payloads)
+
+    try:
+        await init_db()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            started = time.perf_counter()
+            results = await asyncio.gather(*(login(client, payload) for payload in payloads))
+            elapsed = time.perf_counter() - started
+
+        async with AsyncSessionLocal() as session:
+            created = (await session.execute(
+                select(func.count()).select_from(User).where(User.telegram_id.in_(telegram_ids))
+            )).scalar()
+            await session.execute(delete(User).where(User.telegram_id.in_(telegram_ids)))
+            await session.commit()
+    finally:
+        await engine.dispose()
+
+    statuses = [status for status, _ in results]
+    latencies = [latency for _, latency in results]
+    percentiles = statistics.quantiles(latencies, n=100)
+    errors = len([status for status in statuses if status != 200])
+
+    print(f"Запросов: {len(results)} за {elapsed:.2f} с, ошибок: {errors}")
+    print(f"Создано пользователей: {created} из {args.users}")
+    print(f"p50={percentiles[49]:.2f} ms  p99={percentiles[98]:.2f} ms")
+
+    if errors or created != args.users:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,46 @@
+"""
+Пересчет средних оценок достопримечательностей по таблице reviews
+
+rating_sum, rating_count и rating меняются вместе с отзывами, но каскадные
+удаления (пользователя, достопримечательности) и правки в обход API их не
+трогают. Скрипт пересчитывает суммы одним UPDATE только у разошедшихся
+записей; запускать после ручных правок или по расписанию (cron).
+
+Использование:
+    python scripts/recompute_ratings.py
+    python scripts/recompute_ratings.py --dry-run
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Добавляем путь к проекту
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.db.session import AsyncSessionLocal, engine
+from app.services.reviews import recompute
+
+# Сколько id выводить в отчете
+REPORT_LIMIT = 20
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Только показать расхождения")
+    args = parser.parse_args()
+
+    try:
+        async with AsyncSessionLocal() as session:
+            ids = await recompute(session, dry_run=args.dry_run)
+    finally:
+        await engine.dispose()
+
+    action = "Расходится" if args.dry_run else "Исправлено"
+    shown = ", ".join(str(attraction_id) for attraction_id in ids[:REPORT_LIMIT])
+    more = f" и еще {len(ids) - REPORT_LIMIT}" if len(ids) > REPORT_LIMIT else ""
+    print(f"{action}: {len(ids)}" + (f" ({shown}{more})" if ids else ""))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,46 @@
+"""
+Сверка attractions.favorites_count с таблицей favorites
+
+Счетчик меняется вместе с избранным, но каскадные удаления (пользователя
+или города) и правки в обход API его не трогают. Скрипт пересчитывает
+счетчик одним UPDATE только у разошедшихся записей; запускается по
+расписанию (cron), например раз в сутки.
+
+Использование:
+    python scripts/reconcile_favorites_count.py
+    python scripts/reconcile_favorites_count.py --dry-run
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Добавляем путь к проекту
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.db.session import AsyncSessionLocal, engine
+from app.services.favorite_counts import reconcile
+
+# Сколько id выводить в отчете
+REPORT_LIMIT = 20
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Только показать расхождения")
+    args = parser.parse_args()
+
+    try:
+        async with AsyncSessionLocal() as session:
+            ids = await reconcile(session, dry_run=args.dry_run)
+    finally:
+        await engine.dispose()
+
+    action = "Расходится" if args.dry_run else "Исправлено"
+    shown = ", ".join(str(attraction_id) for attraction_id in ids[:REPORT_LIMIT])
+    more = f" и еще {len(ids) - REPORT_LIMIT}" if len(ids) > REPORT_LIMIT else ""
+    print(f"{action}: {len(ids)}" + (f" ({shown}{more})" if ids else ""))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -50,7 +50,9 @@ async def create_test_data():
                 address="Красная площадь, Москва",
                 photo_url="https://images.unsplash.com/photo-1513326738677-b964603b136d",
                 category="Площадь",
-                rating=4.8
+                rating=4.8,
+                latitude=55.7539,
+                longitude=37.6208
             ),
             Attraction(
                 city_id=moscow.id,
@@ -59,7 +61,9 @@ async def create_test_data():
                 address="Красная площадь, 7, Москва",
                 photo_url="https://images.unsplash.com/photo-1512495039889-d18c6f0d6706",
                 category="Храм",
-                rating=4.9
+                rating=4.9,
+                latitude=55.7525,
+                longitude=37.6231
             ),
             Attraction(
                 city_id=moscow.id,
@@ -68,7 +72,9 @@ async def create_test_data():
                 address="Кремль, Москва",
                 photo_url="https://images.unsplash.com/photo-1547448415-e9f5b28e570d",
                 category="Крепость",
-                rating=4.7
+                rating=4.7,
+                latitude=55.752,
+                longitude=37.6175
             ),
             Attraction(
                 city_id=moscow.id,
@@ -77,7 +83,9 @@ async def create_test_data():
                 address="Лаврушинский переулок, 10, Москва",
                 photo_url="https://images.unsplash.com/photo-1595433707802-6b2626ef1c91",
                 category="Музей",
-                rating=4.8
+                rating=4.8,
+                latitude=55.7414,
+                longitude=37.6208
             ),
             Attraction(
                 city_id=moscow.id,
@@ -86,7 +94,9 @@ async def create_test_data():
                 address="Крымский Вал, 9, Москва",
                 photo_url="https://images.unsplash.com/photo-1625398407796-82650a8c135f",
                 category="Парк",
-                rating=4.6
+                rating=4.6,
+                latitude=55.7298,
+                longitude=37.6011
             ),
             Attraction(
                 city_id=moscow.id,
@@ -95,7 +105,9 @@ async def create_test_data():
                 address="Театральная площадь, 1, Москва",
                 photo_url="https://images.unsplash.com/photo-1590247813693-5541d1c609fd",
                 category="Театр",
-                rating=4.9
+                rating=4.9,
+                latitude=55.7601,
+                longitude=37.6186
             ),
             Attraction(
                 city_id=moscow.id,
@@ -104,7 +116,9 @@ async def create_test_data():
                 address="Воробьевы горы, Москва",
                 photo_url="https://images.unsplash.com/photo-1556114220-3f17cdfbe3e0",
                 category="Смотровая площадка",
-                rating=4.7
+                rating=4.7,
+                latitude=55.7106,
+                longitude=37.5429
             ),
         ]
 
@@ -117,7 +131,9 @@ async def create_test_data():
                 address="Дворцовая площадь, 2, Санкт-Петербург",
                 photo_url="https://images.unsplash.com/photo-1583422409516-2895a77efded",
                 category="Музей",
-                rating=4.9
+                rating=4.9,
+                latitude=59.9398,
+                longitude=30.3146
             ),
             Attraction(
                 city_id=spb.id,
@@ -126,7 +142,9 @@ async def create_test_data():
                 address="Разводная ул., 2, Петергоф",
                 photo_url="https://images.unsplash.com/photo-1564585497019-34d341e13054",
                 category="Дворец",
-                rating=4.8
+                rating=4.8,
+                latitude=59.8803,
+                longitude=29.9077
             ),
             Attraction(
                 city_id=spb.id,
@@ -135,7 +153,9 @@ async def create_test_data():
                 address="Набережная канала Грибоедова, 2Б, Санкт-Петербург",
                 photo_url="https://images.unsplash.com/photo-1581196831125-93df9dca8b68",
                 category="Храм",
-                rating=4.9
+                rating=4.9,
+                latitude=59.94,
+                longitude=30.3289
             ),
             Attraction(
                 city_id=spb.id,
@@ -144,7 +164,9 @@ async def create_test_data():
                 address="Дворцовая площадь, Санкт-Петербург",
                 photo_url="https://images.unsplash.com/photo-1621524475924-ade39a0ebdd6",
                 category="Площадь",
-                rating=4.8
+                rating=4.8,
+                latitude=59.939,
+                longitude=30.3158
             ),
             Attraction(
                 city_id=spb.id,
@@ -153,7 +175,9 @@ async def create_test_data():
                 address="Невский проспект, Санкт-Петербург",
                 photo_url="https://images.unsplash.com/photo-1609356765656-a3d5e2c6c5d5",
                 category="Улица",
-                rating=4.7
+                rating=4.7,
+                latitude=59.9343,
+                longitude=30.3351
             ),
             Attraction(
                 city_id=spb.id,
@@ -162,7 +186,9 @@ async def create_test_data():
                 address="Петропавловская крепость, 3, Санкт-Петербург",
                 photo_url="https://images.unsplash.com/photo-1587471364504-efe1ab5a966c",
                 category="Крепость",
-                rating=4.7
+                rating=4.7,
+                latitude=59.95,
+                longitude=30.3167
             ),
             Attraction(
                 city_id=spb.id,
@@ -171,7 +197,9 @@ async def create_test_data():
                 address="Исаакиевская площадь, 4, Санкт-Петербург",
                 photo_url="https://images.unsplash.com/photo-1562699619-79e5dac78d99",
                 category="Храм",
-                rating=4.8
+                rating=4.8,
+                latitude=59.9341,
+                longitude=30.3062
             ),
         ]
 
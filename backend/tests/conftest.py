@@ -0,0 +1,107 @@
+"""
+Общие фикстуры тестов
+
+Тесты работают с PostgreSQL из DATABASE_URL, как и приложение: схема
+создается init_db, справочные данные - seed_database. Проверка бюджетов
+включена в режиме raise, поэтому превышение в любом тесте завершает запрос
+исключением QueryBudgetExceeded.
+"""
+import os
+
+# До импорта приложения: middleware бюджета подключается при создании app
+os.environ["QUERY_BUDGET_MODE"] = "raise"
+
+import re
+from typing import Any, Awaitable, Callable, Optional
+
+import httpx
+import pytest
+from starlette.routing import Match
+
+from app.main import app, seed_database
+from app.core.query_budget import route_budget
+from app.db.session import AsyncSessionLocal, engine, init_db
+from app.services.attraction_clusters import cluster_index
+from app.services.attraction_search import detect_trigram
+from app.services.city_catalog import city_catalog
+from app.services.count_cache import attraction_counts
+from app.services.favorite_ids import favorite_id_cache
+from app.services.password_hasher import password_hasher
+from app.services.principal_cache import principal_cache
+from app.services.suggest_index import suggest_index
+
+STATEMENTS = re.compile(r'desc="(\d+) queries"')
+
+BudgetCheck = Callable[..., Awaitable[httpx.Response]]
+
+
+@pytest.fixture(scope="session")
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+async def database():
+    """Схема, справочные данные и индексы в памяти; в конце - закрытие пулов"""
+    await init_db()
+    await seed_database()
+    async with AsyncSessionLocal() as session:
+        await suggest_index.build(session)
+        await cluster_index.build(session)
+        await detect_trigram(session)
+    yield
+    password_hasher.shutdown()
+    await engine.dispose()
+
+
+@pytest.fixture(scope="session")
+async def client(database) -> httpx.AsyncClient:
+    """HTTP-клиент приложения без сети"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+def reset_caches() -> None:
+    """Холодный старт: запрос платит за загрузку кэшей"""
+    principal_cache.invalidate()
+    city_catalog.invalidate()
+    attraction_counts.clear()
+    favorite_id_cache.invalidate()
+
+
+def find_route(method: str, path: str) -> Optional[Any]:
+    """Маршрут приложения для метода и пути (без строки запроса)"""
+    scope = {"type": "http", "method": method, "path": path.split("?")[0], "root_path": ""}
+    for route in app.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route
+    return None
+
+
+@pytest.fixture
+def assert_budget(client: httpx.AsyncClient) -> BudgetCheck:
+    """
+    Выполнить запрос с холодными кэшами и проверить бюджет маршрута
+
+    Число выражений берется из Server-Timing и сравнивается с @query_budget
+    маршрута; в режиме raise превышение приходит исключением еще раньше.
+    """
+    async def check(method: str, path: str, **kwargs: Any) -> httpx.Response:
+        route = find_route(method, path)
+        assert route is not None, f"{method} {path}: no route"
+        budget = route_budget(route)
+        assert budget is not None, f"{method} {route.path}: no @query_budget"
+
+        reset_caches()
+        response = await client.request(method, path, **kwargs)
+        assert response.status_code < 500, f"{method} {path}: {response.status_code} {response.text}"
+
+        match = STATEMENTS.search(response.headers.get("server-timing", ""))
+        assert match, f"{method} {path}: no Server-Timing"
+        statements = int(match.group(1))
+        assert statements <= budget, f"{method} {route.path}: {statements} SQL statements, budget {budget}"
+        return response
+
+    return check
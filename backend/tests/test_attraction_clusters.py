@@ -0,0 +1,108 @@
+"""
+Кластеры для карты: инкрементальные изменения дают то же, что полное построение
+"""
+import random
+
+import pytest
+
+from app.services.attraction_clusters import MAX_ZOOM, MIN_ZOOM, ClusterIndex
+
+
+def snapshot(index: ClusterIndex) -> dict:
+    """Все ячейки всех городов: (число точек, центроид, лучшая запись)"""
+    return {
+        (city_id, zoom, key): (cluster.count, round(cluster.lat_sum, 6), round(cluster.lon_sum, 6), cluster.best_id)
+        for city_id, city in index._cities.items()
+        for zoom, cells in enumerate(city.levels, MIN_ZOOM)
+        for key, cluster in cells.items()
+    }
+
+
+def rebuilt(index: ClusterIndex) -> ClusterIndex:
+    fresh = ClusterIndex()
+    fresh.load([
+        (attraction_id, city_id, lat, lon, rating)
+        for attraction_id, (city_id, lat, lon, rating) in index._points.items()
+    ])
+    return fresh
+
+
+def cluster_at(index: ClusterIndex, lat: float, lon: float, zoom: int, city_id: int = 1) -> dict:
+    found = index.clusters(lon - 1e-6, lat - 1e-6, lon + 1e-6, lat + 1e-6, zoom, city_id)
+    assert len(found) == 1
+    return found[0]
+
+
+@pytest.fixture
+def index():
+    rnd = random.Random(7)
+    index = ClusterIndex()
+    index.load([
+        (i, 1 + i % 2, 55.75 + rnd.uniform(-0.05, 0.05), 37.62 + rnd.uniform(-0.05, 0.05), rnd.choice([3.0, 4.0, 4.5, 5.0]))
+        for i in range(1, 201)
+    ])
+    return index
+
+
+def test_removing_best_record_picks_next_best():
+    index = ClusterIndex()
+    index.load([
+        (1, 1, 55.7500, 37.6200, 5.0),
+        (2, 1, 55.7501, 37.6201, 4.0),
+        (3, 1, 55.7502, 37.6202, 4.0),
+        (4, 1, 55.9000, 37.9000, 4.8),
+    ])
+    assert cluster_at(index, 55.75, 37.62, 12)["sample_id"] == 1
+    assert cluster_at(index, 55.75, 37.62, MIN_ZOOM)["sample_id"] == 1
+
+    index.remove(1)
+    # В мелкой ячейке остались равные рейтинги - меньший id; в крупной есть 4.8
+    assert cluster_at(index, 55.75, 37.62, 12) == {
+        "latitude": 55.75015, "longitude": 37.62015, "count": 2, "sample_id": 2,
+    }
+    assert cluster_at(index, 55.75, 37.62, MIN_ZOOM)["sample_id"] == 4
+    assert snapshot(index) == snapshot(rebuilt(index))
+
+
+def test_incremental_changes_match_full_rebuild(index):
+    rnd = random.Random(11)
+    for _ in range(300):
+        attraction_id = rnd.randint(1, 250)
+        if rnd.random() < 0.3:
+            index.remove(attraction_id)
+        else:
+            index.upsert(
+                attraction_id, rnd.choice([1, 2, 3]), 55.75 + rnd.uniform(-0.05, 0.05),
+                37.62 + rnd.uniform(-0.05, 0.05), rnd.choice([3.0, 4.0, 4.5, 5.0]),
+            )
+    assert snapshot(index) == snapshot(rebuilt(index))
+
+
+def test_removing_best_records_of_every_cell(index):
+    bests = {cluster.best_id for city in index._cities.values() for cluster in city.levels[-1].values()}
+    for attraction_id in sorted(bests):
+        index.remove(attraction_id)
+    assert snapshot(index) == snapshot(rebuilt(index))
+
+
+def test_rating_change_moves_best_record(index):
+    city_id, lat, lon, _ = index._points[10]
+    index.upsert(10, city_id, lat, lon, 5.5)
+    for zoom in range(MIN_ZOOM, MAX_ZOOM + 1):
+        assert cluster_at(index, lat, lon, zoom, city_id)["sample_id"] == 10
+
+    index.upsert(10, city_id, lat, lon, 0.0)
+    assert snapshot(index) == snapshot(rebuilt(index))
+
+
+def test_change_events_update_clusters(index):
+    index._on_change([("insert", {"id": 500, "city_id": 1, "latitude": 56.5, "longitude": 38.5, "is_active": True, "rating": 4.0})])
+    assert cluster_at(index, 56.5, 38.5, MAX_ZOOM) == {"latitude": 56.5, "longitude": 38.5, "count": 1, "sample_id": 500}
+
+    index._on_change([("update", {"id": 500, "city_id": 1, "latitude": 56.5, "longitude": 38.5, "is_active": False})])
+    assert index.clusters(38.4, 56.4, 38.6, 56.6, MAX_ZOOM) == []
+
+    best = cluster_at(index, *index._points[10][1:3], MIN_ZOOM, index._points[10][0])["sample_id"]
+    index._on_change([("delete", {"id": best})])
+    assert best not in index._points
+    assert snapshot(index) == snapshot(rebuilt(index))
@@ -0,0 +1,224 @@
+"""
+Список достопримечательностей: фильтры, total, курсоры, наборы полей и условные запросы
+"""
+import base64
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import delete, insert
+
+from app.db.changes import changes
+from app.db.session import AsyncSessionLocal
+from app.db.models import Attraction, City
+from app.services.count_cache import attraction_counts
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize("category", ["a :foo", "100%", "50% :off", "%(name)s"])
+async def test_estimate_total_with_special_characters_in_filter(client, category):
+    response = await client.get("/api/v1/attractions", params={"category": category, "total_mode": "estimate"})
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["items"] == []
+    assert isinstance(body["total"], int)
+
+
+def make_cursor(*parts) -> str:
+    raw = json.dumps(list(parts), separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+@pytest.fixture(scope="module")
+async def listing_city(client):
+    """Город с достопримечательностями, у которых совпадают ключи сортировок (проверка id в курсоре)"""
+    async with AsyncSessionLocal() as session:
+        city_id = (await session.execute(
+            insert(City).values(name=f"Listing {uuid.uuid4().hex[:8]}", country="Test").returning(City.id)
+        )).scalar_one()
+        created_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        await session.execute(insert(Attraction), [
+            {
+                "city_id": city_id, "name": f"Место {i}", "category": "park" if i % 2 else "museum",
+                "rating": (i % 3) + 3.5, "favorites_count": i % 4, "is_active": i != 5,
+                "created_at": created_at + timedelta(hours=i // 2),
+            }
+            for i in range(11)
+        ])
+        changes.mark(session, "attractions", "insert")
+        await session.commit()
+
+    yield city_id
+
+    async with AsyncSessionLocal() as session:
+        await session.execute(delete(City).where(City.id == city_id))
+        changes.mark(session, "attractions", "delete")
+        await session.commit()
+
+
+async def add_attraction(city_id: int, **values) -> int:
+    async with AsyncSessionLocal() as session:
+        attraction = Attraction(city_id=city_id, name="Новое место", category="park", **values)
+        session.add(attraction)
+        await session.commit()
+        return attraction.id
+
+
+async def remove_attraction(attraction_id: int) -> None:
+    async with AsyncSessionLocal() as session:
+        await session.delete(await session.get(Attraction, attraction_id))
+        await session.commit()
+
+
+@pytest.mark.parametrize("sort", ["newest", "popular", "rating"])
+async def test_cursor_pages_match_offset_pages(client, listing_city, sort):
+    params = {"city_id": listing_city, "sort": sort, "page_size": 3, "total_mode": "exact"}
+
+    by_offset = []
+    for page in range(1, 5):
+        body = (await client.get("/api/v1/attractions", params={**params, "page": page})).json()
+        by_offset.extend(item["id"] for item in body["items"])
+        assert body["total"] == 10
+
+    by_cursor, cursor = [], None
+    while True:
+        response = await client.get("/api/v1/attractions", params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200, response.text
+        body = response.json()
+        by_cursor.extend(item["id"] for item in body["items"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(by_offset) == 10
+    assert by_cursor == by_offset
+
+
+@pytest.mark.parametrize("sort, cursor", [
+    ("popular", make_cursor("popular", 10 ** 20, 1)),
+    ("popular", make_cursor("popular", 1, 2 ** 40)),
+    ("popular", make_cursor("popular", 4.7, 1)),
+    ("rating", make_cursor("rating", 1e309, 1)),
+    ("rating", "WyJyYXRpbmciLE5hTiwxXQ"),  # ["rating",NaN,1]
+    ("rating", make_cursor("rating", "4.7", 1)),
+    ("newest", make_cursor("newest", 5, 1)),
+    ("newest", make_cursor("newest", "not a date", 1)),
+    ("newest", make_cursor("2026-01-01T00:00:00+00:00", 1)),
+    ("newest", make_cursor("newest", "2026-01-01T00:00:00+00:00", True)),
+    ("newest", "!!!"),
+])
+async def test_invalid_cursor_is_rejected(client, sort, cursor):
+    response = await client.get("/api/v1/attractions", params={"sort": sort, "cursor": cursor})
+    assert response.status_code == 400, response.text
+
+
+@pytest.mark.parametrize("issued, used", [("rating", "popular"), ("popular", "rating"), ("newest", "rating")])
+async def test_cursor_of_other_sort_is_rejected(client, listing_city, issued, used):
+    params = {"city_id": listing_city, "page_size": 3, "total_mode": "none"}
+    cursor = (await client.get("/api/v1/attractions", params={**params, "sort": issued})).json()["next_cursor"]
+    response = await client.get("/api/v1/attractions", params={**params, "sort": used, "cursor": cursor})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Cursor does not match sort"
+
+
+@pytest.mark.parametrize("fields, keys", [
+    ("card", {"id", "name", "photo_url", "category", "rating", "is_favorite"}),
+    ("name", {"id", "name"}),
+    ("card,description", {"id", "name", "photo_url", "category", "rating", "is_favorite", "description"}),
+    (" rating , city_id ", {"id", "rating", "city_id"}),
+])
+async def test_fields_select_response_keys(client, listing_city, fields, keys):
+    params = {"city_id": listing_city, "page_size": 3, "fields": fields}
+    body = (await client.get("/api/v1/attractions", params=params)).json()
+    assert len(body["items"]) == 3
+    assert all(item.keys() == keys for item in body["items"])
+
+
+async def test_fields_full_is_default(client, listing_city):
+    params = {"city_id": listing_city, "page_size": 3}
+    default = (await client.get("/api/v1/attractions", params=params)).json()["items"]
+    full = (await client.get("/api/v1/attractions", params={**params, "fields": "full"})).json()["items"]
+    assert full == default
+    assert {"description", "address", "created_at", "is_favorite"} <= full[0].keys()
+
+    card = (await client.get("/api/v1/attractions", params={**params, "fields": "card"})).json()["items"]
+    assert card == [{key: item[key] for key in card[0]} for item in full]
+
+
+@pytest.mark.parametrize("fields", ["nope", "card,nope", "favorites_count"])
+async def test_unknown_field_is_rejected(client, fields):
+    response = await client.get("/api/v1/attractions", params={"fields": fields})
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Unknown field")
+
+
+async def test_fields_change_etag(client, listing_city):
+    params = {"city_id": listing_city, "page_size": 3}
+    card = await client.get("/api/v1/attractions", params={**params, "fields": "card"})
+    full = await client.get("/api/v1/attractions", params={**params, "fields": "full"})
+    same_card = await client.get("/api/v1/attractions", params={**params, "fields": "is_favorite,rating,category,photo_url,name"})
+    assert card.headers["etag"] != full.headers["etag"]
+    assert same_card.headers["etag"] == card.headers["etag"]
+
+
+async def test_total_cache_is_invalidated_by_writes(client, listing_city):
+    params = {"city_id": listing_city, "page_size": 3, "total_mode": "exact"}
+    attraction_counts.clear()
+    assert (await client.get("/api/v1/attractions", params=params)).json()["total"] == 10
+    assert attraction_counts.get((listing_city, None)) == 10
+
+    attraction_id = await add_attraction(listing_city)
+    try:
+        # Версия таблицы изменилась: точный total пересчитывается, оценка может взять старое
+        assert attraction_counts.get((listing_city, None)) is None
+        assert attraction_counts.get((listing_city, None), allow_stale=True) == 10
+        assert (await client.get("/api/v1/attractions", params=params)).json()["total"] == 11
+        assert attraction_counts.get((listing_city, None)) == 11
+
+        async with AsyncSessionLocal() as session:
+            (await session.get(Attraction, attraction_id)).is_active = False
+            await session.commit()
+        assert (await client.get("/api/v1/attractions", params=params)).json()["total"] == 10
+    finally:
+        await remove_attraction(attraction_id)
+
+
+async def test_not_modified_until_write(client, listing_city):
+    params = {"city_id": listing_city, "page_size": 3}
+    response = await client.get("/api/v1/attractions", params=params)
+    etag = response.headers["etag"]
+    assert "max-age" in response.headers["cache-control"]
+
+    response = await client.get("/api/v1/attractions", params=params, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+
+    response = await client.get("/api/v1/attractions", params=params, headers={"If-None-Match": f'W/{etag}, "other"'})
+    assert response.status_code == 304
+
+    attraction_id = await add_attraction(listing_city, created_at=datetime(2027, 1, 1, tzinfo=timezone.utc))
+    try:
+        response = await client.get("/api/v1/attractions", params=params, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert response.json()["items"][0]["id"] == attraction_id
+        etag = response.headers["etag"]
+    finally:
+        await remove_attraction(attraction_id)
+
+    response = await client.get("/api/v1/attractions", params=params, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert attraction_id not in [item["id"] for item in response.json()["items"]]
+
+
+async def test_other_query_has_other_etag(client, listing_city):
+    response = await client.get("/api/v1/attractions", params={"city_id": listing_city, "page_size": 3})
+    etag = response.headers["etag"]
+    response = await client.get(
+        "/api/v1/attractions", params={"city_id": listing_city, "page_size": 3, "page": 2},
+        headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
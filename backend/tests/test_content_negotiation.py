@@ -0,0 +1,32 @@
+"""
+MessagePack по Accept
+
+Условный запрос MessagePack-представления сравнивает ETag без суффикса
+формата, а внешние middleware видят маршрут, обработавший запрос.
+"""
+import pytest
+
+from app.core.metrics import REQUEST_LATENCY
+
+pytestmark = pytest.mark.anyio
+
+MSGPACK = {"Accept": "application/msgpack"}
+
+
+def observed(status: str) -> int:
+    """Число запросов GET /api/v1/cities со статусом status в метриках"""
+    series = REQUEST_LATENCY._series.get(("GET", "/api/v1/cities", status))
+    return sum(series[0]) if series else 0
+
+
+async def test_conditional_msgpack_request_keeps_route(client):
+    response = await client.get("/api/v1/cities", headers=MSGPACK)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/msgpack")
+    etag = response.headers["etag"]
+
+    before = observed("304")
+    response = await client.get("/api/v1/cities", headers={**MSGPACK, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert observed("304") == before + 1
@@ -0,0 +1,43 @@
+"""
+Версии избранного для ETag
+
+Число хранимых версий ограничено; версия вытесненного пользователя не
+возвращается к значению, которое клиент видел до его изменения.
+"""
+from app.services.favorite_versions import FavoriteVersions
+
+
+def change(versions: FavoriteVersions, user_id: int) -> None:
+    versions._on_change([("insert", {"user_id": user_id, "attraction_id": 1})])
+
+
+def test_versions_are_bounded():
+    versions = FavoriteVersions(max_size=3)
+    for user_id in range(10):
+        change(versions, user_id)
+    assert len(versions) == 3
+
+
+def test_evicted_user_never_returns_to_an_old_version():
+    versions = FavoriteVersions(max_size=2)
+    before = versions.version(1)
+    change(versions, 1)
+    changed_at = versions.last_modified(1)
+
+    # Пользователь 1 вытесняется изменениями других
+    change(versions, 2)
+    change(versions, 3)
+    assert versions.version(1) != before
+    assert versions.last_modified(1) >= changed_at
+
+    evicted = versions.version(1)
+    change(versions, 1)
+    assert versions.version(1) not in (before, evicted)
+
+
+def test_other_users_keep_their_version():
+    versions = FavoriteVersions(max_size=10)
+    change(versions, 1)
+    before = versions.version(2)
+    change(versions, 1)
+    assert versions.version(2) == before
@@ -0,0 +1,55 @@
+"""
+Покрытие круга диапазонами geo_cell
+
+Точки у границы круга (на всех азимутах) должны попадать в диапазоны
+covering_ranges, в том числе у полюсов и антимеридиана, где долгота
+сильнее всего меняется с широтой.
+"""
+import math
+
+import numpy as np
+import pytest
+
+from app.core.geo import EARTH_RADIUS_M, covering_ranges, geo_cell, haversine_m
+
+
+def destination(lat: float, lon: float, bearing: float, distance_m: float) -> tuple[float, float]:
+    """Точка на расстоянии distance_m от (lat, lon) по азимуту bearing (градусы)"""
+    angle = distance_m / EARTH_RADIUS_M
+    lat1, lon1, theta = math.radians(lat), math.radians(lon), math.radians(bearing)
+    lat2 = math.asin(
+        math.sin(lat1) * math.cos(angle) + math.cos(lat1) * math.sin(angle) * math.cos(theta)
+    )
+    lon2 = lon1 + math.atan2(
+        math.sin(theta) * math.sin(angle) * math.cos(lat1),
+        math.cos(angle) - math.sin(lat1) * math.sin(lat2),
+    )
+    return math.degrees(lat2), (math.degrees(lon2) + 540.0) % 360.0 - 180.0
+
+
+# Сетка широт, долгот у антимеридиана и радиусов, а также круги у полюса, где
+# равнопромежуточная оценка расстояния до ячейки теряла край круга
+CIRCLES = [
+    (lat, lon, radius_m)
+    for lat in (0.0, 35.5, 55.75, -62.3, 70.0, 78.2, 84.9, -88.0)
+    for lon in (37.62, 179.9, -179.95)
+    for radius_m in (500.0, 5_000.0, 50_000.0)
+] + [
+    (87.36, -82.0, 33_600.0),
+    (89.76, -137.36, 46_459.0),
+    (89.7, 19.11, 20_463.0),
+    (-89.41, -69.02, 44_346.0),
+    (-89.67, -123.89, 17_719.0),
+]
+
+
+@pytest.mark.parametrize("lat, lon, radius_m", CIRCLES)
+def test_points_near_boundary_are_covered(lat, lon, radius_m):
+    ranges = covering_ranges(lat, lon, radius_m)
+    for bearing in np.arange(0.0, 360.0, 1.0):
+        point_lat, point_lon = destination(lat, lon, bearing, radius_m * 0.999)
+        distance = haversine_m(lat, lon, np.array([point_lat]), np.array([point_lon]))[0]
+        assert distance <= radius_m
+
+        cell = geo_cell(point_lat, point_lon)
+        assert any(lo <= cell < hi for lo, hi in ranges), (point_lat, point_lon)
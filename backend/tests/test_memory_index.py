@@ -0,0 +1,67 @@
+"""
+Фоновое перестроение индексов в памяти
+
+Изменения, пришедшие, пока перестроение читает снимок БД, не должны
+теряться при подмене содержимого.
+"""
+import asyncio
+
+import pytest
+
+from app.services.suggest_index import SuggestIndex
+
+pytestmark = pytest.mark.anyio
+
+
+class GatedSuggestIndex(SuggestIndex):
+    """Индекс, у которого чтение строк ждет разрешения теста"""
+
+    def __init__(self, rows):
+        super().__init__()
+        self.rows = rows
+        self.fetches = 0
+        self.fetching = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def fetch(self, db):
+        snapshot = list(self.rows)
+        self.fetches += 1
+        self.fetching.set()
+        await self.release.wait()
+        return snapshot
+
+
+def names(index: SuggestIndex, q: str) -> list:
+    return [item["name"] for item in index.suggest(q)]
+
+
+async def test_change_during_rebuild_is_replayed():
+    index = GatedSuggestIndex([("attraction", 1, "Старый музей", 1, 4.0)])
+    index.load(index.rows)
+
+    index._schedule_rebuild()
+    await index.fetching.wait()
+    # Снимок уже прочитан: новая запись приходит только событием
+    index._on_change("attraction", [("insert", {"id": 2, "name": "Новый музей", "is_active": True, "city_id": 1})])
+    index._on_change("attraction", [("delete", {"id": 1})])
+    index.release.set()
+    await asyncio.wait_for(index._rebuild_task, 10)
+
+    assert names(index, "музей") == ["Новый музей"]
+    assert index.fetches == 1
+
+
+async def test_rebuild_requested_during_rebuild_runs_again():
+    index = GatedSuggestIndex([("attraction", 1, "Старый музей", 1, 4.0)])
+    index.load(index.rows)
+
+    index._schedule_rebuild()
+    await index.fetching.wait()
+    # Частичное обновление (без названия) - только перестроением по новым данным БД
+    index.rows = [("attraction", 1, "Переименованный музей", 1, 4.0)]
+    index._on_change("attraction", [("update", {"id": 1, "rating": 4.5})])
+    index.release.set()
+    await asyncio.wait_for(index._rebuild_task, 10)
+
+    assert index.fetches == 2
+    assert names(index, "музей") == ["Переименованный музей"]
@@ -0,0 +1,65 @@
+"""
+Метрики Prometheus
+
+Задержка и SQL-выражения запросов учитываются по шаблону маршрута, а не по
+пути. Время bcrypt и ожидание воркера публикуются гистограммами рядом с
+показателями очереди пула.
+"""
+import re
+import uuid
+from typing import Optional
+
+import pytest
+from sqlalchemy import delete
+
+from app.db.session import AsyncSessionLocal
+from app.db.models import User
+
+pytestmark = pytest.mark.anyio
+
+
+def sample(text: str, name: str, default: Optional[float] = None) -> float:
+    match = re.search(rf"^{re.escape(name)} (\S+)$", text, re.MULTILINE)
+    if match is None and default is not None:
+        return default
+    assert match, f"{name} not in /metrics"
+    return float(match.group(1))
+
+
+async def test_request_metrics_by_route_template(client):
+    attraction_id = (await client.get("/api/v1/attractions", params={"page_size": 1})).json()["items"][0]["id"]
+    latency = 'http_request_duration_seconds_count{method="GET",route="/api/v1/attractions/{attraction_id}",status="200"}'
+    statements = 'http_request_db_statements_count{route="/api/v1/attractions/{attraction_id}"}'
+    unmatched = 'http_request_duration_seconds_count{method="GET",route="unmatched",status="404"}'
+
+    before = (await client.get("/metrics")).text
+    response = await client.get(f"/api/v1/attractions/{attraction_id}")
+    assert response.status_code == 200
+    assert 'desc="' in response.headers["server-timing"]
+    await client.get(f"/api/v1/attractions/{attraction_id}")
+    await client.get("/no-such-page")
+    after = (await client.get("/metrics")).text
+
+    assert sample(after, latency) == sample(before, latency, 0) + 2
+    assert sample(after, statements) == sample(before, statements, 0) + 2
+    assert sample(after, unmatched) == sample(before, unmatched, 0) + 1
+    assert f"/api/v1/attractions/{attraction_id}\"" not in after
+
+
+async def test_password_hasher_histograms(client):
+    before = (await client.get("/metrics")).text
+    email = f"metrics-{uuid.uuid4().hex[:8]}@example.com"
+    try:
+        response = await client.post("/api/v1/auth/register", json={"email": email, "password": "metrics-pass"})
+        assert response.status_code == 201, response.text
+    finally:
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(User).where(User.email == email))
+            await session.commit()
+    after = (await client.get("/metrics")).text
+
+    for name in ("password_hasher_hash_seconds", "password_hasher_wait_seconds"):
+        assert sample(after, f"{name}_count") == sample(before, f"{name}_count") + 1
+        assert sample(after, f'{name}_bucket{{le="+Inf"}}') == sample(after, f"{name}_count")
+    assert sample(after, "password_hasher_hash_seconds_sum") > sample(before, "password_hasher_hash_seconds_sum")
+    assert "password_hasher_queue_depth" in after
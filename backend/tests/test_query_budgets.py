@@ -0,0 +1,150 @@
+"""
+Бюджеты SQL-выражений маршрутов /api/v1
+
+Каждый маршрут должен объявить бюджет через @query_budget, а типовые
+запросы к нему с холодными кэшами (пользователи, каталог городов, total,
+избранное) должны в него укладываться. Сценарии выполняются по порядку:
+отзыв создается до изменения, избранное добавляется до удаления.
+"""
+import random
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import delete, select, update
+
+from app.main import app
+from app.core.query_budget import route_budget
+from app.db.session import AsyncSessionLocal
+from app.db.models import Attraction, Favorite, Review, User
+from scripts.bench_telegram_login import make_init_data
+from tests.conftest import find_route
+
+pytestmark = pytest.mark.anyio
+
+PASSWORD = "budget-password"
+
+# (метод, путь, параметры запроса по контексту); в пути - поля контекста
+SCENARIOS = [
+    ("POST", "/api/v1/auth/login", lambda ctx: {"json": ctx.credentials}),
+    ("POST", "/api/v1/auth/telegram", lambda ctx: {"json": {"init_data": make_init_data(ctx.telegram_id)}}),
+    ("POST", "/api/v1/auth/refresh", lambda ctx: {"json": {"refresh_token": ctx.refresh_token}}),
+    ("GET", "/api/v1/auth/me", lambda ctx: {"headers": ctx.auth}),
+    ("GET", "/api/v1/cities", lambda ctx: {}),
+    ("GET", "/api/v1/cities/{city_id}", lambda ctx: {}),
+    ("GET", "/api/v1/attractions", lambda ctx: {}),
+    ("GET", "/api/v1/attractions?city_id={city_id}", lambda ctx: {"headers": ctx.auth}),
+    ("GET", "/api/v1/attractions?total_mode=none&page_size=100", lambda ctx: {"headers": ctx.auth}),
+    ("GET", "/api/v1/attractions?city_id={city_id}&sort=popular", lambda ctx: {"headers": ctx.auth}),
+    ("GET", "/api/v1/attractions?city_id={city_id}&sort=rating", lambda ctx: {}),
+    ("GET", "/api/v1/attractions?fields=card&page_size=100", lambda ctx: {"headers": ctx.auth}),
+    ("GET", "/api/v1/attractions?page_size=100", lambda ctx: {
+        "headers": {**ctx.auth, "Accept": "application/msgpack"}
+    }),
+    ("GET", "/api/v1/attractions/{attraction_id}", lambda ctx: {"headers": ctx.auth}),
+    ("GET", "/api/v1/attractions/search?q=музей", lambda ctx: {"headers": ctx.auth}),
+    ("GET", "/api/v1/attractions/search?q=эрмитж", lambda ctx: {"headers": ctx.auth}),
+    ("GET", "/api/v1/attractions/nearby?lat=55.7539&lon=37.6208&radius=2000", lambda ctx: {"headers": ctx.auth}),
+    ("GET", "/api/v1/attractions/clusters?bbox=37.3,55.5,37.9,56.0&zoom=12", lambda ctx: {}),
+    ("GET", "/api/v1/suggest?q=мос", lambda ctx: {}),
+    ("POST", "/api/v1/attractions/{attraction_id}/reviews", lambda ctx: {
+        "headers": ctx.auth, "json": {"rating": 4, "text": "Хорошо"}
+    }),
+    ("PUT", "/api/v1/attractions/{attraction_id}/reviews/me", lambda ctx: {
+        "headers": ctx.auth, "json": {"rating": 5}
+    }),
+    ("GET", "/api/v1/attractions/{attraction_id}/reviews", lambda ctx: {}),
+    ("DELETE", "/api/v1/attractions/{attraction_id}/reviews/me", lambda ctx: {"headers": ctx.auth}),
+    ("POST", "/api/v1/favorites", lambda ctx: {"headers": ctx.auth, "json": {"attraction_id": ctx.attraction_id}}),
+    ("GET", "/api/v1/favorites", lambda ctx: {"headers": ctx.auth}),
+    ("GET", "/api/v1/favorites?view=card&page_size=5", lambda ctx: {"headers": ctx.auth}),
+    ("GET", "/api/v1/favorites", lambda ctx: {"headers": {**ctx.auth, "Accept": "application/msgpack"}}),
+    ("GET", "/api/v1/favorites/ids", lambda ctx: {"headers": ctx.auth}),
+    ("DELETE", "/api/v1/favorites/{attraction_id}", lambda ctx: {"headers": ctx.auth}),
+    ("POST", "/api/v1/favorites/batch", lambda ctx: {
+        "headers": ctx.auth, "json": {"add": [ctx.attraction_id, ctx.attraction_id + 1], "remove": []}
+    }),
+    ("POST", "/api/v1/favorites/batch", lambda ctx: {
+        "headers": ctx.auth, "json": {"add": [], "remove": [ctx.attraction_id, ctx.attraction_id + 1]}
+    }),
+    ("GET", "/api/v1/admin/slow-queries", lambda ctx: {"headers": ctx.auth}),
+    ("DELETE", "/api/v1/admin/slow-queries", lambda ctx: {"headers": ctx.auth}),
+    ("GET", "/api/v1/admin/profiles", lambda ctx: {"headers": ctx.auth}),
+    ("GET", "/api/v1/admin/profiles/missing", lambda ctx: {"headers": ctx.auth}),
+]
+
+
+@pytest.fixture(scope="module")
+async def budget_context(client):
+    """Администратор с токенами, активная достопримечательность; в конце - удаление данных"""
+    prefix = f"budget-{uuid.uuid4().hex[:8]}"
+    credentials = {"email": f"{prefix}@example.com", "password": PASSWORD}
+    telegram_id = random.randint(1_000_000_000, 2_000_000_000)
+
+    async with AsyncSessionLocal() as session:
+        attraction = (await session.execute(
+            select(Attraction.id, Attraction.city_id).where(Attraction.is_active == True).limit(1)
+        )).one()
+
+    response = await client.post("/api/v1/auth/register", json=credentials)
+    assert response.status_code == 201, response.text
+    async with AsyncSessionLocal() as session:
+        await session.execute(update(User).where(User.email == credentials["email"]).values(is_admin=True))
+        await session.commit()
+    tokens = (await client.post("/api/v1/auth/login", json=credentials)).json()
+
+    yield SimpleNamespace(
+        prefix=prefix,
+        credentials=credentials,
+        telegram_id=telegram_id,
+        refresh_token=tokens["refresh_token"],
+        auth={"Authorization": f"Bearer {tokens['access_token']}"},
+        attraction_id=attraction.id,
+        city_id=attraction.city_id,
+    )
+
+    async with AsyncSessionLocal() as session:
+        user_ids = select(User.id).where(User.email.like(f"{prefix}%"))
+        await session.execute(delete(Favorite).where(Favorite.user_id.in_(user_ids)))
+        await session.execute(delete(Review).where(Review.user_id.in_(user_ids)))
+        await session.execute(delete(User).where(
+            User.email.like(f"{prefix}%") | (User.telegram_id == telegram_id)
+        ))
+        await session.commit()
+
+
+def test_every_route_declares_budget():
+    undeclared = [
+        f"{','.join(sorted(route.methods))} {route.path}"
+        for route in app.routes
+        if getattr(route, "path", "").startswith("/api/v1") and route_budget(route) is None
+    ]
+    assert not undeclared
+
+
+def test_every_route_has_scenario():
+    covered = {("POST", "/api/v1/auth/register")} | {
+        (method, find_route(method, path.format(city_id=1, attraction_id=1)).path)
+        for method, path, _ in SCENARIOS
+    }
+    missing = [
+        f"{method} {route.path}"
+        for route in app.routes
+        if getattr(route, "path", "").startswith("/api/v1")
+        for method in route.methods
+        if (method, route.path) not in covered
+    ]
+    assert not missing
+
+
+async def test_register_within_budget(budget_context, assert_budget):
+    credentials = {"email": f"{budget_context.prefix}-new@example.com", "password": PASSWORD}
+    response = await assert_budget("POST", "/api/v1/auth/register", json=credentials)
+    assert response.status_code == 201
+
+
+@pytest.mark.parametrize(
+    "method, path, options", SCENARIOS, ids=[f"{method} {path}" for method, path, _ in SCENARIOS]
+)
+async def test_route_within_budget(budget_context, assert_budget, method, path, options):
+    await assert_budget(method, path.format(**vars(budget_context)), **options(budget_context))
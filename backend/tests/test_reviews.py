@@ -0,0 +1,79 @@
+"""
+Отзывы и средняя оценка
+
+Список отзывов отсутствующей или неактивной достопримечательности - 404,
+как у карточки. Удаление последнего отзыва сбрасывает rating в 0.
+"""
+import uuid
+
+import pytest
+from sqlalchemy import delete, insert, select
+
+from app.db.session import AsyncSessionLocal
+from app.db.models import Attraction, City, User
+
+pytestmark = pytest.mark.anyio
+
+PASSWORD = "reviews-password"
+
+
+@pytest.fixture
+async def attraction(client):
+    """Временная активная достопримечательность с редакционным рейтингом и ее автор отзыва"""
+    email = f"reviews-{uuid.uuid4().hex[:8]}@example.com"
+    async with AsyncSessionLocal() as session:
+        city_id = (await session.execute(select(City.id).limit(1))).scalar_one()
+        attraction_id = (await session.execute(
+            insert(Attraction).values(
+                city_id=city_id, name=f"Отзывы {email}", is_active=True, rating=4.5
+            ).returning(Attraction.id)
+        )).scalar_one()
+        await session.commit()
+
+    credentials = {"email": email, "password": PASSWORD}
+    response = await client.post("/api/v1/auth/register", json=credentials)
+    assert response.status_code == 201, response.text
+    tokens = (await client.post("/api/v1/auth/login", json=credentials)).json()
+
+    yield attraction_id, {"Authorization": f"Bearer {tokens['access_token']}"}
+
+    async with AsyncSessionLocal() as session:
+        await session.execute(delete(User).where(User.email == email))
+        await session.execute(delete(Attraction).where(Attraction.id == attraction_id))
+        await session.commit()
+
+
+async def test_reviews_of_missing_attraction_not_found(client):
+    response = await client.get("/api/v1/attractions/2000000000/reviews")
+    assert response.status_code == 404
+
+
+async def test_reviews_of_inactive_attraction_not_found(client, attraction):
+    attraction_id, _ = attraction
+    assert (await client.get(f"/api/v1/attractions/{attraction_id}/reviews")).json()["items"] == []
+
+    # Через ORM: изменение попадает в changes и меняет ETag списка
+    async with AsyncSessionLocal() as session:
+        record = await session.get(Attraction, attraction_id)
+        record.is_active = False
+        await session.commit()
+
+    response = await client.get(f"/api/v1/attractions/{attraction_id}/reviews")
+    assert response.status_code == 404
+
+
+async def test_last_review_deletion_resets_rating(client, attraction):
+    attraction_id, auth = attraction
+    path = f"/api/v1/attractions/{attraction_id}/reviews"
+
+    saved = (await client.post(path, headers=auth, json={"rating": 3})).json()
+    assert (saved["attraction_rating"], saved["attraction_rating_count"]) == (3.0, 1)
+    assert [item["rating"] for item in (await client.get(path)).json()["items"]] == [3]
+
+    response = await client.delete(f"{path}/me", headers=auth)
+    assert response.status_code == 204
+    async with AsyncSessionLocal() as session:
+        rating, rating_count = (await session.execute(
+            select(Attraction.rating, Attraction.rating_count).where(Attraction.id == attraction_id)
+        )).one()
+    assert (rating, rating_count) == (0.0, 0)
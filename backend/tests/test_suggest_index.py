@@ -0,0 +1,55 @@
+"""
+Подсказки по префиксу: нормализация и ранжирование
+"""
+import pytest
+
+from app.services.suggest_index import SuggestIndex, normalize
+
+
+def names(index: SuggestIndex, q: str) -> list:
+    return [item["name"] for item in index.suggest(q)]
+
+
+@pytest.fixture
+def index():
+    index = SuggestIndex()
+    index.load([
+        ("city", 1, "Орёл", None, 0.0),
+        ("attraction", 1, "Ёлка на площади", 1, 4.0),
+        ("attraction", 2, "Елецкий собор", 1, 4.5),
+        ("attraction", 3, "Зелёный театр", 1, 3.0),
+    ])
+    return index
+
+
+def test_normalize_replaces_yo():
+    assert normalize("  Зелёный  ТЕАТР! ") == "зеленый театр"
+    assert normalize("ЁЛКА") == "елка"
+
+
+@pytest.mark.parametrize("q", ["елк", "ёлк", "ЁЛК", "Елка"])
+def test_yo_and_ye_match_each_other(index, q):
+    assert names(index, q) == ["Ёлка на площади"]
+
+
+@pytest.mark.parametrize("q", ["орел", "орёл"])
+def test_yo_in_city_name(index, q):
+    assert names(index, q) == ["Орёл"]
+
+
+def test_yo_inside_word(index):
+    assert names(index, "зеленый т") == ["Зелёный театр"]
+    assert names(index, "театр") == ["Зелёный театр"]
+
+
+def test_prefix_ranks_by_rating(index):
+    assert names(index, "е") == ["Елецкий собор", "Ёлка на площади"]
+
+
+def test_upserted_entry_is_normalized(index):
+    index.upsert("attraction", 4, "Озеро Ёж", 1, 5.0)
+    assert names(index, "еж") == ["Озеро Ёж"]
+    assert names(index, "е")[0] == "Озеро Ёж"
+
+    index.remove("attraction", 4)
+    assert names(index, "еж") == []
@@ -0,0 +1,43 @@
+"""
+Одновременные первые входы через Telegram
+
+Каждый пользователь входит дважды одновременно: upsert по telegram_id
+не должен падать на уникальном ограничении и создавать дубликаты.
+"""
+import asyncio
+import random
+
+import pytest
+from sqlalchemy import delete, func, select
+
+from app.db.session import AsyncSessionLocal
+from app.db.models import User
+from scripts.bench_telegram_login import make_init_data
+
+pytestmark = pytest.mark.anyio
+
+USERS = 500
+
+
+async def test_concurrent_first_logins_create_each_user_once(client):
+    # telegram_id - Integer, поэтому диапазон выбирается в пределах int4
+    base_id = random.randint(1_000_000_000, 2_000_000_000 - USERS)
+    telegram_ids = list(range(base_id, base_id + USERS))
+    payloads = [make_init_data(telegram_id) for telegram_id in telegram_ids * 2]
+    random.shuffle(payloads)
+
+    try:
+        responses = await asyncio.gather(*(
+            client.post("/api/v1/auth/telegram", json={"init_data": payload}) for payload in payloads
+        ))
+        async with AsyncSessionLocal() as session:
+            created = (await session.execute(
+                select(func.count()).select_from(User).where(User.telegram_id.in_(telegram_ids))
+            )).scalar()
+    finally:
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(User).where(User.telegram_id.in_(telegram_ids)))
+            await session.commit()
+
+    assert [response.status_code for response in responses] == [200] * len(payloads)
+    assert created == USERS